@@ -18,19 +18,20 @@ validation/generation support.
 """
 from .globals import AUTHOR, VERSION
 from .api import (
-    single_load, multi_load, load, loads, dump, dumps, validate, gen_schema,
-    list_types, find_loader, merge, get, set_, open,
-    MS_REPLACE, MS_NO_REPLACE, MS_DICTS, MS_DICTS_AND_LISTS,
+    single_load, multi_load, load, loads, load_iter, load_all, query_many,
+    dump, dumps, validate, gen_schema, list_types, find_loader, merge, get,
+    set_, open, MS_REPLACE, MS_NO_REPLACE, MS_DICTS, MS_DICTS_AND_LISTS,
     UnknownParserTypeError, UnknownFileTypeError
 )
+from .watcher import watch
 
 __author__ = AUTHOR
 __version__ = VERSION
 
 __all__ = [
-    "single_load", "multi_load", "load", "loads", "dump", "dumps", "validate",
-    "gen_schema", "list_types", "find_loader", "merge",
-    "get", "set_", "open",
+    "single_load", "multi_load", "load", "loads", "load_iter", "load_all",
+    "query_many", "dump", "dumps", "validate", "gen_schema", "list_types",
+    "find_loader", "merge", "get", "set_", "open", "watch",
     "MS_REPLACE", "MS_NO_REPLACE", "MS_DICTS", "MS_DICTS_AND_LISTS",
     "UnknownParserTypeError", "UnknownFileTypeError"
 ]
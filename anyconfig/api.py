@@ -5,6 +5,25 @@
 # pylint: disable=unused-import,import-error,invalid-name
 r"""Public APIs of anyconfig module.
 
+.. versionadded:: 0.9.5
+
+   - Added ac_cache keyword option to cache loaded results of config files.
+   - Backend modules are imported lazily on demand. See
+     :mod:`anyconfig.backends`.
+   - Added ac_workers and ac_workers_mode keyword options to
+     :func:`multi_load` to load multiple config files in parallel.
+   - Added :func:`load_iter` and its alias :func:`load_all` to load multiple
+     documents or records in a config file such as YAML one by one.
+   - :func:`query` accepts compiled JMESPath expression objects also.
+   - Added :func:`query_many` to evaluate many JMESPath expressions at once.
+   - :func:`multi_load` merges the results loaded at once with
+     :func:`anyconfig.dicts.merge_many` unless ac_template is True.
+   - :func:`load` pushes simple ac_query expressions such as 'a.b[0]' down to
+     backends to load the subtree selected only if possible.
+   - ac_dict keyword option accepts :class:`anyconfig.frozen.FrozenConfig` to
+     load immutable and hash-consed results. Results loaded from multiple
+     config files are merged as mutable ones and frozen after that.
+
 .. versionadded:: 0.8.3
 
    - Added ac_dict keyword option to pass dict factory (any callable like
@@ -62,11 +81,12 @@ import os.path
 
 from anyconfig.globals import LOGGER
 import anyconfig.backends
-import anyconfig.backend.json
+import anyconfig.cache
 import anyconfig.compat
 import anyconfig.query
 import anyconfig.globals
 import anyconfig.dicts
+import anyconfig.frozen
 import anyconfig.template
 import anyconfig.utils
 
@@ -144,7 +164,7 @@ def find_loader(path_or_stream, parser_or_type=None, is_path_=False):
                                              forced_type=parser_or_type,
                                              is_path_=is_path_)
         LOGGER.debug("Using config parser: %r [%s]", psr, psr.type())
-        return psr()  # TBD: Passing initialization arguments.
+        return anyconfig.backends.get_parser_instance(psr)
     except (ValueError, UnknownParserTypeError, UnknownFileTypeError):
         raise
 
@@ -231,6 +251,17 @@ def single_load(path_or_stream, ac_parser=None, ac_template=False,
 
           - ac_schema: JSON schema file path to validate given config file
           - ac_query: JMESPath expression to query data
+          - ac_cache: True to cache loaded results in the default cache, or
+            a cache object such as :class:`~anyconfig.cache.LoadCache`. The
+            cached result of a file is used until its stats (inode, mtime and
+            size) change. Results are frozen and not copied by default, that
+            is, these are made of :class:`~anyconfig.frozen.FrozenConfig`
+            objects and tuples instead of mapping objects and lists, and
+            ValueError is raised if ac_dict other than FrozenConfig is given.
+            These can be dumped as they are but not modified; use
+            :func:`anyconfig.frozen.thaw` to get mutable copies of them, or
+            ``LoadCache(mutable=True)`` to get mutable copies of results
+            made with ac_dict. See also :mod:`anyconfig.cache`.
 
         - Common backend options:
 
@@ -259,10 +290,177 @@ def single_load(path_or_stream, ac_parser=None, ac_template=False,
             cnf = psr.loads(content, **options)
             return _maybe_validated(cnf, schema, **options)
 
-    cnf = psr.load(path_or_stream, **options)
+    if is_path_:
+        cnf = anyconfig.cache.load(psr, path_or_stream, **options)
+    else:
+        cnf = psr.load(path_or_stream, **options)
+
     return _maybe_validated(cnf, schema, **options)
 
 
+def _load_iter(psr, path_or_stream, schema=None, **options):
+    """
+    :param psr: Parser object to load documents
+    :param path_or_stream: Configuration file path or file or file-like object
+    :param schema: JSON schema object or None
+    :param options: Keyword options, see :func:`load_iter`
+    """
+    for cnf in psr.load_iter(path_or_stream, **options):
+        cnf = _maybe_validated(cnf, schema, **options)
+        yield anyconfig.query.query(cnf, **options)
+
+
+def load_iter(path_or_stream, ac_parser=None, **options):
+    """
+    Load documents or records in a config file one by one lazily, e.g.
+    multiple YAML documents separated with '---', to process large inputs in
+    constant memory. The config file is loaded as a single document if the
+    backend cannot load it record by record. See also
+    :meth:`~anyconfig.backend.base.LoaderMixin.load_iter`.
+
+    :param path_or_stream: Configuration file path or file or file-like object
+    :param ac_parser: Forced parser type or parser object itself
+    :param options: Optional keyword arguments such as ac_dict, ac_ordered,
+        ac_schema, ac_query and backend specific options. See also the
+        description of `options` in :func:`single_load`.
+
+    :return: A generator yields mapping objects of each document or record
+    """
+    is_path_ = is_path(path_or_stream)
+    if is_path_:
+        path_or_stream = anyconfig.utils.normpath(path_or_stream)
+
+    psr = find_loader(path_or_stream, ac_parser, is_path_)
+    schema = _maybe_schema(**options)
+    options["ac_schema"] = None
+
+    LOGGER.info("Loading documents: %s",
+                anyconfig.utils.get_path_from_stream(path_or_stream))
+    return _load_iter(psr, path_or_stream, schema=schema, **options)
+
+
+load_all = load_iter  # Alias.
+
+
+def _frozen_factory(cnfs):
+    """
+    :param cnfs: A list of mapping objects
+    :return: The class of the first frozen mapping object in `cnfs` or None
+    """
+    for cnf in cnfs:
+        if anyconfig.frozen.is_frozen(cnf):
+            return type(cnf)
+
+    return None
+
+
+def _merge_frozen(cnfs, frozen, **options):
+    """
+    Merge mapping objects `cnfs` some of which are frozen. These are thawed to
+    merge and the result is frozen again.
+
+    :param cnfs: A list of mapping objects
+    :param frozen: The class to freeze the merged result
+    :param options: Keyword options passed to :func:`merge_many`
+    """
+    cnfs = [anyconfig.frozen.thaw(cnf, anyconfig.compat.OrderedDict)
+            for cnf in cnfs]
+    return anyconfig.frozen.freeze(anyconfig.dicts.merge_many(cnfs,
+                                                              **options),
+                                   frozen)
+
+
+def _maybe_merged(cnf, cups, **options):
+    """
+    :param cnf: Mapping object to merge `cups` into or None
+    :param cups: Mapping object loaded from a config file or None
+    :param options: Keyword options passed to :func:`merge`
+
+    :return: `cnf` merged with `cups`, or `cups` if `cnf` is None
+    """
+    if not cups:
+        return cnf
+
+    if cnf is None:
+        return cups
+
+    frozen = _frozen_factory([cnf, cups])
+    if frozen is not None:
+        return _merge_frozen([cnf, cups], frozen, **options)
+
+    merge(cnf, cups, **options)
+    return cnf
+
+
+def _merge_all(cnf, cupss, **options):
+    """
+    :param cnf: Mapping object to merge `cupss` into or None
+    :param cupss: A list of mapping objects loaded from config files or None
+    :param options: Keyword options passed to :func:`merge_many`
+
+    :return: `cnf` merged with `cupss`, the first one of `cupss` merged with
+        the rest if `cnf` is None, or None if there is nothing to merge
+    """
+    cnfs = [cups for cups in cupss if cups]
+    if cnf is not None:
+        cnfs.insert(0, cnf)
+
+    frozen = _frozen_factory(cnfs)
+    if frozen is not None and len(cnfs) > 1:
+        return _merge_frozen(cnfs, frozen, **options)
+
+    return anyconfig.dicts.merge_many(cnfs, **options)
+
+
+def _single_load_star(args):
+    """
+    Wrapper of :func:`single_load` called in worker threads or processes.
+
+    :param args: A tuple of (path_or_stream, ac_parser, options)
+    """
+    (path_or_stream, ac_parser, options) = args
+    return single_load(path_or_stream, ac_parser=ac_parser, **options)
+
+
+def _load_paths_in_parallel(paths, ac_parser=None, ac_workers=1,
+                            ac_workers_mode="thread", **options):
+    """
+    Load config files in parallel.
+
+    :param paths: A list of file paths or file or file-like objects
+    :param ac_parser: Forced parser type or parser object
+    :param ac_workers: Number of worker threads or processes
+    :param ac_workers_mode: "thread" or "process"
+    :param options: Keyword options passed to :func:`single_load`
+
+    :return: A list of results loaded in the same order as `paths`
+    """
+    # Import them only when needed as it takes some time.
+    import multiprocessing
+    import multiprocessing.pool
+
+    use_procs = ac_workers_mode == "process"
+    if use_procs and not all(is_path(p) for p in paths):
+        LOGGER.warning("File or file-like objects cannot be passed to other "
+                       "processes. Load them in threads instead")
+        use_procs = False
+
+    if use_procs:
+        if options.pop("ac_cache", None):
+            LOGGER.warning("ac_cache is ignored as caches are not shared "
+                           "among processes")
+        pool = multiprocessing.Pool(ac_workers)
+    else:
+        pool = multiprocessing.pool.ThreadPool(ac_workers)
+
+    try:
+        return pool.map(_single_load_star,
+                        [(p, ac_parser, options) for p in paths])
+    finally:
+        pool.close()
+        pool.join()
+
+
 def multi_load(paths, ac_parser=None, ac_template=False, ac_context=None,
                **options):
     """
@@ -291,9 +489,10 @@ def multi_load(paths, ac_parser=None, ac_template=False, ac_context=None,
     :param ac_context: Mapping object presents context to instantiate template
     :param options: Optional keyword arguments:
 
-        - ac_dict, ac_ordered, ac_schema and ac_query are the options common in
-          :func:`single_load`, :func:`multi_load`, :func:`load`: and
-          :func:`loads`. See the descriptions of them in :func:`single_load`.
+        - ac_dict, ac_ordered, ac_schema, ac_query and ac_cache are the
+          options common in :func:`single_load`, :func:`multi_load`,
+          :func:`load`: and :func:`loads`. See the descriptions of them in
+          :func:`single_load`.
 
         - Options specific to this function and :func:`load`:
 
@@ -304,6 +503,22 @@ def multi_load(paths, ac_parser=None, ac_template=False, ac_context=None,
 
           - ac_marker (marker): Globbing marker to detect paths patterns.
 
+          - ac_workers: Number of workers to load config files in parallel.
+            Results are merged in the order of given paths so that the result
+            is same as the one loaded sequentially. Config files are loaded
+            sequentially if this is None or less than 2 or ac_template is True,
+            because each template needs the result of previous ones as its
+            context.
+
+          - ac_workers_mode: "thread" (default) to load config files in a
+            thread pool or "process" to load them in a process pool, which
+            helps backends implemented in pure python such as properties and
+            xml. Objects given as options must be picklable in the latter mode
+            and ac_cache is ignored as caches are not shared among processes.
+            Config files are loaded in threads instead if some of them are
+            given as file or file-like objects. Warnings are logged in these
+            cases.
+
         - Common backend options:
 
           - ignore_missing: Ignore and just return empty result if given file
@@ -322,16 +537,21 @@ def multi_load(paths, ac_parser=None, ac_template=False, ac_context=None,
     if anyconfig.utils.are_same_file_types(paths):
         ac_parser = find_loader(paths[0], ac_parser, is_path(paths[0]))
 
-    cnf = ac_context
-    for path in paths:
-        opts = options.copy()
-        cups = single_load(path, ac_parser=ac_parser,
-                           ac_template=ac_template, ac_context=cnf, **opts)
-        if cups:
-            if cnf is None:
-                cnf = cups
-            else:
-                merge(cnf, cups, **options)
+    if ac_template:  # Each template needs the results of previous ones.
+        cnf = ac_context
+        for path in paths:
+            opts = options.copy()
+            cups = single_load(path, ac_parser=ac_parser,
+                               ac_template=ac_template, ac_context=cnf,
+                               **opts)
+            cnf = _maybe_merged(cnf, cups, **options)
+    else:
+        if (options.get("ac_workers") or 0) > 1:
+            cupss = _load_paths_in_parallel(paths, ac_parser, **options)
+        else:
+            cupss = [single_load(p, ac_parser=ac_parser, **options.copy())
+                     for p in paths]
+        cnf = _merge_all(ac_context, cupss, **options)
 
     if cnf is None:
         return anyconfig.dicts.convert_to({}, **options)
@@ -340,6 +560,44 @@ def multi_load(paths, ac_parser=None, ac_template=False, ac_context=None,
     return anyconfig.query.query(cnf, **options)
 
 
+def _query_path_to_push_down(ac_template=False, ac_schema=None,
+                             ac_cache=None, ac_query=None, **options):
+    """
+    :param options: Keyword options given to :func:`load`
+    :return: A tuple of keys and indices of `ac_query` if it can be pushed
+        down to backends, that is, it's a simple path expression and the
+        whole data is not needed for templates, validation and caching, or
+        None
+    """
+    if ac_template or ac_schema is not None or ac_cache:
+        return None
+
+    return anyconfig.query.parse_simple_path(ac_query)
+
+
+def _single_load_subtree(path_or_stream, path, ac_parser=None, **options):
+    """
+    Load the subtree at `path` from a config file. Backends may skip the
+    parts of data not on `path`. See also
+    :meth:`~anyconfig.backend.base.LoaderMixin.load_subtree`.
+
+    :param path_or_stream: Configuration file path or file or file-like object
+    :param path: A tuple of keys and indices
+    :param ac_parser: Forced parser type or parser object
+    :param options: Keyword options, see :func:`single_load`
+
+    :return: The subtree at `path` or None
+    """
+    is_path_ = is_path(path_or_stream)
+    if is_path_:
+        path_or_stream = anyconfig.utils.normpath(path_or_stream)
+
+    psr = find_loader(path_or_stream, ac_parser, is_path_)
+    LOGGER.info("Loading the subtree at %r: %s", path,
+                anyconfig.utils.get_path_from_stream(path_or_stream))
+    return psr.load_subtree(path_or_stream, path, **options)
+
+
 def load(path_specs, ac_parser=None, ac_dict=None, ac_template=False,
          ac_context=None, **options):
     r"""
@@ -361,7 +619,9 @@ def load(path_specs, ac_parser=None, ac_dict=None, ac_template=False,
     :param ac_context: A dict presents context to instantiate template
     :param options:
         Optional keyword arguments. See also the description of `options` in
-        :func:`single_load` and :func:`multi_load`
+        :func:`single_load` and :func:`multi_load`. Note that results are
+        frozen if ac_cache is True, see the description of it in
+        :func:`single_load`.
 
     :return: Mapping object or any query result might be primitive objects
     """
@@ -372,6 +632,11 @@ def load(path_specs, ac_parser=None, ac_dict=None, ac_template=False,
                           ac_template=ac_template, ac_context=ac_context,
                           **options)
 
+    path = _query_path_to_push_down(ac_template=ac_template, **options)
+    if path is not None:
+        return _single_load_subtree(path_specs, path, ac_parser=ac_parser,
+                                    ac_dict=ac_dict, **options)
+
     cnf = single_load(path_specs, ac_parser=ac_parser, ac_dict=ac_dict,
                       ac_template=ac_template, ac_context=ac_context,
                       **options)
@@ -470,10 +735,28 @@ def query(data, expression, **options):
     API just wraps :func:`anyconfig.query.query`.
 
     :param data: Config data object to query
+    :param expression:
+        JMESPath expression string or a compiled expression object made with
+        :func:`anyconfig.query.compile_` to avoid compiling it in loops
     :param options: Ignored in current implementation
 
     :return: Query result object may be primitive (int, str, etc.) or dict.
     """
     return anyconfig.query.query(data, ac_query=expression)
 
+
+def query_many(data, expressions, **options):
+    """
+    API just wraps :func:`anyconfig.query.query_many`.
+
+    :param data: Config data object to query
+    :param expressions:
+        A mapping object of {name: JMESPath expression string or compiled
+        expression object}
+    :param options: Ignored in current implementation
+
+    :return: A dict of {name: query result object}
+    """
+    return anyconfig.query.query_many(data, expressions)
+
 # vim:sw=4:ts=4:et:
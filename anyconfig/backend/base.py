@@ -12,12 +12,29 @@ needed:
   - :meth:`load_from_string`: Load config from string
   - :meth:`load_from_stream`: Load config from a file or file-like object
   - :meth:`load_from_path`: Load config from file of given path
+  - :meth:`load_iter`: Load records from file or file-like object one by one
+  - :meth:`load_subtree`: Load the subtree at given path from file or
+    file-like object
   - :meth:`dump_to_string`: Dump config as a string
   - :meth:`dump_to_stream`: Dump config to a file or file-like object
   - :meth:`dump_to_path`: Dump config to a file of given path
 
 Changelog:
 
+.. versionchanged:: 0.9.5
+
+   - Add :meth:`load_iter` to :class:`LoaderMixin` to load data and yield
+     results one by one. Backends of record oriented formats may override it
+     to yield records lazily.
+   - Add :meth:`load_subtree` to :class:`LoaderMixin` to load the subtree
+     at given path only. Backends may override it to skip unrelated
+     subtrees while loading.
+   - Results are made with mutable mapping objects and frozen after loading
+     if ac_dict is :class:`~anyconfig.frozen.FrozenConfig`, see
+     :func:`mutable_container` and :func:`maybe_frozen`.
+   - Frozen config data are thawed before dumped, see :func:`maybe_thawed`,
+     as backends cannot serialize them as they are.
+
 .. versionchanged:: 0.9.1
 
    - Rename the member _dict_options to `_dict_opts` to make consistent w/
@@ -42,6 +59,8 @@ import logging
 import os
 
 import anyconfig.compat
+import anyconfig.frozen
+import anyconfig.query
 import anyconfig.utils
 
 
@@ -61,6 +80,54 @@ def ensure_outdir_exists(filepath):
         os.makedirs(outdir)
 
 
+def mutable_container(container):
+    """
+    :param container: callable to make a container object
+    :return: `container` or OrderedDict if `container` makes frozen mapping
+        objects which cannot be updated while loading, e.g.
+        :class:`~anyconfig.frozen.FrozenConfig`
+
+    >>> mutable_container(dict) is dict
+    True
+    >>> mutable_container(anyconfig.frozen.FrozenConfig)
+    <class 'collections.OrderedDict'>
+    """
+    if anyconfig.frozen.is_frozen_factory(container):
+        return anyconfig.compat.OrderedDict
+
+    return container
+
+
+def maybe_frozen(cnf, container):
+    """
+    :param cnf: Config data loaded with :func:`mutable_container` `container`
+    :param container: callable to make a container object
+    :return: `cnf` frozen if `container` makes frozen mapping objects or `cnf`
+    """
+    if anyconfig.frozen.is_frozen_factory(container):
+        return anyconfig.frozen.freeze(cnf, container)
+
+    return cnf
+
+
+def maybe_thawed(cnf):
+    """
+    :param cnf: Config data to dump
+    :return: Mutable copy of `cnf` made of OrderedDict objects and lists if
+        `cnf` is frozen, or `cnf` itself
+
+    >>> maybe_thawed(anyconfig.frozen.freeze({"a": [1, {"b": 2}]}))
+    OrderedDict([('a', [1, OrderedDict([('b', 2)])])])
+    >>> cnf = {"a": (1, )}
+    >>> maybe_thawed(cnf) is cnf
+    True
+    """
+    if anyconfig.frozen.is_frozen(cnf):
+        return anyconfig.frozen.thaw(cnf, anyconfig.compat.OrderedDict)
+
+    return cnf
+
+
 def to_method(func):
     """
     Lift :func:`func` to a method; it will be called with the first argument
@@ -235,8 +302,10 @@ class LoaderMixin(object):
         if not content or content is None:
             return container()
 
-        options = self._load_options(container, **options)
-        return self.load_from_string(content, container, **options)
+        factory = mutable_container(container)
+        options = self._load_options(factory, **options)
+        cnf = self.load_from_string(content, factory, **options)
+        return maybe_frozen(cnf, container)
 
     def load(self, path_or_stream, ignore_missing=False, **options):
         """
@@ -257,17 +326,68 @@ class LoaderMixin(object):
         :return: dict or dict-like object holding configurations
         """
         container = self._container_factory(**options)
-        options = self._load_options(container, **options)
+        factory = mutable_container(container)
+        options = self._load_options(factory, **options)
 
         if isinstance(path_or_stream, anyconfig.compat.STR_TYPES):
             if ignore_missing and not os.path.exists(path_or_stream):
                 return container()
 
-            cnf = self.load_from_path(path_or_stream, container, **options)
+            cnf = self.load_from_path(path_or_stream, factory, **options)
         else:
-            cnf = self.load_from_stream(path_or_stream, container, **options)
+            cnf = self.load_from_stream(path_or_stream, factory, **options)
 
-        return cnf
+        return maybe_frozen(cnf, container)
+
+    def load_iter(self, path_or_stream, ignore_missing=False, **options):
+        """
+        Load config from a file path or a file / file-like object
+        `path_or_stream` and yield results one by one.
+
+        This default implementation yields the single result of :meth:`load`.
+        Parsers of record oriented formats such as multi-document YAML may
+        override this to yield each record lazily without loading all of
+        them at once.
+
+        :param path_or_stream: Config file path or file{,-like} object
+        :param ignore_missing:
+            Ignore and yield nothing if given `path_or_stream` is a file path
+            does not exist.
+        :param options: See :meth:`load`
+
+        :return: A generator yields dict or dict-like objects
+        """
+        if ignore_missing and \
+                isinstance(path_or_stream, anyconfig.compat.STR_TYPES) and \
+                not os.path.exists(path_or_stream):
+            return
+
+        yield self.load(path_or_stream, **options)
+
+    def load_subtree(self, path_or_stream, path, ignore_missing=False,
+                     **options):
+        """
+        Load config from a file path or a file / file-like object
+        `path_or_stream` and return the subtree at `path` in it.
+
+        This default implementation loads the whole config and searches the
+        subtree in it. Parsers of which backends can skip unrelated parts of
+        data while loading may override this to push `path` down.
+
+        :param path_or_stream: Config file path or file{,-like} object
+        :param path:
+            A sequence of keys (str) and indices (int) such as ('a', 0, 'b')
+            made by :func:`anyconfig.query.parse_simple_path`
+        :param ignore_missing:
+            Ignore and just return None if given `path_or_stream` is a file
+            path does not exist.
+        :param options: See :meth:`load`
+
+        :return: The subtree at `path` or None if it does not exist
+        """
+        cnf = self.load(path_or_stream, ignore_missing=ignore_missing,
+                        **options)
+        return anyconfig.query.search_path(cnf, path)
 
 
 class DumperMixin(object):
@@ -329,7 +449,7 @@ class DumperMixin(object):
         :return: string represents the configuration
         """
         kwargs = anyconfig.utils.filter_options(self._dump_opts, kwargs)
-        return self.dump_to_string(cnf, **kwargs)
+        return self.dump_to_string(maybe_thawed(cnf), **kwargs)
 
     def dump(self, cnf, path_or_stream, **kwargs):
         """
@@ -342,6 +462,7 @@ class DumperMixin(object):
         :raises IOError, OSError, AttributeError: When dump failed.
         """
         kwargs = anyconfig.utils.filter_options(self._dump_opts, kwargs)
+        cnf = maybe_thawed(cnf)
 
         if isinstance(path_or_stream, anyconfig.compat.STR_TYPES):
             ensure_outdir_exists(path_or_stream)
@@ -8,7 +8,8 @@
 r"""JSON backend:
 
 - Format to support: JSON, http://www.json.org
-- Requirements: json in python standard library (>= python 2.6) or simplejson
+- Requirements: json in python standard library (>= python 2.6) or simplejson,
+  and optionally orjson or ujson to load and dump data faster
 - Development Status :: 5 - Production/Stable
 - Limitations: None obvious
 - Special options:
@@ -20,8 +21,35 @@ r"""JSON backend:
     https://docs.python.org/2/library/json.html dependent on the python version
     to use.
 
+  - ac_json_engine: JSON library to load and dump data, one of "stdlib"
+    (default), "simplejson", "orjson", "ujson" or "auto" to select the fastest
+    one available in this order: orjson, ujson and stdlib.
+
+    orjson and ujson do not support most of the options above. JSON data is
+    loaded and dumped with json in python standard library instead of them if
+    any options they do not support are given or they are not available. For
+    example, stdlib is used to load data if ac_ordered or ac_dict option is
+    given, as object_pairs_hook or object_hook other than dict is not
+    supported by them.
+
+    These are used to dump data only if the output is same as the one of json
+    with the options given, that is, separators=(",", ":") is given without
+    indent, and in addition, ensure_ascii=False is given for orjson which
+    never escapes non-ASCII characters. indent must be 2 for orjson and is not
+    supported for ujson. stdlib is also used to dump data if it contains
+    floats in exponent notation (1e+16, 1e-07), NaN, infinities or integers
+    out of 64-bit range, which they dump in another format or cannot dump.
+
+    JSON data is loaded with stdlib instead of orjson if it contains numbers
+    having 19 or more digits, which orjson may load as floats, and with stdlib
+    instead of orjson or ujson if they fail to load it, e.g. NaN and 1e400.
+
 Changelog:
 
+    .. versionchanged:: 0.9.5
+
+       - Added ac_json_engine option to select JSON library to use.
+
     .. versionadded:: 0.0.1
 """
 from __future__ import absolute_import
@@ -31,6 +59,12 @@ try:
 except ImportError:
     import simplejson as json
 
+import importlib
+import logging
+import math
+import numbers
+import re
+
 import anyconfig.backend.base
 import anyconfig.compat
 
@@ -51,6 +85,280 @@ if not anyconfig.compat.IS_PYTHON_2_6:
     _LOAD_OPTS.append("object_pairs_hook")
     _DICT_OPTS.insert(0, "object_pairs_hook")  # Higher prio. than object_hook
 
+LOGGER = logging.getLogger(__name__)
+
+JSON_ENGINES = ("stdlib", "simplejson", "orjson", "ujson")
+_AUTO_ENGINES = ("orjson", "ujson", "stdlib")  # Faster ones first.
+
+# Options of other engines than stdlib and simplejson can process. They are
+# not used and stdlib is used instead if other options were given. Dict
+# options (_DICT_OPTS) are ignored if these are dict as they make dicts.
+_ENGINE_LOAD_OPTS = dict(orjson=[], ujson=[])
+_ENGINE_DUMP_OPTS = dict(orjson=["ensure_ascii", "indent", "separators",
+                                 "sort_keys", "default"],
+                         ujson=["ensure_ascii", "separators", "sort_keys"])
+
+_ENGINE_MODS = dict(stdlib=json)
+
+_INT_MIN = -2 ** 63  # orjson can only process 64-bit integers.
+_INT_MAX = 2 ** 64 - 1
+_LONG_NUM_RE = re.compile(r"\d{19}")
+
+
+def _import_engine(engine):
+    """
+    :param engine: Name of JSON library, one of JSON_ENGINES
+    :return: Module object of `engine` or None if it is not available
+
+    >>> _import_engine("stdlib") is json
+    True
+    >>> _import_engine("module_not_exist") is None
+    True
+    """
+    if engine not in _ENGINE_MODS:
+        try:
+            _ENGINE_MODS[engine] = importlib.import_module(engine)
+        except ImportError:
+            _ENGINE_MODS[engine] = None
+
+    return _ENGINE_MODS[engine]
+
+
+def _dumps_same_as_stdlib(engine, options):
+    """
+    :param engine: "orjson" or "ujson"
+    :param options: Keyword options to pass to dump functions
+    :return: True if `engine` dumps data in the same format as json does with
+        `options`
+
+    >>> _dumps_same_as_stdlib("orjson", {})
+    False
+    >>> _dumps_same_as_stdlib("orjson", dict(ensure_ascii=False, indent=2))
+    True
+    >>> _dumps_same_as_stdlib("ujson", dict(separators=(",", ":")))
+    True
+    """
+    if engine == "orjson" and options.get("ensure_ascii", True):
+        return False
+
+    seps = options.get("separators")
+    seps = None if seps is None else tuple(seps)
+    if options.get("indent") is not None:  # orjson only, by _ENGINE_DUMP_OPTS
+        return options["indent"] == 2 and seps in (None, (",", ": "))
+
+    return seps == (",", ":")
+
+
+def find_engine(ac_json_engine=None, options=None, dump=False):
+    """
+    Find the JSON library to load or dump data with given options.
+
+    :param ac_json_engine: One of JSON_ENGINES, "auto" or None ("stdlib")
+    :param options: Keyword options to pass to load or dump functions
+    :param dump: True to find the one to dump data
+    :return: Name of JSON library available to use
+    :raises: ValueError if `ac_json_engine` is unknown
+
+    >>> find_engine()
+    'stdlib'
+    >>> find_engine("orjson", dict(parse_int=int)) == "stdlib"
+    True
+    >>> find_engine("ujson", dict(object_hook=list)) == "stdlib"
+    True
+    """
+    if ac_json_engine is None or ac_json_engine == "stdlib":
+        return "stdlib"
+
+    if ac_json_engine == "auto":
+        engines = _AUTO_ENGINES
+    elif ac_json_engine in JSON_ENGINES:
+        engines = (ac_json_engine, "stdlib")
+    else:
+        raise ValueError("Unknown JSON engine: %s" % ac_json_engine)
+
+    opts = [k for k, v in (options or {}).items()
+            if v is not None and not (k in _DICT_OPTS and v is dict)]
+    eopts = _ENGINE_DUMP_OPTS if dump else _ENGINE_LOAD_OPTS
+    for engine in engines:
+        if engine == "stdlib":
+            break
+
+        if _import_engine(engine) is None:
+            LOGGER.debug("JSON engine is not available: %s", engine)
+            continue
+
+        unsupported = [o for o in opts
+                       if engine in eopts and o not in eopts[engine]]
+        if unsupported:
+            LOGGER.debug("JSON engine %s does not support options: %s",
+                         engine, ", ".join(unsupported))
+            continue
+
+        if (dump and engine in ("orjson", "ujson") and
+                not _dumps_same_as_stdlib(engine, options or {})):
+            LOGGER.debug("JSON engine %s dumps data in another format with "
+                         "the options given", engine)
+            continue
+
+        return engine
+
+    return "stdlib"
+
+
+def _has_special_values(obj):
+    """
+    :param obj: Object to dump
+    :return: True if `obj` contains values orjson or ujson dump in another
+        format than json does or cannot dump, that is, floats in exponent
+        notation, NaN, infinities and integers out of 64-bit range
+
+    >>> _has_special_values(dict(a=[1, 0.5, None], b="1e+16"))
+    False
+    >>> _has_special_values(dict(a=[1, dict(b=1e16)]))
+    True
+    >>> _has_special_values([float("nan")])
+    True
+    >>> _has_special_values({2 ** 64: 1})
+    True
+    """
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif isinstance(item, float):
+            if math.isnan(item) or math.isinf(item) or "e" in repr(item):
+                return True
+        elif isinstance(item, numbers.Integral):
+            if not _INT_MIN <= item <= _INT_MAX:
+                return True
+
+    return False
+
+
+def _fast_dumps(engine, obj, **options):
+    """
+    Dump `obj` with `engine`, or with json in python standard library if
+    `engine` dumps it in another format or cannot dump it.
+
+    :param engine: "orjson" or "ujson"
+    :param obj: Object to dump
+    :param options: Keyword options in _ENGINE_DUMP_OPTS[engine]
+    :return: JSON string
+    """
+    if _has_special_values(obj):
+        LOGGER.debug("JSON engine %s dumps some values in another format; "
+                     "use stdlib instead", engine)
+        return json.dumps(obj, **options)
+
+    mod = _import_engine(engine)
+    opts = dict((k, v) for k, v in options.items()
+                if v is not None and k != "separators")  # Checked.
+    try:
+        if engine == "ujson":
+            return mod.dumps(obj, escape_forward_slashes=False, **opts)
+
+        option = mod.OPT_NON_STR_KEYS
+        if opts.get("indent"):
+            option |= mod.OPT_INDENT_2
+        if opts.get("sort_keys"):
+            option |= mod.OPT_SORT_KEYS
+
+        return mod.dumps(obj, default=opts.get("default"),
+                         option=option).decode("utf-8")
+    except (TypeError, OverflowError) as exc:
+        LOGGER.debug("JSON engine %s failed to dump data: %s; "
+                     "use stdlib instead", engine, exc)
+        return json.dumps(obj, **options)
+
+
+def _fast_loads(engine, content, **options):
+    """
+    Load `content` with `engine`, or with json in python standard library if
+    `engine` may load it in another way or cannot load it.
+
+    :param engine: "orjson" or "ujson"
+    :param content: JSON string
+    :param options: Dict options in _DICT_OPTS
+    """
+    if engine == "orjson" and _LONG_NUM_RE.search(content):
+        LOGGER.debug("JSON engine %s may load some numbers as floats; "
+                     "use stdlib instead", engine)
+        return json.loads(content, **options)
+
+    try:
+        return _import_engine(engine).loads(content)
+    except ValueError as exc:
+        LOGGER.debug("JSON engine %s failed to load data: %s; "
+                     "use stdlib instead", engine, exc)
+        return json.loads(content, **options)
+
+
+def loads(content, ac_json_engine=None, **options):
+    """
+    Load JSON data from a string `content` with the JSON library selected.
+
+    :param content: JSON string
+    :param ac_json_engine: See :func:`find_engine`
+    :param options: Keyword options passed to json.loads
+    """
+    engine = find_engine(ac_json_engine, options)
+    if engine in _ENGINE_LOAD_OPTS:  # Options are dict options only.
+        return _fast_loads(engine, content, **options)
+
+    return _import_engine(engine).loads(content, **options)
+
+
+def load(stream, ac_json_engine=None, **options):
+    """
+    Load JSON data from a file or file-like object `stream` with the JSON
+    library selected.
+
+    :param stream: File or file-like object
+    :param ac_json_engine: See :func:`find_engine`
+    :param options: Keyword options passed to json.load
+    """
+    engine = find_engine(ac_json_engine, options)
+    if engine in _ENGINE_LOAD_OPTS:  # Do.
+        return _fast_loads(engine, stream.read(), **options)
+
+    return _import_engine(engine).load(stream, **options)
+
+
+def dumps(obj, ac_json_engine=None, **options):
+    """
+    Dump `obj` to a JSON string with the JSON library selected.
+
+    :param obj: Object to dump
+    :param ac_json_engine: See :func:`find_engine`
+    :param options: Keyword options passed to json.dumps
+    """
+    engine = find_engine(ac_json_engine, options, dump=True)
+    if engine in _ENGINE_DUMP_OPTS:
+        return _fast_dumps(engine, obj, **options)
+
+    return _import_engine(engine).dumps(obj, **options)
+
+
+def dump(obj, stream, ac_json_engine=None, **options):
+    """
+    Dump `obj` to a file or file-like object `stream` with the JSON library
+    selected.
+
+    :param obj: Object to dump
+    :param stream: File or file-like object
+    :param ac_json_engine: See :func:`find_engine`
+    :param options: Keyword options passed to json.dump
+    """
+    engine = find_engine(ac_json_engine, options, dump=True)
+    if engine in _ENGINE_DUMP_OPTS:
+        stream.write(_fast_dumps(engine, obj, **options))
+    else:
+        _import_engine(engine).dump(obj, stream, **options)
+
 
 class Parser(anyconfig.backend.base.StringStreamFnParser):
     """
@@ -58,14 +366,14 @@ class Parser(anyconfig.backend.base.StringStreamFnParser):
     """
     _type = "json"
     _extensions = ["json", "jsn", "js"]
-    _load_opts = _LOAD_OPTS
-    _dump_opts = _DUMP_OPTS
+    _load_opts = _LOAD_OPTS + ["ac_json_engine"]
+    _dump_opts = _DUMP_OPTS + ["ac_json_engine"]
     _ordered = not anyconfig.compat.IS_PYTHON_2_6
     _dict_opts = _DICT_OPTS
 
-    _load_from_string_fn = anyconfig.backend.base.to_method(json.loads)
-    _load_from_stream_fn = anyconfig.backend.base.to_method(json.load)
-    _dump_to_string_fn = anyconfig.backend.base.to_method(json.dumps)
-    _dump_to_stream_fn = anyconfig.backend.base.to_method(json.dump)
+    _load_from_string_fn = anyconfig.backend.base.to_method(loads)
+    _load_from_stream_fn = anyconfig.backend.base.to_method(load)
+    _dump_to_string_fn = anyconfig.backend.base.to_method(dumps)
+    _dump_to_stream_fn = anyconfig.backend.base.to_method(dump)
 
 # vim:sw=4:ts=4:et:
@@ -0,0 +1,284 @@
+#
+# Copyright (C) 2018 Satoru SATOH <ssato @ redhat.com>
+# License: MIT
+#
+r"""JSON Lines backend:
+
+- Format to support: JSON Lines (a.k.a. NDJSON), http://jsonlines.org,
+  http://ndjson.org
+- Requirements: json in python standard library (>= python 2.6) or simplejson
+- Development Status :: 4 - Beta
+- Limitations:
+
+  - Each record, a JSON value in a line, is merged into a mapping object on
+    load. Records which are not JSON objects cannot be merged and are skipped
+    with warnings. Use :meth:`Parser.load_iter` or :func:`anyconfig.load_iter`
+    to get all records one by one instead.
+
+  - Data to dump must be a mapping object or a list of records.
+
+- Special options:
+
+  - All options of the JSON backend except for 'indent' should work. See
+    :mod:`anyconfig.backend.json`.
+
+  - ac_jsonl_merge: Strategy to merge records loaded. See the doc of
+    :mod:`anyconfig.dicts` for more details of strategies. The default is
+    anyconfig.dicts.MS_DICTS. It's not ac_merge, the strategy to merge results
+    of multiple files with :func:`anyconfig.api.load`.
+
+  - ac_jsonl_decode_workers: Number of worker processes to decode records in
+    parallel. Records are decoded in the main process if this is not given or
+    less than 2. Options given must be picklable if this is given.
+
+  - ac_jsonl_decode_chunksize: Number of lines each worker process decodes at
+    once, 1000 by default.
+
+Changelog:
+
+.. versionadded:: 0.9.5
+"""
+from __future__ import absolute_import
+
+import itertools
+import logging
+import os.path
+
+import anyconfig.backend.base
+import anyconfig.backend.json
+import anyconfig.compat
+import anyconfig.dicts
+import anyconfig.utils
+
+
+LOGGER = logging.getLogger(__name__)
+
+_DECODE_CHUNKSIZE = 1000
+_MERGE_BATCHSIZE = 1000  # Number of records merged at once.
+
+
+def _decode_lines(args):
+    """
+    Decode records in the lines. It's called in worker processes.
+
+    :param args: A tuple of (a list of lines, options passed to json.loads)
+    :return: A list of records decoded
+
+    >>> _decode_lines((['{"a": 1}', '', '[2]'], {}))
+    [{'a': 1}, [2]]
+    """
+    (lines, options) = args
+    return [anyconfig.backend.json.loads(line, **options) for line in lines
+            if line.strip()]
+
+
+def _iter_chunks(iterable, size):
+    """
+    :param iterable: An iterable object such as a file object
+    :param size: Max number of items in each chunk
+    :return: A generator yields lists of items in `iterable`
+
+    >>> list(_iter_chunks(range(5), 2))
+    [[0, 1], [2, 3], [4]]
+    """
+    itr = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(itr, size))
+        if not chunk:
+            break
+        yield chunk
+
+
+def _iter_records_in_parallel(stream, workers,
+                              chunksize=_DECODE_CHUNKSIZE, **options):
+    """
+    Decode records in `stream` in worker processes. Only some chunks of lines
+    are read at once to keep memory usage constant.
+
+    :param stream: A file or file-like object
+    :param workers: Number of worker processes
+    :param chunksize: Number of lines each worker process decodes at once
+    :param options: Keyword options passed to json.loads
+
+    :return: A generator yields records in the same order as in `stream`
+    """
+    import multiprocessing  # Import it only when needed.
+
+    chunks = _iter_chunks(stream, chunksize)
+    pool = multiprocessing.Pool(workers)
+    try:
+        while True:
+            batch = [(c, options) for c in
+                     itertools.islice(chunks, workers * 2)]
+            if not batch:
+                break
+
+            for records in pool.map(_decode_lines, batch):
+                for record in records:
+                    yield record
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def iter_records(stream, ac_jsonl_decode_workers=None,
+                 ac_jsonl_decode_chunksize=None, **options):
+    r"""
+    Decode records, JSON values in each line, in `stream` one by one.
+
+    :param stream: A file or file-like object
+    :param ac_jsonl_decode_workers: Number of worker processes or None
+    :param ac_jsonl_decode_chunksize:
+        Number of lines each worker process decodes at once or None
+    :param options: Keyword options passed to json.loads
+
+    :return: A generator yields records
+
+    >>> strm = anyconfig.compat.StringIO('{"a": 1}\n\n{"b": [2]}\n')
+    >>> list(iter_records(strm))
+    [{'a': 1}, {'b': [2]}]
+    """
+    if ac_jsonl_decode_workers and ac_jsonl_decode_workers > 1:
+        chunksize = ac_jsonl_decode_chunksize or _DECODE_CHUNKSIZE
+        for record in _iter_records_in_parallel(stream,
+                                                ac_jsonl_decode_workers,
+                                                chunksize, **options):
+            yield record
+    else:
+        for line in stream:
+            if line.strip():
+                yield anyconfig.backend.json.loads(line, **options)
+
+
+def merge_records(records, container=dict,
+                  ac_merge=anyconfig.dicts.MS_DICTS, **options):
+    """
+    Merge records into a mapping object. Records are merged in batches as
+    these are decoded, so that only some of them are kept at once.
+
+    :param records: An iterable yields records
+    :param container: callble to make a container object
+    :param ac_merge: Strategy to merge records
+    :param options: Keyword options passed to :func:`anyconfig.dicts.merge`
+
+    :return: <container> object
+
+    >>> merge_records([{"a": 1, "b": {"c": 2}}, {"b": {"d": 3}}, [4]])
+    {'a': 1, 'b': {'c': 2, 'd': 3}}
+    """
+    cnf = container()
+    for batch in _iter_chunks(records, _MERGE_BATCHSIZE):
+        dicts = [cnf]
+        for record in batch:
+            if anyconfig.utils.is_dict_like(record):
+                dicts.append(record)
+            else:
+                LOGGER.warning("Record is not a JSON object: %r", record)
+
+        anyconfig.dicts.merge_many(dicts, ac_merge=ac_merge, **options)
+
+    return cnf
+
+
+def _records_to_dump(cnf):
+    """
+    :param cnf: A mapping object or a list of records
+    :return: A list of records to dump
+    """
+    return cnf if anyconfig.utils.is_list_like(cnf) else [cnf]
+
+
+class Parser(anyconfig.backend.json.Parser):
+    """
+    Parser for JSON Lines files.
+    """
+    _type = "jsonl"
+    _extensions = ["jsonl", "ndjson"]
+    _load_opts = anyconfig.backend.json.Parser._load_opts + \
+        ["ac_jsonl_merge", "ac_jsonl_decode_workers",
+         "ac_jsonl_decode_chunksize"]
+    _dump_opts = [o for o in anyconfig.backend.json.Parser._dump_opts
+                  if o != "indent"]  # Each record must be in a line.
+
+    def load_from_string(self, content, container, **options):
+        """
+        Load records from given string `content` and merge them.
+
+        :param content: JSON Lines string
+        :param container: callble to make a container object
+        :param options: keyword options passed to json.loads and others
+
+        :return: container object holding records merged
+        """
+        return self.load_from_stream(anyconfig.compat.StringIO(content),
+                                     container, **options)
+
+    def load_from_stream(self, stream, container, **options):
+        """
+        Load records from given stream `stream` and merge them.
+
+        :param stream: A file or file-like object
+        :param container: callble to make a container object
+        :param options: keyword options passed to json.loads and others
+
+        :return: container object holding records merged
+        """
+        ac_merge = options.pop("ac_jsonl_merge", anyconfig.dicts.MS_DICTS)
+        return merge_records(iter_records(stream, **options),
+                             container=container, ac_merge=ac_merge)
+
+    def load_iter(self, path_or_stream, ignore_missing=False, **options):
+        """
+        Load records from a file path or a file / file-like object
+        `path_or_stream` one by one.
+
+        :param path_or_stream: JSON Lines file path or file{,-like} object
+        :param ignore_missing:
+            Ignore and yield nothing if given `path_or_stream` is a file path
+            does not exist.
+        :param options: See :meth:`~anyconfig.backend.base.Parser.load`
+
+        :return: A generator yields records
+        """
+        container = self._container_factory(**options)
+        factory = anyconfig.backend.base.mutable_container(container)
+        options = self._load_options(factory, **options)
+        options.pop("ac_jsonl_merge", None)
+
+        if isinstance(path_or_stream, anyconfig.compat.STR_TYPES):
+            if ignore_missing and not os.path.exists(path_or_stream):
+                return
+            with self.ropen(path_or_stream) as inp:
+                for record in iter_records(inp, **options):
+                    yield anyconfig.backend.base.maybe_frozen(record,
+                                                              container)
+        else:
+            for record in iter_records(path_or_stream, **options):
+                yield anyconfig.backend.base.maybe_frozen(record, container)
+
+    def dump_to_string(self, cnf, **options):
+        """
+        Dump a mapping object or a list of records `cnf` to a string.
+
+        :param cnf: A mapping object or a list of records
+        :param options: keyword options passed to json.dumps
+
+        :return: JSON Lines string
+        """
+        return ''.join(anyconfig.backend.json.dumps(r, **options) + '\n'
+                       for r in _records_to_dump(cnf))
+
+    def dump_to_stream(self, cnf, stream, **options):
+        """
+        Dump a mapping object or a list of records `cnf` to a file or
+        file-like object `stream`.
+
+        :param cnf: A mapping object or a list of records
+        :param stream: A file or file-like object
+        :param options: keyword options passed to json.dumps
+        """
+        for record in _records_to_dump(cnf):
+            stream.write(anyconfig.backend.json.dumps(record, **options))
+            stream.write('\n')
+
+# vim:sw=4:ts=4:et:
@@ -41,6 +41,27 @@ r"""XML backend:
 
 Changelog:
 
+.. versionchanged:: 0.9.5
+
+   - Load XML data in a single pass with ET.iterparse and clear processed
+     elements to keep memory usage low, and namespaces are also processed
+     in the same pass instead of parsing XML data twice.
+   - Convert elements to containers and vice versa with explicit stacks
+     instead of recursive calls to process deeply nested data.
+   - Dump XML data incrementally with xml.sax.saxutils.XMLGenerator instead
+     of building the whole ElementTree before writing it. The output is
+     equivalent but not same byte by byte as before: the XML declaration is
+     double-quoted, empty elements are written as '<a/>' instead of '<a />'
+     and attribute values contain '"' are single-quoted instead of escaping
+     '"' to '&quot;'.
+   - Removed etree_write, flip and _namespaces_from_file not used any more.
+     :func:`container_to_etree` and :func:`container_to_stream` share the
+     same traversal of containers.
+   - Add :meth:`Parser.load_iter` to load the children of the root element
+     one by one as records.
+   - Add :meth:`Parser.load_subtree` to convert only the elements on given
+     path, e.g. with simple ac_query expressions.
+
 .. versionchanged:: 0.8.2
 
    - Add special options, tags, merge_attrs and ac_parse_value
@@ -60,7 +81,9 @@ from __future__ import absolute_import
 from io import BytesIO
 
 import operator
+import os.path
 import re
+import xml.sax.saxutils
 try:
     import xml.etree.cElementTree as ET
 except ImportError:
@@ -70,6 +93,7 @@ except ImportError:
 
 import anyconfig.backend.base
 import anyconfig.compat
+import anyconfig.query
 import anyconfig.utils
 import anyconfig.parser
 
@@ -78,32 +102,32 @@ _TAGS = dict(attrs="@attrs", text="@text", children="@children")
 _ET_NS_RE = re.compile(r"^{(\S+)}(\S+)$")
 
 
-def _iterparse(xmlfile):
+def _iterparse(xmlfile, events=("start-ns", )):
     """
     Avoid bug in python 3.{2,3}. See http://bugs.python.org/issue9257.
 
     :param xmlfile: XML file or file-like object
+    :param events: A tuple of the names of events to report
     """
     try:
-        return ET.iterparse(xmlfile, events=("start-ns", ))
+        return ET.iterparse(xmlfile, events=events)
     except TypeError:
-        return ET.iterparse(xmlfile, events=(b"start-ns", ))
+        return ET.iterparse(xmlfile,
+                            events=tuple(e.encode("ascii") for e in events))
 
 
-def flip(tpl):
-    """
-    >>> flip((1, 2))
-    (2, 1)
+def _event_name(event):
     """
-    return (tpl[1], tpl[0])
+    :param event: Event name reported by ET.iterparse, str or bytes
 
-
-def _namespaces_from_file(xmlfile):
-    """
-    :param xmlfile: XML file or file-like object
-    :return: {namespace_uri: namespace_prefix} or {}
+    >>> _event_name("start")
+    'start'
+    >>> _event_name(b"end")
+    'end'
     """
-    return dict(flip(t) for _, t in _iterparse(xmlfile))
+    if isinstance(event, bytes):
+        return event.decode("ascii")
+    return event
 
 
 def _tweak_ns(tag, **options):
@@ -183,21 +207,27 @@ def _parse_text(val, **options):
     return val
 
 
-def _process_elem_text(elem, dic, subdic, text="@text", **options):
+def _process_elem_text(elem, dic, subdic, text="@text", nchildren=None,
+                       **options):
     """
     :param elem: ET Element object which has elem.text
     :param dic: <container> (dict[-like]) object converted from elem
     :param subdic: Sub <container> object converted from elem
+    :param nchildren:
+        Number of children of elem or None to count them from elem itself
     :param options:
         Keyword options, see the description of :func:`elem_to_container` for
         more details.
 
     :return: None but updating elem.text, dic and subdic as side effects
     """
+    if nchildren is None:
+        nchildren = len(elem)
+
     elem.text = elem.text.strip()
     if elem.text:
         etext = _parse_text(elem.text, **options)
-        if len(elem) or elem.attrib:
+        if nchildren or elem.attrib:
             subdic[text] = etext
         else:
             dic[elem.tag] = etext  # Only text, e.g. <a>text</a>
@@ -218,40 +248,49 @@ def _parse_attrs(elem, container=dict, **options):
 
 
 def _process_elem_attrs(elem, dic, subdic, container=dict, attrs="@attrs",
-                        **options):
+                        nchildren=None, **options):
     """
     :param elem: ET Element object or None
     :param dic: <container> (dict[-like]) object converted from elem
     :param subdic: Sub <container> object converted from elem
+    :param nchildren:
+        Number of children of elem or None to count them from elem itself
     :param options:
         Keyword options, see the description of :func:`elem_to_container` for
         more details.
 
     :return: None but updating dic and subdic as side effects
     """
+    if nchildren is None:
+        nchildren = len(elem)
+
     adic = _parse_attrs(elem, container=container, **options)
-    if not elem.text and not len(elem) and options.get("merge_attrs"):
+    if not elem.text and not nchildren and options.get("merge_attrs"):
         dic[elem.tag] = adic
     else:
         subdic[attrs] = adic
 
 
 def _process_children_elems(elem, dic, subdic, container=dict,
-                            children="@children", **options):
+                            children="@children", cdics=None, **options):
     """
     :param elem: ET Element object or None
     :param dic: <container> (dict[-like]) object converted from elem
     :param subdic: Sub <container> object converted from elem
     :param container: callble to make a container object
     :param children: Tag for children nodes
+    :param cdics:
+        A list of <container> objects converted from children of elem already
+        or None to convert them from elem itself
     :param options:
         Keyword options, see the description of :func:`elem_to_container` for
         more details.
 
     :return: None but updating dic and subdic as side effects
     """
-    cdics = [elem_to_container(c, container=container, **options)
-             for c in elem]
+    if cdics is None:
+        cdics = [elem_to_container(c, container=container, **options)
+                 for c in elem]
     merge_attrs = options.get("merge_attrs", False)
     sdics = [container(elem.attrib) if merge_attrs else subdic] + cdics
 
@@ -275,6 +314,9 @@ def elem_to_container(elem, container=dict, **options):
     - There is only text element
     - There are only children elements each has unique keys among all
 
+    Elements are converted in post-order with an explicit stack instead of
+    recursive calls so that deeply nested elements can be processed.
+
     :param elem: ET Element object or None
     :param container: callble to make a container object
     :param options: Keyword options
@@ -284,22 +326,82 @@ def elem_to_container(elem, container=dict, **options):
         - merge_attrs: Merge attributes and mix with children nodes, and the
           information of attributes are lost after its transformation.
     """
-    dic = container()
     if elem is None:
-        return dic
+        return container()
+
+    opts = _make_options(container=container, **options)
+    stack = [(elem, iter(elem), [])]
+    while True:
+        (elem, citr, cdics) = stack[-1]
+        child = next(citr, None)
+        if child is not None:
+            stack.append((child, iter(child), []))
+            continue
+
+        stack.pop()
+        dic = _make_container(elem, cdics, opts)
+        if not stack:
+            return dic
+
+        stack[-1][2].append(dic)
+
+
+def _make_options(container=dict, **options):
+    """
+    Make options to convert elements from keyword options only once before
+    converting elements.
+
+    :param container: callble to make a container object
+    :param options:
+        Keyword options, see the description of :func:`elem_to_container` for
+        more details.
+
+    :return: A dict of options to pass to :func:`_make_container`
+
+    >>> opts = _make_options(tags=dict(text="#text"))
+    >>> (opts["attrs"], opts["text"], opts["merge_attrs"])
+    ('@attrs', '#text', False)
+    """
+    options = _complement_tag_options(options)
+    return dict(container=container, nspaces=options.get("nspaces", None),
+                attrs=options["attrs"], text=options["text"],
+                children=options["children"],
+                merge_attrs=options.get("merge_attrs", False),
+                ac_parse_value=options.get("ac_parse_value", False))
 
-    elem.tag = _tweak_ns(elem.tag, **options)  # {ns}tag -> ns_prefix:tag
+
+def _make_container(elem, cdics, opts):
+    """
+    Convert a XML ElementTree Element to a container object from the element
+    itself and the container objects converted from its children already.
+
+    Children of elem are not looked up at all so that they may be removed
+    from elem before calling this.
+
+    :param elem: ET Element object
+    :param cdics: A list of <container> objects converted from its children
+    :param opts: A dict of options made by :func:`_make_options`
+    """
+    (container, nspaces, pval) = (opts["container"], opts["nspaces"],
+                                  opts["ac_parse_value"])
+    dic = container()
+    elem.tag = _tweak_ns(elem.tag, nspaces=nspaces)  # {ns}tag -> prefix:tag
     subdic = dic[elem.tag] = container()
-    options["container"] = container
 
     if elem.text:
-        _process_elem_text(elem, dic, subdic, **options)
+        _process_elem_text(elem, dic, subdic, text=opts["text"],
+                           nchildren=len(cdics), ac_parse_value=pval)
 
     if elem.attrib:
-        _process_elem_attrs(elem, dic, subdic, **options)
-
-    if len(elem):
-        _process_children_elems(elem, dic, subdic, **options)
+        _process_elem_attrs(elem, dic, subdic, container=container,
+                            attrs=opts["attrs"], nchildren=len(cdics),
+                            nspaces=nspaces, ac_parse_value=pval,
+                            merge_attrs=opts["merge_attrs"])
+
+    if cdics:
+        _process_children_elems(elem, dic, subdic, container=container,
+                                children=opts["children"], cdics=cdics,
+                                merge_attrs=opts["merge_attrs"])
     elif not elem.text and not elem.attrib:  # ex. <tag/>.
         dic[elem.tag] = None
 
@@ -325,6 +427,15 @@ def _complement_tag_options(options):
     return options
 
 
+def _set_ns_attrs(elem, nspaces):
+    """
+    :param elem: ET Element object, the root element usually
+    :param nspaces: A namespaces dict, {uri: prefix}
+    """
+    for uri, prefix in nspaces.items():
+        elem.attrib["xmlns:" + prefix if prefix else "xmlns"] = uri
+
+
 def root_to_container(root, container=dict, nspaces=None, **options):
     """
     Convert XML ElementTree Root Element to a collection of container objects.
@@ -342,13 +453,125 @@ def root_to_container(root, container=dict, nspaces=None, **options):
         return tree
 
     if nspaces is not None:
-        for uri, prefix in nspaces.items():
-            root.attrib["xmlns:" + prefix if prefix else "xmlns"] = uri
+        _set_ns_attrs(root, nspaces)
 
     return elem_to_container(root, container=container, nspaces=nspaces,
                              **_complement_tag_options(options))
 
 
+def _iterparse_to_containers(xmlfile, container=dict, depth=0,
+                             path_tags=None, **options):
+    """
+    Load XML data from `xmlfile` and yield container objects converted from
+    elements at given `depth` in a single pass.
+
+    Elements are converted and cleared in the order of their ends reported by
+    ET.iterparse so that the whole XML ElementTree is never kept in memory
+    and namespaces are collected in the same pass.
+
+    If `path_tags` is given, elements at depth N of which tags are not
+    path_tags[N] and their descendants are not converted and converted as
+    empty elements instead, to keep the structure of the container objects to
+    load the subtree under the elements of `path_tags` only.
+
+    :param xmlfile: XML file path or file-like object
+    :param container: callble to make a container object
+    :param depth: Depth of elements to yield, 0 (root) or 1 (its children)
+    :param path_tags:
+        A list of tags of elements to convert at each depth or None
+    :param options: Keyword options, see :func:`root_to_container`
+
+    :return: A generator yields <container> objects
+    """
+    nspaces = {}
+    opts = _make_options(container=container, nspaces=nspaces, **options)
+    elems = []  # Stack of the ancestors of the current element.
+    cdicss = [[]]  # Stack of the lists of converted children of ancestors.
+    skip = None  # Depth of the element being skipped.
+    ntags = len(path_tags) if path_tags else 0
+
+    for event, elem in _iterparse(xmlfile, ("start-ns", "start", "end")):
+        event = _event_name(event)
+        if event == "start-ns":
+            (prefix, uri) = elem
+            nspaces[uri] = prefix
+        elif event == "start":
+            if skip is None and len(elems) < ntags and \
+                    _tweak_ns(elem.tag,
+                              nspaces=nspaces) != path_tags[len(elems)]:
+                skip = len(elems)
+            elems.append(elem)
+            cdicss.append([])
+        else:  # "end"
+            elems.pop()
+            cdics = cdicss.pop()
+            if skip is not None and len(elems) == skip:
+                # Convert it as an empty element.
+                (skip, cdics) = (None, [])
+                elem.clear()
+
+            if skip is not None:  # Descendants of the element being skipped.
+                pass
+            elif len(elems) == depth:
+                if not elems:  # The root element.
+                    _set_ns_attrs(elem, nspaces)
+                yield _make_container(elem, cdics, opts)
+            elif len(elems) > depth:
+                cdicss[-1].append(_make_container(elem, cdics, opts))
+
+            elem.clear()
+            if elems:
+                # Previous siblings were already removed and elem must be the
+                # first child of its parent.
+                del elems[-1][0]
+
+
+def iterparse_to_container(xmlfile, container=dict, **options):
+    """
+    Load XML data from `xmlfile` and convert it to a collection of container
+    objects in a single pass. See also :func:`_iterparse_to_containers`.
+
+    :param xmlfile: XML file path or file-like object
+    :param container: callble to make a container object
+    :param options: Keyword options, see :func:`root_to_container`
+
+    :return: <container> object
+
+    >>> from io import BytesIO
+    >>> xml = b'<a xmlns:v="urn:v" id="0"><v:b>1</v:b><v:b>2</v:b></a>'
+    >>> cnf = iterparse_to_container(BytesIO(xml))
+    >>> sorted(cnf["a"]["@attrs"].items())
+    [('id', '0'), ('xmlns:v', 'urn:v')]
+    >>> cnf["a"]["@children"]
+    [{'v:b': '1'}, {'v:b': '2'}]
+    """
+    for cnf in _iterparse_to_containers(xmlfile, container, **options):
+        return cnf
+
+    return container()
+
+
+def iterparse_children(xmlfile, container=dict, **options):
+    """
+    Load XML data from `xmlfile` and yield container objects converted from
+    the children of the root element one by one, e.g. records of XML data.
+    The root element itself is not converted and its attributes and text are
+    lost.
+
+    :param xmlfile: XML file path or file-like object
+    :param container: callble to make a container object
+    :param options: Keyword options, see :func:`root_to_container`
+
+    :return: A generator yields <container> objects
+
+    >>> from io import BytesIO
+    >>> xml = b'<a><b id="0">x</b><b id="1">y</b></a>'
+    >>> [c["b"]["@attrs"]["id"] for c in iterparse_children(BytesIO(xml))]
+    ['0', '1']
+    """
+    return _iterparse_to_containers(xmlfile, container, depth=1, **options)
+
+
 def _to_str_fn(**options):
     """
     :param options: Keyword options might have 'ac_parse_value' key
@@ -357,53 +580,167 @@ def _to_str_fn(**options):
     return str if options.get("ac_parse_value") else anyconfig.utils.noop
 
 
-def _elem_set_attrs(obj, parent, to_str):
+_ATC = ("attrs", "text", "children")
+_START, _END = ("start", "end")
+
+
+def _elem_sources(val):
     """
-    :param obj: Container instance gives attributes of XML Element
-    :param parent: XML ElementTree parent node object
-    :param to_str: Callable to convert value to string or None
-    :param options: Keyword options, see :func:`container_to_etree`
+    :param val: Value of a node, dict-like object, list of them or a scalar
+    :return: A list of objects to make attributes, text and children of the
+        element of the node
+    """
+    return val if anyconfig.utils.is_iterable(val) else [val]
 
-    :return: None but parent will be modified
+
+def _check_str(val):
+    """
+    :param val: Value converted to string to write
+    :return: `val`
+    :raises: TypeError if `val` is not a string as ElementTree does
+
+    >>> _check_str("a")
+    'a'
+    >>> _check_str(1)  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    TypeError: cannot serialize 1 (type int)
     """
-    for attr, val in anyconfig.compat.iteritems(obj):
-        parent.set(attr, to_str(val))
+    if not isinstance(val, anyconfig.compat.STR_TYPES):
+        raise TypeError("cannot serialize %r (type %s)" %
+                        (val, type(val).__name__))
+    return val
 
 
-def _elem_from_descendants(children_nodes, **options):
+def _elem_attrs_and_text(srcs, to_str, tags):
     """
-    :param children_nodes: A list of child dict objects
-    :param options: Keyword options, see :func:`container_to_etree`
+    :param srcs:
+        A list of objects to make an element, see :func:`_elem_sources`
+    :param to_str: Callable to convert value to string
+    :param tags: A tuple of tags for attributes, text and children nodes
+
+    :return: A tuple of (attributes :: dict, text or None) of the element
+
+    >>> srcs = [{"@attrs": {"a": 1}, "@text": 2}, {"@attrs": {"b": 3}}]
+    >>> (attrs, text) = _elem_attrs_and_text(srcs, str, ("@attrs", "@text",
+    ...                                                  "@children"))
+    >>> (sorted(attrs.items()), text)
+    ([('a', '1'), ('b', '3')], '2')
     """
-    for child in children_nodes:  # child should be a dict-like object.
-        for ckey, cval in anyconfig.compat.iteritems(child):
-            celem = ET.Element(ckey)
-            container_to_etree(cval, parent=celem, **options)
-            yield celem
+    (attrs, text) = (anyconfig.compat.OrderedDict(), None)
+    for src in srcs:
+        if not anyconfig.utils.is_dict_like(src):
+            if src:
+                text = to_str(src)  # It's a leaf text node.
+            continue
+
+        for key, val in anyconfig.compat.iteritems(src):
+            if key == tags[0]:
+                attrs.update((k, to_str(v))
+                             for k, v in anyconfig.compat.iteritems(val))
+            elif key == tags[1]:
+                text = to_str(val)
+
+    return (attrs, text)
+
 
+def _iter_elem_children(srcs, tags):
+    """
+    :param srcs:
+        A list of objects to make an element, see :func:`_elem_sources`
+    :param tags: A tuple of tags for attributes, text and children nodes
 
-def _get_or_update_parent(key, val, to_str, parent=None, **options):
+    :return: A generator yields (name, srcs) pairs of children elements
     """
-    :param key: Key of current child (dict{,-like} object)
-    :param val: Value of current child (dict{,-like} object or [dict{,...}])
+    for src in srcs:
+        if not anyconfig.utils.is_dict_like(src):
+            continue
+
+        for key, val in anyconfig.compat.iteritems(src):
+            if key == tags[2]:
+                for child in val:  # child should be a dict-like object.
+                    for ckey, cval in anyconfig.compat.iteritems(child):
+                        yield (ckey, [cval])
+            elif key not in tags[:2]:
+                yield (key, _elem_sources(val))
+
+
+def _top_elem_sources(obj, tags):
+    """
+    :param obj: Container instance to convert to
+    :param tags: A tuple of tags for attributes, text and children nodes
+
+    :return: A tuple of (name, srcs) of the top level element or None if it
+        was not found. The first node in the top level other than special
+        ones is the top level element, and others are attached to it.
+
+    >>> _top_elem_sources({"a": "A"}, ("@attrs", "@text", "@children"))
+    ('a', ['A', OrderedDict()])
+    """
+    items = list(anyconfig.compat.iteritems(obj))
+    for idx, (key, val) in enumerate(items):
+        if key not in tags:
+            rest = anyconfig.compat.OrderedDict(items[:idx] + items[idx + 1:])
+            return (key, _elem_sources(val) + [rest])
+
+    return None
+
+
+def _iter_elem_events(name, srcs, to_str, tags):
+    """
+    Traverse the element `name` and its descendants made from `srcs` with an
+    explicit stack instead of recursive calls, and yield events to make them.
+
+    :param name: Name of the element
+    :param srcs:
+        A list of objects to make the element, see :func:`_elem_sources`
     :param to_str: Callable to convert value to string
-    :param parent: XML ElementTree parent node object or None
-    :param options: Keyword options, see :func:`container_to_etree`
+    :param tags: A tuple of tags for attributes, text and children nodes
+
+    :return: A generator yields tuples of (_START, name, attributes, text) on
+        the start of elements and (_END, name, None, None) on the end
+
+    >>> tags = ("@attrs", "@text", "@children")
+    >>> [evt[:2] for evt in _iter_elem_events("a", [{"b": "B"}], str, tags)]
+    [('start', 'a'), ('start', 'b'), ('end', 'b'), ('end', 'a')]
     """
-    elem = ET.Element(key)
+    names = []  # Stack of the names of elements opened.
+    stack = [iter([(name, srcs)])]
+    while stack:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+            if names:
+                yield (_END, names.pop(), None, None)
+            continue
+
+        (name, srcs) = item
+        (attrs, text) = _elem_attrs_and_text(srcs, to_str, tags)
+        yield (_START, name, attrs, text)
 
-    vals = val if anyconfig.utils.is_iterable(val) else [val]
-    for val_ in vals:
-        container_to_etree(val_, parent=elem, to_str=to_str, **options)
+        names.append(name)
+        stack.append(_iter_elem_children(srcs, tags))
 
-    if parent is None:  # 'elem' is the top level etree.
-        return elem
 
-    parent.append(elem)
-    return parent
+def _events_to_elem(events):
+    """
+    :param events: An iterable yields events, see :func:`_iter_elem_events`
+    :return: XML ElementTree element object made from `events`
+    """
+    (root, elems) = (None, [])
+    for event, name, attrs, text in events:
+        if event == _END:
+            elems.pop()
+            continue
 
+        elem = ET.Element(name, attrs)
+        elem.text = text
+        if elems:
+            elems[-1].append(elem)
+        else:
+            root = elem
+        elems.append(elem)
 
-_ATC = ("attrs", "text", "children")
+    return root
 
 
 def container_to_etree(obj, parent=None, to_str=None, **options):
@@ -426,39 +763,84 @@ def container_to_etree(obj, parent=None, to_str=None, **options):
             parent.text = to_str(obj)  # Parent is a leaf text node.
         return parent  # All attributes and text should be set already.
 
-    options = _complement_tag_options(options)
-    (attrs, text, children) = operator.itemgetter(*_ATC)(options)
-
-    for key, val in anyconfig.compat.iteritems(obj):
-        if key == attrs:
-            _elem_set_attrs(val, parent, to_str)
-        elif key == text:
-            parent.text = to_str(val)
-        elif key == children:
-            for celem in _elem_from_descendants(val, **options):
-                parent.append(celem)
-        else:
-            parent = _get_or_update_parent(key, val, to_str, parent=parent,
-                                           **options)
+    tags = operator.itemgetter(*_ATC)(_complement_tag_options(options))
+    if parent is None:
+        top = _top_elem_sources(obj, tags)
+        if top is not None:
+            parent = _events_to_elem(_iter_elem_events(top[0], top[1],
+                                                       to_str, tags))
+        return ET.ElementTree(parent)
+
+    (attrs, text) = _elem_attrs_and_text([obj], to_str, tags)
+    for attr, val in anyconfig.compat.iteritems(attrs):
+        parent.set(attr, val)
+    if text is not None:
+        parent.text = text
+
+    for name, srcs in _iter_elem_children([obj], tags):
+        parent.append(_events_to_elem(_iter_elem_events(name, srcs, to_str,
+                                                        tags)))
 
     return ET.ElementTree(parent)
 
 
-def etree_write(tree, stream):
+def _make_xml_generator(stream):
     """
-    Write XML ElementTree `root` content into `stream`.
+    :param stream: File or file-like object can write to
+    :return: xml.sax.saxutils.XMLGenerator object writes to `stream`
+    """
+    try:
+        return xml.sax.saxutils.XMLGenerator(stream, encoding="UTF-8",
+                                             short_empty_elements=True)
+    except TypeError:  # python < 3.2
+        return xml.sax.saxutils.XMLGenerator(stream, encoding="UTF-8")
+
 
-    .. note:
-       It seems that ET.ElementTree.write() cannot process a parameter
-       'xml_declaration' in python 2.6.
+def container_to_stream(obj, stream, to_str=None, **options):
+    """
+    Convert a dict-like object to XML and write it into `stream`
+    incrementally, without building the whole ElementTree in memory. The
+    elements are same as the ones made by :func:`container_to_etree`.
 
-    :param tree: XML ElementTree object
+    :param obj: Container instance to convert to
     :param stream: File or file-like object can write to
+    :param to_str: Callable to convert value to string or None
+    :param options: Keyword options, see :func:`container_to_etree`
+    :raises: ValueError if no top level element was found in `obj`, and
+        TypeError if values are not strings after converted with `to_str`
+
+    >>> from io import BytesIO
+    >>> out = BytesIO()
+    >>> obj = {"a": {"@attrs": {"x": "X"}, "@children": [{"b": "b"}]}}
+    >>> container_to_stream(obj, out)
+    >>> out.getvalue().endswith(b'<a x="X"><b>b</b></a>')
+    True
     """
-    if anyconfig.compat.IS_PYTHON_2_6:
-        tree.write(stream, encoding='UTF-8')
-    else:
-        tree.write(stream, encoding='UTF-8', xml_declaration=True)
+    if to_str is None:
+        to_str = _to_str_fn(**options)
+
+    tags = operator.itemgetter(*_ATC)(_complement_tag_options(options))
+    top = _top_elem_sources(obj, tags)
+    if top is None:
+        raise ValueError("No top level element was found in: %r" % obj)
+
+    gen = _make_xml_generator(stream)
+    gen.startDocument()
+    for event, name, attrs, text in _iter_elem_events(top[0], top[1], to_str,
+                                                      tags):
+        if event == _END:
+            gen.endElement(name)
+            continue
+
+        for val in attrs.values():
+            _check_str(val)
+        gen.startElement(name, attrs)
+        if text is not None:
+            _check_str(text)
+        if text:
+            gen.characters(text)
+
+    gen.endDocument()
 
 
 class Parser(anyconfig.backend.base.Parser,
@@ -484,14 +866,11 @@ class Parser(anyconfig.backend.base.Parser,
 
         :return: Dict-like object holding config parameters
         """
-        root = ET.fromstring(content)
-        if anyconfig.compat.IS_PYTHON_3:
+        if anyconfig.compat.IS_PYTHON_3 and isinstance(content, bytes):
             stream = BytesIO(content)
         else:
             stream = anyconfig.compat.StringIO(content)
-        nspaces = _namespaces_from_file(stream)
-        return root_to_container(root, container=container,
-                                 nspaces=nspaces, **opts)
+        return iterparse_to_container(stream, container=container, **opts)
 
     def load_from_path(self, filepath, container, **opts):
         """
@@ -501,10 +880,7 @@ class Parser(anyconfig.backend.base.Parser,
 
         :return: Dict-like object holding config parameters
         """
-        root = ET.parse(filepath).getroot()
-        nspaces = _namespaces_from_file(filepath)
-        return root_to_container(root, container=container,
-                                 nspaces=nspaces, **opts)
+        return iterparse_to_container(filepath, container=container, **opts)
 
     def load_from_stream(self, stream, container, **opts):
         """
@@ -514,11 +890,72 @@ class Parser(anyconfig.backend.base.Parser,
 
         :return: Dict-like object holding config parameters
         """
-        root = ET.parse(stream).getroot()
-        path = anyconfig.utils.get_path_from_stream(stream)
-        nspaces = _namespaces_from_file(path)
-        return root_to_container(root, container=container,
-                                 nspaces=nspaces, **opts)
+        return iterparse_to_container(stream, container=container, **opts)
+
+    def load_iter(self, path_or_stream, ignore_missing=False, **options):
+        """
+        Load the children of the root element of XML data from a file path or
+        a file / file-like object `path_or_stream` one by one as records.
+
+        :param path_or_stream: XML file path or file{,-like} object
+        :param ignore_missing:
+            Ignore and yield nothing if given `path_or_stream` is a file path
+            does not exist.
+        :param options: See :meth:`~anyconfig.backend.base.Parser.load`
+
+        :return: A generator yields mapping objects of each child element
+        """
+        if ignore_missing and \
+                isinstance(path_or_stream, anyconfig.compat.STR_TYPES) and \
+                not os.path.exists(path_or_stream):
+            return iter([])
+
+        container = self._container_factory(**options)
+        factory = anyconfig.backend.base.mutable_container(container)
+        options = self._load_options(factory, **options)
+        return (anyconfig.backend.base.maybe_frozen(cnf, container) for cnf
+                in iterparse_children(path_or_stream, container=factory,
+                                      **options))
+
+    def load_subtree(self, path_or_stream, path, ignore_missing=False,
+                     **options):
+        """
+        Load the subtree at `path` from a file path or a file / file-like
+        object `path_or_stream`. Elements not on `path` and their descendants
+        are not converted at all.
+
+        :param path_or_stream: XML file path or file{,-like} object
+        :param path: A sequence of keys (str) and indices (int)
+        :param ignore_missing:
+            Ignore and just return None if given `path_or_stream` is a file
+            path does not exist.
+        :param options: See :meth:`~anyconfig.backend.base.Parser.load`
+
+        :return: The subtree at `path` or None if it does not exist
+        """
+        if ignore_missing and \
+                isinstance(path_or_stream, anyconfig.compat.STR_TYPES) and \
+                not os.path.exists(path_or_stream):
+            return None
+
+        specials = [_complement_tag_options(options.copy())[nt]
+                    for nt in _TAGS]
+        if not all(isinstance(key, anyconfig.compat.STR_TYPES) and
+                   key not in specials for key in path):
+            # Indices of children lists and the keys of special nodes cannot
+            # be mapped to tags of elements.
+            return super(Parser, self).load_subtree(path_or_stream, path,
+                                                    **options)
+
+        container = self._container_factory(**options)
+        factory = anyconfig.backend.base.mutable_container(container)
+        options = self._load_options(factory, **options)
+        for cnf in _iterparse_to_containers(path_or_stream, factory,
+                                            path_tags=list(path), **options):
+            return anyconfig.backend.base.maybe_frozen(
+                anyconfig.query.search_path(cnf, path), container)
+
+        return None
 
     def dump_to_string(self, cnf, **opts):
         """
@@ -527,9 +964,8 @@ class Parser(anyconfig.backend.base.Parser,
 
         :return: string represents the configuration
         """
-        tree = container_to_etree(cnf, **opts)
         buf = BytesIO()
-        etree_write(tree, buf)
+        container_to_stream(cnf, buf, **opts)
         return buf.getvalue()
 
     def dump_to_stream(self, cnf, stream, **opts):
@@ -538,7 +974,6 @@ class Parser(anyconfig.backend.base.Parser,
         :param stream: Config file or file like object write to
         :param opts: optional keyword parameters
         """
-        tree = container_to_etree(cnf, **opts)
-        etree_write(tree, stream)
+        container_to_stream(cnf, stream, **opts)
 
 # vim:sw=4:ts=4:et:
@@ -22,15 +22,36 @@ r"""YAML backend:
   - All keyword options of yaml.safe_load, yaml.load, yaml.safe_dump and
     yaml.dump should work.
 
-  - Use 'ac_safe' boolean keyword option if you prefer to call yaml.safe_load
-    and yaml.safe_dump instead of yaml.load and yaml.dump. Please note that
-    this option conflicts with 'ac_dict' option and these options cannot be
-    used at the same time.
+  - Use 'ac_safe' boolean keyword option if you prefer to load and dump YAML
+    data safely like yaml.safe_load and yaml.safe_dump instead of yaml.load
+    and yaml.dump.
+
+  - Loader and Dumper classes implemented in C with libyaml are used if
+    libyaml is available, even if 'ac_safe' or 'ac_dict' option was given.
+    :func:`active_engine` tells which one, "libyaml" or "python", is used,
+    and 'ac_yaml_require_c' boolean keyword option makes load and dump fail
+    with :class:`LibyamlNotAvailableError` instead of using slow pure python
+    implementations.
 
   - See also: http://pyyaml.org/wiki/PyYAMLDocumentation
 
 Changelog:
 
+.. versionchanged:: 0.9.5
+
+   - Use Loader and Dumper classes implemented in C with libyaml if
+     available in any cases, and add 'ac_yaml_require_c' option and
+     :func:`active_engine` function.
+   - 'ac_safe' option can be used with 'ac_dict' option.
+   - Add :meth:`Parser.load_iter` to load multiple YAML documents one by one.
+   - Add :meth:`Parser.load_subtree` to construct python objects only from
+     the nodes on given path, e.g. with simple ac_query expressions.
+   - Make subclasses of Loader and Dumper customized for each container type
+     only once and reuse them instead of modifying Loader and Dumper classes
+     on every load and dump. These are kept in bounded LRU caches.
+   - Mappings are constructed with the default constructor of Loader if the
+     container type is dict, so that merge keys ('<<') are processed.
+
 .. versionchanged:: 0.9.3
 
    - Try ruamel.yaml instead of yaml (PyYAML) if it's available.
@@ -42,24 +63,80 @@ Changelog:
 """
 from __future__ import absolute_import
 
+import os.path
+
 try:
     import warnings
     import ruamel.yaml as yaml
-    from ruamel.yaml import Loader, Dumper
     warnings.simplefilter('ignore', yaml.error.UnsafeLoaderWarning)
+    try:
+        from ruamel.yaml import (CLoader as Loader, CDumper as Dumper,
+                                 CSafeLoader as SafeLoader,
+                                 CSafeDumper as SafeDumper)
+    except ImportError:
+        from ruamel.yaml import Loader, Dumper, SafeLoader, SafeDumper
 except ImportError:
     import yaml
     try:
-        from yaml import CSafeLoader as Loader, CDumper as Dumper
+        from yaml import (CSafeLoader as Loader, CDumper as Dumper,
+                          CSafeLoader as SafeLoader,
+                          CSafeDumper as SafeDumper)
     except ImportError:
-        from yaml import SafeLoader as Loader, Dumper
+        from yaml import SafeLoader as Loader, Dumper, SafeLoader, SafeDumper
 
 import anyconfig.backend.base
 import anyconfig.compat
+import anyconfig.query
 import anyconfig.utils
 
 
 _MAPPING_TAG = yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG
+_SEQUENCE_TAG = yaml.resolver.BaseResolver.DEFAULT_SEQUENCE_TAG
+_STR_TAG = yaml.resolver.BaseResolver.DEFAULT_SCALAR_TAG
+
+# Customized Loader and Dumper classes, {(base class, container, ...): class}
+# Containers may be made on every call, e.g. lambdas, so these are bounded.
+_LOADERS = anyconfig.utils.LRUCache(maxsize=64)
+_DUMPERS = anyconfig.utils.LRUCache(maxsize=64)
+
+
+class LibyamlNotAvailableError(RuntimeError):
+    """Raised if pure python implementations have to be used to load or dump
+    YAML data although 'ac_yaml_require_c' option was given.
+    """
+    pass
+
+
+def _is_c_class(cls):
+    """
+    :param cls: Loader or Dumper class
+    :return: True if `cls` is implemented in C with libyaml
+    """
+    cyaml = getattr(yaml, "cyaml", None)
+    cbases = tuple(getattr(cyaml, n) for n in ("CParser", "CEmitter")
+                   if hasattr(cyaml, n))
+    return bool(cbases) and issubclass(cls, cbases)
+
+
+def active_engine():
+    """
+    :return:
+        "libyaml" if YAML data is loaded and dumped with libyaml by default
+        or "python" if pure python implementations are used
+    """
+    return "libyaml" if _is_c_class(Loader) and _is_c_class(Dumper) else \
+        "python"
+
+
+def _ensure_c_class(cls, ac_yaml_require_c=False):
+    """
+    :param cls: Loader or Dumper class to use
+    :param ac_yaml_require_c: True if `cls` must be implemented in C
+    :raises: LibyamlNotAvailableError
+    """
+    if ac_yaml_require_c and not _is_c_class(cls):
+        raise LibyamlNotAvailableError("%s.%s is not implemented with libyaml"
+                                       % (cls.__module__, cls.__name__))
 
 
 def _filter_from_options(key, options):
@@ -76,13 +153,57 @@ def _filter_from_options(key, options):
                                            if k != key], options)
 
 
+def _memoized(cache, key, make_fn, *args):
+    """
+    :param cache:
+        :class:`anyconfig.utils.LRUCache` object to cache the results
+        of `make_fn`
+    :param key: Cache key of the result, may not be hashable
+    :param make_fn: Callable to make the result from `args`
+    :param args: Arguments passed to `make_fn`
+
+    :return: The result of `make_fn` made or cached already
+
+    >>> cache = anyconfig.utils.LRUCache(maxsize=2)
+    >>> _memoized(cache, "a", list, "abc")
+    ['a', 'b', 'c']
+    >>> _memoized(cache, "a", list, "def")
+    ['a', 'b', 'c']
+    >>> _memoized(cache, [0], list, "def")  # Not hashable key.
+    ['d', 'e', 'f']
+    """
+    try:
+        hash(key)
+    except TypeError:
+        return make_fn(*args)
+
+    return cache.get_or_make(key, lambda _key: make_fn(*args))
+
+
 def _customized_loader(container, loader=Loader, mapping_tag=_MAPPING_TAG):
     """
-    Create or update loader with making given callble `container` to make
-    mapping objects such as dict and OrderedDict, used to construct python
-    object from yaml mapping node internally.
+    Get a subclass of `loader` customized with making given callble
+    `container` to make mapping objects such as dict and OrderedDict, used to
+    construct python object from yaml mapping node internally. These
+    subclasses are made only once for each container and reused.
 
     :param container: Set container used internally
+
+    >>> ldr = _customized_loader(anyconfig.compat.OrderedDict)
+    >>> ldr is _customized_loader(anyconfig.compat.OrderedDict)
+    True
+    >>> issubclass(ldr, Loader) and ldr is not Loader
+    True
+    """
+    return _memoized(_LOADERS, (loader, container, mapping_tag),
+                     _make_loader, container, loader, mapping_tag)
+
+
+def _make_loader(container, loader=Loader, mapping_tag=_MAPPING_TAG):
+    """
+    Make a subclass of `loader` customized with `container`.
+
+    :seealso: :func:`_customized_loader`
     """
     def construct_mapping(loader, node, deep=False):
         """Construct python object from yaml mapping node, based on
@@ -114,12 +235,11 @@ def _customized_loader(container, loader=Loader, mapping_tag=_MAPPING_TAG):
         """Unicode string constructor"""
         return loader.construct_scalar(node)
 
-    try:
-        loader.add_constructor(tag, construct_ustr)
-    except NameError:
-        pass
+    # add_constructor of the subclass does not affect `loader` itself.
+    loader = type("Customized" + loader.__name__, (loader, ), {})
+    loader.add_constructor(tag, construct_ustr)
 
-    if type(container) != dict:
+    if container is not dict:
         loader.add_constructor(mapping_tag, construct_mapping)
     return loader
 
@@ -127,6 +247,20 @@ def _customized_loader(container, loader=Loader, mapping_tag=_MAPPING_TAG):
 def _customized_dumper(container, dumper=Dumper):
     """
     Coutnerpart of :func:`_customized_loader` for dumpers.
+
+    >>> dpr = _customized_dumper(anyconfig.compat.OrderedDict)
+    >>> dpr is _customized_dumper(anyconfig.compat.OrderedDict)
+    True
+    """
+    return _memoized(_DUMPERS, (dumper, container),
+                     _make_dumper, container, dumper)
+
+
+def _make_dumper(container, dumper=Dumper):
+    """
+    Make a subclass of `dumper` customized with `container`.
+
+    :seealso: :func:`_customized_dumper`
     """
     def container_representer(dumper, data, mapping_tag=_MAPPING_TAG):
         """Container representer.
@@ -138,69 +272,158 @@ def _customized_dumper(container, dumper=Dumper):
         tag = "tag:yaml.org,2002:python/unicode"
         return dumper.represent_scalar(tag, data)
 
+    # add_representer of the subclass does not affect `dumper` itself.
+    dumper = type("Customized" + dumper.__name__, (dumper, ), {})
     try:
         dumper.add_representer(unicode, ustr_representer)
     except NameError:
         pass
 
-    if type(container) != dict:
-        dumper.add_representer(container, container_representer)
+    # Add it for dict also to keep the order of items instead of sorting.
+    dumper.add_representer(container, container_representer)
     return dumper
 
 
-def _yml_fnc(fname, *args, **options):
-    """An wrapper of yaml.safe_load, yaml.load, yaml.safe_dump and yaml.dump.
+def _yml_load_options(container, ac_yaml_require_c=False, **options):
+    """
+    :param container: callble to make a container object
+    :param ac_yaml_require_c: True to require Loader implemented in C
+    :param options: Keyword options may contain ac_dict and ac_safe
 
-    :param fname:
-        "load" or "dump", not checked but it should be OK.
-        see also :func:`_yml_load` and :func:`_yml_dump`
-    :param args: [stream] for load or [cnf, stream] for dump
-    :param options: keyword args may contain "ac_safe" to load/dump safely
+    :return: A tuple of (container, options passed to yaml.load{,_all})
     """
-    key = "ac_safe"
-    fnc = getattr(yaml, r"safe_" + fname if options.get(key) else fname)
-    return fnc(*args, **_filter_from_options(key, options))
+    maybe_container = options.pop("ac_dict", False)
+    if maybe_container and callable(maybe_container):
+        # Frozen mapping objects cannot be updated while constructing.
+        container = anyconfig.backend.base.mutable_container(maybe_container)
+
+    if options.pop("ac_safe", False):
+        options["Loader"] = _customized_loader(container, loader=SafeLoader)
+    elif not options.get("Loader"):
+        options["Loader"] = _customized_loader(container)
+
+    _ensure_c_class(options["Loader"], ac_yaml_require_c)
+    return (container, options)
 
 
 def _yml_load(stream, container, **options):
-    """An wrapper of yaml.safe_load and yaml.load.
+    """An wrapper of yaml.load to load YAML data safely like yaml.safe_load
+    if ac_safe option was given.
 
     :param stream: a file or file-like object to load YAML content
     :param container: callble to make a container object
+    :param options: See :func:`_yml_load_options`
 
     :return: Mapping object
     """
-    if options.get("ac_safe", False):
-        options = {}  # yaml.safe_load does not process Loader opts.
-    elif not options.get("Loader"):
-        maybe_container = options.get("ac_dict", False)
-        if maybe_container and callable(maybe_container):
-            container = maybe_container
+    (container, options) = _yml_load_options(container, **options)
+    ret = yaml.load(stream, **options)
+    return container() if ret is None else container(ret)
 
-        options["Loader"] = _customized_loader(container)
 
-    ret = _yml_fnc("load", stream, **_filter_from_options("ac_dict", options))
-    return container() if ret is None else container(ret)
+def _yml_load_iter(stream, container, **options):
+    """An wrapper of yaml.load_all to load YAML documents one by one.
+
+    :param stream: a file or file-like object to load YAML documents
+    :param container: callble to make a container object
+    :param options: See :func:`_yml_load_options`
+
+    :return: A generator yields mapping objects of each document
+    """
+    (container, options) = _yml_load_options(container, **options)
+    for ret in yaml.load_all(stream, **options):
+        yield container() if ret is None else container(ret)
+
+
+def _find_node(node, path):
+    """
+    Find the node at `path` in the YAML node graph under `node`.
+
+    :param node: YAML node object
+    :param path: A sequence of keys (str) and indices (int)
+
+    :return: A tuple of (node found or None, the rest of `path`). The rest of
+        `path` is not empty if the node cannot be looked up without
+        constructing python objects, e.g. mappings with merge keys.
+    """
+    for idx, key in enumerate(path):
+        if isinstance(key, int):
+            if not isinstance(node, yaml.SequenceNode) or \
+                    node.tag != _SEQUENCE_TAG:
+                return (node, path[idx:])
+            try:
+                node = node.value[key]
+            except IndexError:
+                return (None, ())
+        else:
+            if not isinstance(node, yaml.MappingNode) or \
+                    node.tag != _MAPPING_TAG or \
+                    any(k.tag == "tag:yaml.org,2002:merge"
+                        for k, _v in node.value):
+                return (node, path[idx:])
+
+            vals = [v for k, v in node.value if isinstance(k, yaml.ScalarNode)
+                    and k.tag == _STR_TAG and k.value == key]
+            if not vals:
+                return (None, ())
+            node = vals[-1]  # The last one wins as yaml.load does.
+
+    return (node, ())
+
+
+def _yml_load_subtree(stream, container, path, **options):
+    """
+    Load the subtree at `path` from YAML data. The whole YAML data is composed
+    into a node graph but python objects are constructed only from the nodes
+    under the node at `path`.
+
+    :param stream: a file or file-like object to load YAML content
+    :param container: callble to make a container object
+    :param path: A sequence of keys (str) and indices (int)
+    :param options: See :func:`_yml_load_options`
 
+    :return: The subtree at `path` or None if it does not exist
+    """
+    options = _yml_load_options(container, **options)[1]
+    loader = options["Loader"](stream)
+    try:
+        node = loader.get_single_node()
+        if node is None:
+            return None
 
-def _yml_dump(cnf, stream, **options):
-    """An wrapper of yaml.safe_dump and yaml.dump.
+        (node, rest) = _find_node(node, path)
+        if node is None:
+            return None
+
+        ret = loader.construct_document(node)
+    finally:
+        loader.dispose()
+
+    return anyconfig.query.search_path(ret, rest)
+
+
+def _yml_dump(cnf, stream, ac_yaml_require_c=False, **options):
+    """An wrapper of yaml.dump to dump YAML data safely like yaml.safe_dump
+    if ac_safe option was given.
 
     :param cnf: Mapping object to dump
     :param stream: a file or file-like object to dump YAML data
+    :param ac_yaml_require_c: True to require Dumper implemented in C
     """
-    if options.get("ac_safe", False):
-        options = {}
+    if options.pop("ac_safe", False):
+        options["Dumper"] = SafeDumper
     elif not options.get("Dumper", False):
         # TODO: Any other way to get its constructor?
         cnf_type = type(cnf)
         maybe_container = options.get("ac_dict", cnf_type)
         options["Dumper"] = _customized_dumper(maybe_container)
 
+    _ensure_c_class(options["Dumper"], ac_yaml_require_c)
+
     # Type information and the order of items are lost on dump currently.
     cnf = anyconfig.dicts.convert_to(cnf, ac_dict=dict)
     options = _filter_from_options("ac_dict", options)
-    return _yml_fnc("dump", cnf, stream, **options)
+    return yaml.dump(cnf, stream, **options)
 
 
 class Parser(anyconfig.backend.base.StreamParser):
@@ -209,15 +432,74 @@ class Parser(anyconfig.backend.base.StreamParser):
     """
     _type = "yaml"
     _extensions = ["yaml", "yml"]
-    _load_opts = ["Loader", "ac_safe", "ac_dict"]
+    _load_opts = ["Loader", "ac_safe", "ac_dict", "ac_yaml_require_c"]
     _dump_opts = ["stream", "ac_safe", "Dumper", "default_style",
                   "default_flow_style", "canonical", "indent", "width",
                   "allow_unicode", "line_break", "encoding", "explicit_start",
-                  "explicit_end", "version", "tags"]
+                  "explicit_end", "version", "tags", "ac_yaml_require_c"]
     _ordered = True
     _dict_opts = ["ac_dict"]
 
     load_from_stream = anyconfig.backend.base.to_method(_yml_load)
     dump_to_stream = anyconfig.backend.base.to_method(_yml_dump)
 
+    def load_iter(self, path_or_stream, ignore_missing=False, **options):
+        """
+        Load YAML documents from a file path or a file / file-like object
+        `path_or_stream` one by one.
+
+        :param path_or_stream: Config file path or file{,-like} object
+        :param ignore_missing:
+            Ignore and yield nothing if given `path_or_stream` is a file path
+            does not exist.
+        :param options: See :meth:`~anyconfig.backend.base.Parser.load`
+
+        :return: A generator yields mapping objects of each document
+        """
+        container = self._container_factory(**options)
+        factory = anyconfig.backend.base.mutable_container(container)
+        options = self._load_options(factory, **options)
+
+        if isinstance(path_or_stream, anyconfig.compat.STR_TYPES):
+            if ignore_missing and not os.path.exists(path_or_stream):
+                return
+
+            with self.ropen(path_or_stream) as inp:
+                for cnf in _yml_load_iter(inp, factory, **options):
+                    yield anyconfig.backend.base.maybe_frozen(cnf, container)
+        else:
+            for cnf in _yml_load_iter(path_or_stream, factory, **options):
+                yield anyconfig.backend.base.maybe_frozen(cnf, container)
+
+    def load_subtree(self, path_or_stream, path, ignore_missing=False,
+                     **options):
+        """
+        Load the subtree at `path` from a file path or a file / file-like
+        object `path_or_stream`. Python objects are not constructed from
+        nodes not on `path`.
+
+        :param path_or_stream: Config file path or file{,-like} object
+        :param path: A sequence of keys (str) and indices (int)
+        :param ignore_missing:
+            Ignore and just return None if given `path_or_stream` is a file
+            path does not exist.
+        :param options: See :meth:`~anyconfig.backend.base.Parser.load`
+
+        :return: The subtree at `path` or None if it does not exist
+        """
+        container = self._container_factory(**options)
+        factory = anyconfig.backend.base.mutable_container(container)
+        options = self._load_options(factory, **options)
+
+        if isinstance(path_or_stream, anyconfig.compat.STR_TYPES):
+            if ignore_missing and not os.path.exists(path_or_stream):
+                return None
+
+            with self.ropen(path_or_stream) as inp:
+                cnf = _yml_load_subtree(inp, factory, path, **options)
+        else:
+            cnf = _yml_load_subtree(path_or_stream, factory, path, **options)
+
+        return anyconfig.backend.base.maybe_frozen(cnf, container)
+
 # vim:sw=4:ts=4:et:
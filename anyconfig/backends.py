@@ -4,59 +4,207 @@
 #
 # Suppress:
 # - false-positive warn at '... pkg_resources ...' line
-# - import positions after some globals are defined
-# pylint: disable=no-member,wrong-import-position
+# pylint: disable=no-member
 """A module to aggregate config parser (loader/dumper) backends.
+
+Backend modules are not imported until they are needed actually. Meta data of
+the built-in backends (type, file extensions, priority and modules they
+require) are registered up front as :class:`LazyParser` objects and each
+backend module is imported only the first time :func:`find_by_type` or
+:func:`find_by_file` resolves to it. Backends provided by other packages with
+'anyconfig_backends' entry points are also discovered lazily on such first
+lookup.
+
+.. versionchanged:: 0.9.5
+
+   - Import backend modules and discover backends from entry points lazily.
+   - Added :class:`LazyParser` and :func:`list_parsers`.
+   - :data:`PARSERS` holds :class:`LazyParser` objects instead of parser
+     classes for the backends not imported yet, so that code does
+     ``issubclass(p, ...)`` or reads ``p._type`` of its items may not work.
+     Use :func:`list_parsers` to get parser classes, or the class methods
+     such as ``p.type()`` and ``p.extensions()`` which both provide.
+   - Find parsers with dict indexes of parsers by types and extensions, and
+     share a parser instance for each parser class with
+     :func:`get_parser_instance`.
+   - Added :func:`register` and :func:`unregister` to add and remove parsers
+     at runtime.
+   - Added :func:`find_by_content` to find parsers by inspecting the head of
+     content, and :func:`find_parser` uses it for streams without names.
 """
 from __future__ import absolute_import
 
+import collections
+import importlib
 import itertools
 import logging
 import operator
-import pkg_resources
+import re
+import threading
 
 import anyconfig.compat
 import anyconfig.utils
 
 import anyconfig.backend.base
-import anyconfig.backend.ini
-import anyconfig.backend.json
-import anyconfig.backend.pickle
-import anyconfig.backend.properties
-import anyconfig.backend.shellvars
-import anyconfig.backend.xml
+
 
 LOGGER = logging.getLogger(__name__)
-PARSERS = [anyconfig.backend.ini.Parser, anyconfig.backend.json.Parser,
-           anyconfig.backend.pickle.Parser,
-           anyconfig.backend.properties.Parser,
-           anyconfig.backend.shellvars.Parser, anyconfig.backend.xml.Parser]
 
 _NA_MSG = "%s is not available. Disabled %s support."
+_ENTRY_POINTS_GROUP = "anyconfig_backends"
+
+
+def _module_exists(name):
+    """
+    Check if the module `name` exists without importing it.
+
+    :param name: Module name
+    :return: True if the module `name` was found
 
-try:
-    import anyconfig.backend.yaml
-    PARSERS.append(anyconfig.backend.yaml.Parser)
-except ImportError:
-    LOGGER.info(_NA_MSG, "yaml module", "YAML")
-
-try:
-    import anyconfig.backend.configobj
-    PARSERS.append(anyconfig.backend.configobj.Parser)
-except ImportError:
-    LOGGER.info(_NA_MSG, "ConfigObj module", "its")
-
-try:
-    import anyconfig.backend.toml
-    PARSERS.append(anyconfig.backend.toml.Parser)
-except ImportError:
-    LOGGER.info(_NA_MSG, "toml module", "TOML")
-
-for e in pkg_resources.iter_entry_points("anyconfig_backends"):
+    >>> _module_exists("os.path")
+    True
+    >>> _module_exists("module_not_exist.child_not_exist")
+    False
+    """
+    try:
+        import importlib.util
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, AttributeError, ValueError):
+        pass
+
+    try:
+        import pkgutil  # python 2.x
+        return pkgutil.find_loader(name) is not None
+    except (ImportError, AttributeError, ValueError):
+        return False
+
+
+class LazyParser(object):
+    """
+    Placeholder of a parser class to import the backend module provides it
+    lazily. It has the class methods same as
+    :class:`~anyconfig.backend.base.Parser` to give its meta data.
+
+    >>> psr = LazyParser("anyconfig.backend.json", "json", ["json"])
+    >>> (psr.type(), psr.extensions(), psr.priority())
+    ('json', ['json'], 0)
+    >>> psr.load()
+    <class 'anyconfig.backend.json.Parser'>
+    >>> psr = LazyParser("anyconfig.backend.dummy", "dummy",
+    ...                  requires=["module_not_exist"])
+    >>> psr.available()
+    False
+    """
+    def __init__(self, modname, ptype, extensions=None, priority=0,
+                 requires=None):
+        """
+        :param modname: Name of the backend module provides a parser class
+        :param ptype: Parser's type
+        :param extensions: File extensions which the parser can process
+        :param priority: Parser's priority
+        :param requires:
+            Names of modules the backend requires, one of them must be found
+        """
+        self.modname = modname
+        self._type = ptype
+        self._extensions = extensions or []
+        self._priority = priority
+        self._requires = requires or []
+        self._parser = None
+        self._error = None
+
+    def __repr__(self):
+        return "<LazyParser: %s.Parser>" % self.modname
+
+    def type(self):
+        """Parser's type"""
+        return self._type
+
+    def priority(self):
+        """Parser's priority"""
+        return self._priority
+
+    def extensions(self):
+        """File extensions which the parser can process"""
+        return self._extensions
+
+    def available(self):
+        """
+        :return: False if the backend is known to be unavailable else True
+        """
+        if self._parser is not None:
+            return True
+
+        if self._error is not None:
+            return False
+
+        return not self._requires or \
+            any(_module_exists(r) for r in self._requires)
+
+    def loaded(self):
+        """
+        :return: Parser class if the backend was imported already or None
+        """
+        return self._parser
+
+    def load(self):
+        """
+        Import the backend module and get the parser class from it.
+
+        :return: Parser class
+        :raises: ImportError if the backend module cannot be imported
+        """
+        if self._parser is None:
+            if self._error is not None:
+                raise self._error
+            try:
+                self._parser = importlib.import_module(self.modname).Parser
+            except ImportError as exc:
+                self._error = exc
+                raise
+
+        return self._parser
+
+
+# Parser classes or :class:`LazyParser` objects of backends not imported yet.
+PARSERS = [LazyParser("anyconfig.backend.ini", "ini", ["ini"]),
+           LazyParser("anyconfig.backend.json", "json",
+                      ["json", "jsn", "js"]),
+           LazyParser("anyconfig.backend.jsonl", "jsonl",
+                      ["jsonl", "ndjson"]),
+           LazyParser("anyconfig.backend.pickle", "pickle",
+                      ["pkl", "pickle"]),
+           LazyParser("anyconfig.backend.properties", "properties",
+                      ["properties"]),
+           LazyParser("anyconfig.backend.shellvars", "shellvars"),
+           LazyParser("anyconfig.backend.xml", "xml", ["xml"]),
+           LazyParser("anyconfig.backend.yaml", "yaml", ["yaml", "yml"],
+                      requires=["ruamel.yaml", "yaml"]),
+           LazyParser("anyconfig.backend.configobj", "configobj",
+                      priority=10, requires=["configobj"]),
+           LazyParser("anyconfig.backend.toml", "toml", ["toml"],
+                      requires=["toml"])]
+
+_LOCK = threading.RLock()
+_PLUGINS_LOADED = False
+
+
+def _iter_entry_points(group=_ENTRY_POINTS_GROUP):
+    """
+    :param group: Entry points group name
+    :return: An iterable of entry points in `group`
+    """
     try:
-        PARSERS.append(e.load())
+        import importlib.metadata as importlib_metadata  # python >= 3.8
     except ImportError:
-        continue
+        import pkg_resources
+        return pkg_resources.iter_entry_points(group)
+
+    eps = importlib_metadata.entry_points()
+    if hasattr(eps, "select"):  # python >= 3.10
+        return eps.select(group=group)
+
+    return eps.get(group, [])
 
 
 class UnknownParserTypeError(RuntimeError):
@@ -118,20 +266,30 @@ def is_parser(obj):
     return isinstance(obj, anyconfig.backend.base.Parser)
 
 
+_PRIORITIES = {}  # Priorities of parsers given on registration.
+
+
+def _priority(psr):
+    """
+    :param psr: Parser class or :class:`LazyParser` object
+    :return: Priority given on :func:`register` or the parser's one
+    """
+    return _PRIORITIES.get(psr, psr.priority())
+
+
 def _list_parsers_by_type(cps):
     """
     :param cps: A list of parser classes
     :return: List (generator) of (config_type, [config_parser])
     """
-    return ((t, sorted(p, key=operator.methodcaller("priority"))) for t, p
+    return ((t, sorted(p, key=_priority)) for t, p
             in groupby_key(cps, operator.methodcaller("type")))
 
 
 def _list_xppairs(xps):
     """List config parsers by priority.
     """
-    return sorted((snd(xp) for xp in xps),
-                  key=operator.methodcaller("priority"))
+    return sorted((snd(xp) for xp in xps), key=_priority)
 
 
 def _list_parsers_by_extension(cps):
@@ -145,19 +303,87 @@ def _list_parsers_by_extension(cps):
     return ((x, _list_xppairs(xps)) for x, xps in groupby_key(cps_by_ext, fst))
 
 
-_PARSERS_BY_TYPE = tuple(_list_parsers_by_type(PARSERS))
-_PARSERS_BY_EXT = tuple(_list_parsers_by_extension(PARSERS))
+Indexes = collections.namedtuple("Indexes", "by_type by_ext")
 
 
-def find_by_file(path_or_stream, cps=_PARSERS_BY_EXT, is_path_=False):
+def _make_indexes(cps):
+    """
+    :param cps: A list of parser classes or :class:`LazyParser` objects
+    :return: :class:`Indexes` object holds dicts, {type: [parser]} and
+        {extension: [parser]}
+    """
+    return Indexes(dict(_list_parsers_by_type(cps)),
+                   dict(_list_parsers_by_extension(cps)))
+
+
+_INDEXES = _make_indexes(PARSERS)
+_INSTANCES = {}
+
+
+def _update_indexes():
+    """
+    Rebuild the indexes of parsers by types and extensions from the list of
+    parsers. New indexes replace the old ones at once.
+    """
+    global _INDEXES
+
+    _INDEXES = _make_indexes(PARSERS)
+
+
+def _load_plugins():
+    """
+    Discover backends provided by other packages with 'anyconfig_backends'
+    entry points and update the lists of parsers. It's done only once on the
+    first lookup of parsers to defer its cost until it's needed.
+    """
+    global _PLUGINS_LOADED
+
+    if _PLUGINS_LOADED:
+        return
+
+    with _LOCK:
+        if _PLUGINS_LOADED:
+            return
+
+        for ept in _iter_entry_points():
+            try:
+                PARSERS.append(ept.load())
+            except ImportError:
+                continue
+
+        _update_indexes()
+        _PLUGINS_LOADED = True
+
+
+def _resolve(psrs):
+    """
+    Resolve the parser class of the highest priority and available from given
+    parsers.
+
+    :param psrs: A list of parser classes or :class:`LazyParser` objects
+        sorted by priority in ascending order, or None
+    :return: Parser class or None
+    """
+    for psr in reversed(psrs or []):
+        if not isinstance(psr, LazyParser):
+            return psr
+        try:
+            return psr.load()
+        except ImportError:
+            LOGGER.info(_NA_MSG, psr.modname, psr.type())
+
+    return None
+
+
+def find_by_file(path_or_stream, cps=None, is_path_=False):
     """
     Find config parser by the extension of file `path_or_stream`, file path or
     stream (a file or file-like objects).
 
     :param path_or_stream: Config file path or file/file-like object
     :param cps:
-        A tuple of pairs of (type, parser_class) or None if you want to compute
-        this value dynamically.
+        A dict or a tuple of pairs of (extension, [parser_class]) or None to
+        use the index of parsers registered.
     :param is_path_: True if given `path_or_stream` is a file path
 
     :return: Config Parser class found
@@ -173,7 +399,10 @@ def find_by_file(path_or_stream, cps=_PARSERS_BY_EXT, is_path_=False):
     <class 'anyconfig.backend.json.Parser'>
     """
     if cps is None:
-        cps = _list_parsers_by_extension(PARSERS)
+        _load_plugins()
+        cps = _INDEXES.by_ext
+    elif not anyconfig.utils.is_dict_like(cps):
+        cps = dict(cps)
 
     if not is_path_ and not anyconfig.utils.is_path(path_or_stream):
         path_or_stream = anyconfig.utils.get_path_from_stream(path_or_stream)
@@ -181,17 +410,17 @@ def find_by_file(path_or_stream, cps=_PARSERS_BY_EXT, is_path_=False):
             return None  # There is no way to detect file path.
 
     ext_ref = anyconfig.utils.get_file_extension(path_or_stream)
-    return next((psrs[-1] for ext, psrs in cps if ext == ext_ref), None)
+    return _resolve(cps.get(ext_ref))
 
 
-def find_by_type(cptype, cps=_PARSERS_BY_TYPE):
+def find_by_type(cptype, cps=None):
     """
     Find config parser by file's extension.
 
     :param cptype: Config file's type
     :param cps:
-        A list of pairs (type, parser_class) or None if you want to compute
-        this value dynamically.
+        A dict or a list of pairs of (type, [parser_class]) or None to use the
+        index of parsers registered.
 
     :return: Config Parser class found
 
@@ -199,9 +428,134 @@ def find_by_type(cptype, cps=_PARSERS_BY_TYPE):
     True
     """
     if cps is None:
-        cps = _list_parsers_by_type(PARSERS)
+        _load_plugins()
+        cps = _INDEXES.by_type
+    elif not anyconfig.utils.is_dict_like(cps):
+        cps = dict(cps)
+
+    return _resolve(cps.get(cptype))
 
-    return next((psrs[-1] or None for t, psrs in cps if t == cptype), None)
+
+_SNIFF_SIZE = 4096
+_SNIFF_RES = (("xml", re.compile(r"^<[?!a-zA-Z]")),
+              ("json", re.compile(r'^(?:\{|\[\s*(?:[\[{\]"]|-?[0-9]|'
+                                  r'true\b|false\b|null\b))')),
+              ("ini", re.compile(r"^\[[^\]\r\n]+\][ \t]*(?:[\r\n]|$)")),
+              ("yaml", re.compile(r"^(?:---|%YAML)")),
+              ("yaml", re.compile(r"^[\w.\-\"']+[ \t]*:(?:[ \t]|[\r\n]|$)")),
+              ("shellvars",
+               re.compile(r"^(?:export[ \t]+)?[A-Za-z_][A-Za-z0-9_]*=")))
+_SNIFF_COMMENT_RE = re.compile(r"^(?:[ \t]*(?:[#;][^\r\n]*)?(?:\r?\n))+")
+
+
+def _peek(content_or_stream, size=_SNIFF_SIZE):
+    """
+    Get the head of given content or stream without consuming the stream.
+
+    :param content_or_stream: A string, bytes or a file or file-like object
+    :param size: Max size of the head in bytes or chars
+    :return: A string or bytes of the head or None if it's not possible
+
+    >>> _peek("abc", 2)
+    'ab'
+    >>> strm = anyconfig.compat.StringIO("abc")
+    >>> (_peek(strm, 2), strm.read())
+    ('ab', 'abc')
+    """
+    if isinstance(content_or_stream, (bytes, ) + anyconfig.compat.STR_TYPES):
+        return content_or_stream[:size]
+
+    strm = content_or_stream
+    try:
+        if hasattr(strm, "peek"):
+            return strm.peek(size)[:size]
+
+        if getattr(strm, "seekable", lambda: True)():
+            pos = strm.tell()
+            head = strm.read(size)
+            strm.seek(pos)
+            return head
+    except (AttributeError, IOError, OSError, ValueError):
+        pass
+
+    buf = getattr(strm, "buffer", None)  # e.g. sys.stdin
+    if buf is not None and hasattr(buf, "peek"):
+        try:
+            return buf.peek(size)[:size]
+        except (IOError, OSError, ValueError):
+            pass
+
+    return None
+
+
+def _sniff_type(head):
+    r"""
+    Guess the type of config from the head of its content.
+
+    :param head: A string or bytes of the head of config content
+    :return: Type of config or None
+
+    >>> _sniff_type(b'<?xml version="1.0"?><a/>')
+    'xml'
+    >>> _sniff_type('  {"a": 1}')
+    'json'
+    >>> _sniff_type('[1, 2]')
+    'json'
+    >>> _sniff_type('# comment\n[sect0]\nkey = val\n')
+    'ini'
+    >>> _sniff_type('---\na: 1\n')
+    'yaml'
+    >>> _sniff_type('name: a\n')
+    'yaml'
+    >>> _sniff_type('A=1\nexport B="b"\n')
+    'shellvars'
+    >>> _sniff_type('') is None
+    True
+    """
+    if isinstance(head, bytes) and not isinstance(head, str):
+        head = head.decode("utf-8", "ignore")
+
+    head = _SNIFF_COMMENT_RE.sub('', head.lstrip(u"\ufeff"), count=1)
+    head = head.lstrip()
+    for ctype, reg in _SNIFF_RES:
+        if reg.match(head):
+            return ctype
+
+    return None
+
+
+def find_by_content(content_or_stream, cps=None):
+    r"""
+    Find config parser by inspecting the head (a few KB at most) of given
+    content or stream. Given stream is not consumed; its head is peeked or
+    it's rewound after reading the head.
+
+    :param content_or_stream: A string, bytes or a file or file-like object
+    :param cps:
+        A dict or a list of pairs of (type, [parser_class]) or None to use the
+        index of parsers registered.
+
+    :return: Config Parser class found or None
+
+    >>> find_by_content('{"a": 1}')
+    <class 'anyconfig.backend.json.Parser'>
+    >>> strm = anyconfig.compat.StringIO("[sect0]\nkey = val\n")
+    >>> find_by_content(strm)
+    <class 'anyconfig.backend.ini.Parser'>
+    >>> strm.read()
+    '[sect0]\nkey = val\n'
+    >>> find_by_content("a content cannot be detected") is None
+    True
+    """
+    head = _peek(content_or_stream)
+    if not head:
+        return None
+
+    ctype = _sniff_type(head)
+    if ctype is None:
+        return None
+
+    return find_by_type(ctype, cps=cps)
 
 
 def find_parser(path_or_stream, forced_type=None, is_path_=False):
@@ -243,18 +597,152 @@ def find_parser(path_or_stream, forced_type=None, is_path_=False):
             raise UnknownParserTypeError(forced_type)
     else:
         parser = find_by_file(path_or_stream, is_path_=is_path_)
+        if parser is None and not is_path_ and \
+                not anyconfig.utils.is_path(path_or_stream):
+            parser = find_by_content(path_or_stream)
         if parser is None:
             raise UnknownFileTypeError(path_or_stream)
 
     return parser
 
 
-def list_types(cps=_PARSERS_BY_TYPE):
+def _is_same_parser(psr, other):
+    """
+    :param psr: Parser class or :class:`LazyParser` object
+    :param other: Likewise
+    :return: True if `psr` and `other` are or give the same parser class
+
+    >>> import anyconfig.backend.ini, anyconfig.backend.json
+    >>> psr = LazyParser("anyconfig.backend.json", "json", ["json"])
+    >>> _is_same_parser(psr, anyconfig.backend.json.Parser)  # Not loaded.
+    True
+    >>> _is_same_parser(psr, anyconfig.backend.ini.Parser)
+    False
+    """
+    if psr is other or not isinstance(psr, LazyParser):
+        return psr is other
+
+    loaded = psr.loaded()
+    if loaded is not None:
+        return loaded is other
+
+    # Match it without importing the backend module.
+    return isinstance(other, type) and \
+        issubclass(other, anyconfig.backend.base.Parser) and \
+        (other.__module__, other.__name__) == (psr.modname, "Parser") and \
+        other.type() == psr.type()
+
+
+def register(psr, priority=None):
+    """
+    Register a parser class or a :class:`LazyParser` object at runtime. Parser
+    registered later takes precedence over others of the same type and
+    extensions if their priorities are the same.
+
+    :param psr: Parser class or :class:`LazyParser` object
+    :param priority:
+        Priority to select `psr` among parsers of the same type or file
+        extension instead of the priority of `psr` itself
+    :raises: ValueError if `psr` is not a parser class nor a lazy parser
+
+    >>> import anyconfig.backend.json
+    >>> class MyParser(anyconfig.backend.json.Parser):
+    ...     _extensions = ["myjson"]
+    >>> register(MyParser, priority=99)
+    >>> find_by_type("json") is MyParser
+    True
+    >>> find_by_file("a.myjson") is MyParser
+    True
+    >>> unregister(MyParser)
+    >>> find_by_type("json") is anyconfig.backend.json.Parser
+    True
+    """
+    if not (isinstance(psr, LazyParser) or
+            (isinstance(psr, type) and
+             issubclass(psr, anyconfig.backend.base.Parser))):
+        raise ValueError("Not a parser class: %r" % psr)
+
+    _load_plugins()  # Keep the order: plugins < parsers registered later.
+    with _LOCK:
+        PARSERS[:] = [p for p in PARSERS if p is not psr] + [psr]
+        if priority is None:
+            _PRIORITIES.pop(psr, None)
+        else:
+            _PRIORITIES[psr] = priority
+        _update_indexes()
+
+
+def unregister(psr):
+    """
+    Unregister a parser class or a :class:`LazyParser` object.
+
+    :param psr: Parser class or :class:`LazyParser` object
+    :raises: ValueError if `psr` was not registered
+    """
+    _load_plugins()
+    with _LOCK:
+        removes = [p for p in PARSERS if _is_same_parser(p, psr)]
+        if not removes:
+            raise ValueError("Not registered: %r" % psr)
+
+        PARSERS[:] = [p for p in PARSERS if p not in removes]
+        for rpsr in removes:
+            _PRIORITIES.pop(rpsr, None)
+            cls = rpsr.loaded() if isinstance(rpsr, LazyParser) else rpsr
+            _INSTANCES.pop(cls, None)
+        _update_indexes()
+
+
+def get_parser_instance(psr):
+    """
+    Get the parser instance of given parser class. Parsers are stateless and
+    an instance is made only once and shared for each parser class.
+
+    :param psr: Parser class
+    :return: An instance of `psr`
+
+    >>> psr = find_by_type("json")
+    >>> get_parser_instance(psr) is get_parser_instance(psr)
+    True
+    """
+    try:
+        return _INSTANCES[psr]
+    except KeyError:
+        return _INSTANCES.setdefault(psr, psr())
+
+
+def _is_available(psr):
+    """
+    :param psr: Parser class or :class:`LazyParser` object
+    :return: True if `psr` is a parser class or an available lazy parser
+    """
+    return not isinstance(psr, LazyParser) or psr.available()
+
+
+def list_types(cps=None):
     """List available config types.
+
+    Backend modules are not imported to list them but only checked if the
+    modules they require exist.
     """
     if cps is None:
-        cps = _list_parsers_by_type(PARSERS)
+        _load_plugins()
+        cps = _INDEXES.by_type
+    elif not anyconfig.utils.is_dict_like(cps):
+        cps = dict(cps)
+
+    return sorted(t for t, psrs in cps.items()
+                  if any(_is_available(p) for p in psrs))
+
 
-    return sorted(set(next(anyconfig.compat.izip(*cps))))
+def list_parsers():
+    """
+    List parser classes of all available backends. Please note that it imports
+    all of them.
+
+    :return: A list of parser classes
+    """
+    _load_plugins()
+    return [p for p in (_resolve([p]) for p in PARSERS) if p is not None]
 
 # vim:sw=4:ts=4:et:
@@ -0,0 +1,263 @@
+#
+# Copyright (C) 2018 Satoru SATOH <ssato redhat.com>
+# License: MIT
+#
+r"""anyconfig.cache module to cache configuration data loaded from files.
+
+Loaded results are keyed by the normalized file path, file stats (inode,
+mtime in nano seconds and size), the parser type and the keyword options which
+may change the results, so that re-loading an unchanged file costs only a
+:func:`os.stat` call instead of parsing it again.
+
+Changelog:
+
+.. versionadded:: 0.9.5
+
+   - Added to cache loaded results of config files with ac_cache keyword
+     option of :func:`anyconfig.api.single_load` and so on.
+   - Results are frozen with :func:`anyconfig.frozen.freeze` and cached, and
+     returned as they are without copying them, so that a hit costs much less
+     than parsing the file again. Use ``LoadCache(mutable=True)`` to get
+     mutable deep copies of cached results instead.
+   - Results are frozen, so that these are made of
+     :class:`~anyconfig.frozen.FrozenConfig` objects and tuples instead of
+     mapping objects made with ac_dict and lists. ValueError is raised if
+     ac_dict other than FrozenConfig is given with such caches.
+   - Frozen results can be dumped as they are (backends thaw them), and
+     :func:`anyconfig.frozen.thaw` makes mutable copies of them to modify.
+"""
+from __future__ import absolute_import
+
+import copy
+import os
+
+import anyconfig.frozen
+import anyconfig.utils
+
+
+# Keyword options might change the loaded results in addition to backend
+# specific load options (:meth:`~anyconfig.backend.base.Parser._load_opts`).
+_KEY_OPTS = ("ac_dict", "ac_ordered", "ignore_missing")
+
+
+def _hashable(obj):
+    """
+    :param obj: Any object
+    :return: `obj` itself if it's hashable or its string representation
+
+    >>> _hashable(1)
+    1
+    >>> _hashable([1, 2])
+    '[1, 2]'
+    """
+    try:
+        hash(obj)
+        return obj
+    except TypeError:
+        return repr(obj)
+
+
+def _stat_key(filepath):
+    """
+    :param filepath: File path
+    :return: A tuple of (inode, mtime_ns, size) or None if stat() failed
+
+    >>> _stat_key("/file/should/not/exist") is None
+    True
+    >>> len(_stat_key(__file__))
+    3
+    """
+    try:
+        stat = os.stat(filepath)
+    except (IOError, OSError):
+        return None
+
+    mtime = getattr(stat, "st_mtime_ns", None)  # python >= 3.3
+    if mtime is None:
+        mtime = stat.st_mtime
+
+    return (stat.st_ino, mtime, stat.st_size)
+
+
+def make_key(filepath, psr, **options):
+    """
+    Make a cache key of the config file `filepath` to load with `psr`.
+
+    :param filepath: Config file path
+    :param psr: Parser object to load the config file
+    :param options: Keyword options passed to :meth:`psr.load`
+
+    :return: A tuple can be used as a cache key or None if `filepath` cannot
+        be stat-ed, e.g. it does not exist
+    """
+    skey = _stat_key(filepath)
+    if skey is None:
+        return None
+
+    keys = tuple(_KEY_OPTS) + tuple(getattr(psr, "_load_opts", []))
+    opts = sorted((k, _hashable(options[k])) for k in set(keys)
+                  if options.get(k) is not None)
+
+    return (anyconfig.utils.normpath(os.path.abspath(filepath)), ) + skey + \
+        (psr.type(), tuple(opts))
+
+
+def _copy(val):
+    """
+    :param val: Loaded result
+    :return: Deep copy of `val` or `val` itself if it's frozen and immutable
+
+    >>> val = anyconfig.frozen.FrozenConfig(a=[1])
+    >>> _copy(val) is val
+    True
+    """
+    if anyconfig.frozen.is_frozen(val):
+        return val
+
+    return copy.deepcopy(val)
+
+
+class LoadCache(anyconfig.utils.LRUCache):
+    """
+    A thread-safe LRU cache with size bound to keep loaded results.
+
+    Results are frozen (see :mod:`anyconfig.frozen`) when these are set and
+    returned as they are on hits by default. Deep copies of the results are
+    returned instead if `mutable` is True, that is slower.
+
+    Any other objects provide :meth:`get` and :meth:`set` methods in the same
+    signatures may be used instead of this as a cache passed with ac_cache
+    keyword option.
+
+    >>> cache = LoadCache(maxsize=2)
+    >>> cache.set("a", {"a": 1})
+    FrozenConfig({'a': 1})
+    >>> _ = cache.set("b", {"b": 2})
+    >>> cache.get("a")
+    FrozenConfig({'a': 1})
+    >>> _ = cache.set("c", {"c": 3})  # "b" is the least recently used.
+    >>> cache.get("b") is None
+    True
+    >>> sorted(cache.stats().items())
+    [('hits', 1), ('maxsize', 2), ('misses', 1), ('size', 2)]
+    """
+    def __init__(self, maxsize=128, mutable=False):
+        """
+        :param maxsize: Maximum number of the results to keep
+        :param mutable: Return mutable deep copies of results if True
+        """
+        super(LoadCache, self).__init__(maxsize=maxsize)
+        self.mutable = mutable
+
+    def get(self, key, default=None):
+        """
+        :param key: Cache key made by :func:`make_key`
+        :param default: Value to return if there is no data for `key`
+
+        :return: The cached result frozen, deep copy of it if `mutable` is
+            True, or `default`
+        """
+        val = super(LoadCache, self).get(key, default)
+        if val is default or not self.mutable:
+            return val
+
+        return _copy(val)
+
+    def set(self, key, val):
+        """
+        :param key: Cache key made by :func:`make_key`
+        :param val: Loaded result to cache. It's owned by this cache after
+            that if `mutable` is True.
+
+        :return: The result callers should use instead of `val`, that is,
+            `val` frozen or deep copy of `val` if `mutable` is True
+        """
+        if not (self.mutable or anyconfig.frozen.is_frozen(val)):
+            val = anyconfig.frozen.freeze(val)  # Shared with callers.
+
+        super(LoadCache, self).set(key, val)
+        return _copy(val) if self.mutable else val
+
+
+DEFAULT_CACHE = LoadCache()
+
+
+def get_cache(ac_cache=None):
+    """
+    :param ac_cache:
+        True to use the default global cache, a cache object or False or None
+        to disable caching
+    :return: A cache object or None
+
+    >>> get_cache() is None
+    True
+    >>> get_cache(True) is DEFAULT_CACHE
+    True
+    >>> cache = LoadCache()
+    >>> get_cache(cache) is cache
+    True
+    """
+    if not ac_cache:
+        return None
+
+    if ac_cache is True:
+        return DEFAULT_CACHE
+
+    return ac_cache
+
+
+def _check_ac_dict(cache, ac_dict=None, **_options):
+    """
+    :param cache: A cache object
+    :param ac_dict: Callable to make mapping objects or None
+    :raises: ValueError if `cache` freezes results and `ac_dict` is not
+        :class:`~anyconfig.frozen.FrozenConfig` or its subclass
+
+    >>> _check_ac_dict(LoadCache(), ac_dict=anyconfig.frozen.FrozenConfig)
+    >>> _check_ac_dict(LoadCache(mutable=True), ac_dict=dict)
+    >>> _check_ac_dict(LoadCache(), ac_dict=dict)  # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ValueError: ...
+    """
+    if not isinstance(cache, LoadCache) or cache.mutable or ac_dict is None:
+        return
+
+    if not anyconfig.frozen.is_frozen_factory(ac_dict):
+        raise ValueError("Cached results are frozen and cannot be made with "
+                         "ac_dict=%r. Use ac_cache=LoadCache(mutable=True) "
+                         "instead." % ac_dict)
+
+
+def load(psr, filepath, ac_cache=None, **options):
+    """
+    Load config file `filepath` with `psr` or get the cached result of it.
+
+    :param psr: Parser object to load the config file
+    :param filepath: Config file path
+    :param ac_cache: See the description of :func:`get_cache`
+    :param options: Keyword options passed to :meth:`psr.load`
+
+    :return: Mapping object, frozen if it's cached in :class:`LoadCache`
+        unless it's `mutable`
+    :raises: ValueError if ac_dict in `options` conflicts with the cache
+    """
+    cache = get_cache(ac_cache)
+    if cache is None:
+        return psr.load(filepath, **options)
+
+    _check_ac_dict(cache, **options)
+
+    key = make_key(filepath, psr, **options)
+    if key is None:
+        return psr.load(filepath, **options)
+
+    cnf = cache.get(key)
+    if cnf is None:
+        cnf = psr.load(filepath, **options)
+        res = cache.set(key, cnf)
+        if res is not None:  # Other cache objects may return nothing.
+            cnf = res
+
+    return cnf
+
+# vim:sw=4:ts=4:et:
@@ -14,6 +14,7 @@ import os
 import sys
 
 import anyconfig.api as API
+import anyconfig.backends
 import anyconfig.compat
 import anyconfig.globals
 import anyconfig.parser
@@ -56,6 +57,7 @@ Examples:
     -A obsoletes:syscnf;conflicts:syscnf-old
   %(prog)s /etc/foo.json /etc/foo/conf.d/x.json /etc/foo/conf.d/y.json
   %(prog)s '/etc/foo.d/*.json' -M noreplace
+  cat /etc/foo.json | %(prog)s - -o foo.yml  # Input type is detected.
   # Query/Get/set part of input config
   %(prog)s '/etc/foo.d/*.json' --query 'locs[?state == 'T'].name | sort(@)'
   %(prog)s '/etc/foo.d/*.json' --get a.b.c
@@ -304,12 +306,30 @@ def _output_result(cnf, outpath, otype, inpaths, itype):
     _try_dump(cnf, outpath, otype, fmsg)
 
 
+def _maybe_detect_stdin_type(args):
+    """
+    Detect the type of input from stdin by inspecting its head if it's only
+    the input ('-') and its type is not given.
+
+    :param args: :class:`~argparse.Namespace` object
+    :return: None but args.itype may be updated
+    """
+    if args.itype is None and args.inputs == ["-"]:
+        psr = anyconfig.backends.find_by_content(sys.stdin)
+        if psr is None:
+            _exit_with_output("Failed to detect the type of input from stdin. "
+                              "Specify it with -I/--itype option", 1)
+        args.itype = psr.type()
+
+
 def _load_diff(args):
     """
     :param args: :class:`~argparse.Namespace` object
     """
+    _maybe_detect_stdin_type(args)
+    inputs = [sys.stdin if i == "-" else i for i in args.inputs]
     try:
-        diff = API.load(args.inputs, args.itype,
+        diff = API.load(inputs, args.itype,
                         ignore_missing=args.ignore_missing,
                         ac_merge=args.merge,
                         ac_template=args.template,
@@ -7,15 +7,27 @@
 #
 r"""Utility functions to operate on mapping objects such as get, set and merge.
 
+.. versionchanged:: 0.9.5
+
+   - add :func:`compile_path` to parse path expressions only once and get,
+     set and delete values with them. :func:`get` and :func:`set_` use it and
+     :func:`set_` updates the values in place without making nested dicts and
+     merging them. Results of them are not changed.
+   - merge lists in linear time with the strategy MS_DICTS_AND_LISTS.
+   - add :func:`merge_many` to merge many mapping objects in a single
+     traversal, and to keep the others as they are with `keep_others`.
+   - add :func:`diff` and :func:`patch` to make and apply JSON Patch (RFC
+     6902) operations between mapping objects.
+
 .. versionadded: 0.8.3
    define _update_* and merge functions based on classes in
    :mod:`m9dicts.dicts`
 
 """
 from __future__ import absolute_import
-import functools
-import operator
+import copy
 import re
+import anyconfig.compat
 import anyconfig.utils
 
 
@@ -94,6 +106,161 @@ def mk_nested_dic(path, val, seps=PATH_SEPS):
     return ret
 
 
+def _to_index(key, idx_reg):
+    """
+    :param key: A key (str) in path expressions
+    :param idx_reg: Regex object to match with array indices
+    :return: `key` as an index (int or '-') of arrays or None
+
+    >>> [_to_index(k, _JSNP_GET_ARRAY_IDX_REG) for k in ("0", "12", "01", "-")]
+    [0, 12, None, None]
+    >>> _to_index("-", _JSNP_SET_ARRAY_IDX)
+    '-'
+    """
+    match = idx_reg.match(key)
+    if not match or match.end() != len(key):
+        return None
+
+    return key if key == '-' else int(key)
+
+
+class CompiledPath(object):
+    """
+    Path expression parsed only once to get, set and delete values in nested
+    mapping objects. Use :func:`compile_path` to make instances of this.
+
+    >>> path = compile_path("/a/b/1")
+    >>> dic = dict(a=dict(b=[1, 2]))
+    >>> path.get(dic)
+    (2, '')
+    >>> compile_path("a.c").set(dic, 3)
+    >>> compile_path("a.c").get(dic)
+    (3, '')
+    >>> path.delete(dic)
+    (2, '')
+    >>> dic
+    {'a': {'b': [1], 'c': 3}}
+    """
+    __slots__ = ("path", "keys", "_raw_keys", "_last_is_idx")
+
+    def __init__(self, path, seps=PATH_SEPS,
+                 idx_reg=_JSNP_GET_ARRAY_IDX_REG):
+        """
+        :param path: Path expression to point object wanted
+        :param seps: Separator char candidates
+        :param idx_reg: Regex object to match with array indices to get
+        """
+        self.path = path
+        self._raw_keys = tuple(_split_path(path, seps))
+        self.keys = tuple(_jsnp_unescape(p) for p in self._raw_keys)
+        self._last_is_idx = bool(self.keys) and \
+            idx_reg.match(self.keys[-1]) is not None
+
+    def __repr__(self):
+        return "<CompiledPath %r>" % self.path
+
+    def _parent(self, dic):
+        """
+        :param dic: a dict[-like] object
+        :return: A tuple of (the parent object of the object at this path,
+            the key or the index of the object in the parent)
+        :raises: TypeError, KeyError or IndexError if it's not found
+        """
+        for key in self.keys[:-1]:
+            dic = dic[key]
+
+        key = self.keys[-1]
+        if self._last_is_idx and len(self.keys) > 1 and \
+                anyconfig.utils.is_list_like(dic):
+            key = int(key)
+
+        return (dic, key)
+
+    def get(self, dic):
+        """getter for nested dicts, same as :func:`get`.
+
+        :param dic: a dict[-like] object
+        :return: A tuple of (result_object, error_message)
+        """
+        if not self.keys:
+            return (dic, '')
+        try:
+            (prnt, key) = self._parent(dic)
+            return (prnt[key], '')
+
+        except (TypeError, KeyError, IndexError) as exc:
+            return (None, str(exc))
+
+    def set(self, dic, val):
+        """setter for nested dicts, same as :func:`set_`. Values on the path
+        other than mapping objects are replaced with dicts, and the mapping
+        object at the path is merged with `val`.
+
+        :param dic: a dict[-like] object support recursive merge operations
+        :param val: Value to set
+        """
+        if not self._raw_keys:
+            merge(dic, mk_nested_dic(self.path, val), ac_merge=MS_DICTS)
+            return
+
+        for key in self._raw_keys[:-1]:
+            child = dic.get(key)
+            if not anyconfig.utils.is_dict_like(child):
+                child = dic[key] = {}
+            dic = child
+
+        key = self._raw_keys[-1]
+        if key in dic and anyconfig.utils.is_dict_like(dic[key]):
+            merge(dic[key], val, ac_merge=MS_DICTS)
+        else:
+            dic[key] = val
+
+    def delete(self, dic):
+        """deleter for nested dicts, looks up the value to delete in the same
+        manner as :meth:`get` does.
+
+        :param dic: a dict[-like] object
+        :return: A tuple of (deleted_object, error_message)
+        """
+        if not self.keys:
+            return (None, "Empty path")
+        try:
+            (prnt, key) = self._parent(dic)
+            return (prnt.pop(key), '')
+
+        except (TypeError, KeyError, IndexError, AttributeError) as exc:
+            return (None, str(exc))
+
+
+_COMPILED_PATHS = anyconfig.utils.LRUCache(maxsize=1024)
+
+
+def _compile_path(ckey):
+    """
+    :param ckey: A tuple of (path, seps, idx_reg)
+    """
+    return CompiledPath(*ckey)
+
+
+def compile_path(path, seps=PATH_SEPS, idx_reg=_JSNP_GET_ARRAY_IDX_REG):
+    """
+    Parse path expression `path` and make a :class:`CompiledPath` object, or
+    get the one cached in a bounded LRU cache.
+
+    :param path: Path expression to point object wanted
+    :param seps: Separator char candidates
+    :param idx_reg: Regex object to match with array indices to get
+    :return: :class:`CompiledPath` object
+
+    >>> compile_path("a.b") is compile_path("a.b")
+    True
+    >>> compile_path("/a~1b/c").keys
+    ('a/b', 'c')
+    """
+    return _COMPILED_PATHS.get_or_make((path, tuple(seps), idx_reg),
+                                       _compile_path)
+
+
 def get(dic, path, seps=PATH_SEPS, idx_reg=_JSNP_GET_ARRAY_IDX_REG):
     """getter for nested dicts.
 
@@ -116,19 +283,7 @@ def get(dic, path, seps=PATH_SEPS, idx_reg=_JSNP_GET_ARRAY_IDX_REG):
     >>> get(d, "/a/b/d/-")  # doctest: +ELLIPSIS
     (None, 'list indices must be integers...')
     """
-    items = [_jsnp_unescape(p) for p in _split_path(path, seps)]
-    if not items:
-        return (dic, '')
-    try:
-        if len(items) == 1:
-            return (dic[items[0]], '')
-
-        prnt = functools.reduce(operator.getitem, items[:-1], dic)
-        arr = anyconfig.utils.is_list_like(prnt) and idx_reg.match(items[-1])
-        return (prnt[int(items[-1])], '') if arr else (prnt[items[-1]], '')
-
-    except (TypeError, KeyError, IndexError) as exc:
-        return (None, str(exc))
+    return compile_path(path, seps, idx_reg).get(dic)
 
 
 def set_(dic, path, val, seps=PATH_SEPS):
@@ -143,7 +298,7 @@ def set_(dic, path, val, seps=PATH_SEPS):
     >>> d['a']['b']['d']
     3
     """
-    merge(dic, mk_nested_dic(path, val, seps), ac_merge=MS_DICTS)
+    compile_path(path, seps).set(dic, val)
 
 
 def _are_list_like(*objs):
@@ -189,12 +344,118 @@ def _update_wo_replace(self, other, key, val=None, **options):
         _update_with_replace(self, other, key, val=val)
 
 
+# Markers to make canonical keys of mapping objects, lists and tuples.
+_CANON_MAP = object()
+_CANON_LIST = object()
+_CANON_TUPLE = object()
+_PRIMITIVE_TYPES = frozenset(anyconfig.compat.STR_TYPES +
+                             (bytes, int, float, bool, type(None)))
+
+
+def _canonical_key(obj):
+    """
+    Make a hashable key of `obj` to look up objects equal to it. Objects equal
+    to each other have the same keys but objects have the same keys may not
+    be equal, e.g. OrderedDicts have same items in different orders.
+
+    :param obj: Any object
+    :return: A key made from the items of `obj` if it's a mapping object, a
+        list or a tuple, or `obj` itself if it's hashable
+    :raises: TypeError if such a key cannot be made from `obj`
+
+    >>> _canonical_key(1)
+    1
+    >>> _canonical_key({"a": [1]}) == _canonical_key({"a": [1]})
+    True
+    >>> _canonical_key([1]) == _canonical_key((1, ))
+    False
+    """
+    if type(obj) in _PRIMITIVE_TYPES:  # Fast path for most cases.
+        return obj
+
+    if anyconfig.utils.is_dict_like(obj):
+        return (_CANON_MAP, frozenset((k, _canonical_key(v)) for k, v
+                                      in obj.items()))
+    if isinstance(obj, list):
+        return (_CANON_LIST, tuple(_canonical_key(x) for x in obj))
+    if isinstance(obj, tuple):
+        return (_CANON_TUPLE, tuple(_canonical_key(x) for x in obj))
+
+    hash(obj)  # It raises TypeError if obj is not hashable.
+    return obj
+
+
+class _Members(object):
+    """
+    Container to check if an object is in a list equivalent to `obj in lst`
+    but finds objects with hash-based look ups.
+
+    >>> members = _Members([1, {"a": [2]}, [3]])
+    >>> [x in members for x in (1, 1.0, {"a": [2]}, [3], (3, ), 4)]
+    [True, True, True, True, False, False]
+    >>> members.add(4)
+    >>> 4 in members
+    True
+    """
+    __slots__ = ("_lst", "_buckets", "_others")
+
+    def __init__(self, lst):
+        """
+        :param lst: A list of any objects
+        """
+        self._lst = lst
+        self._buckets = {}
+        self._others = []  # Objects cannot make keys.
+        for item in lst:
+            self.add(item)
+
+    def add(self, item):
+        """
+        :param item: An object added to the list given on initialization
+        """
+        try:
+            self._buckets.setdefault(_canonical_key(item), []).append(item)
+        except TypeError:
+            self._others.append(item)
+
+    def __contains__(self, obj):
+        try:
+            cands = self._buckets.get(_canonical_key(obj), [])
+        except TypeError:
+            return obj in self._lst
+
+        if any(c is obj or c == obj for c in cands):
+            return True
+
+        return obj in self._others if self._others else False
+
+
 def _merge_list(self, key, lst):
     """
+    Append the items of `lst` not in self[key] in linear time. The items in
+    `lst` are looked up with hash values of them or their canonical keys.
+
     :param key: self[key] will be updated
     :param lst: Other list to merge
     """
-    self[key] += [x for x in lst if x not in self[key]]
+    members = _Members(self[key])
+    self[key] += [x for x in lst if x not in members]
+
+
+def _merge_lists(self, key, lsts):
+    """
+    Merge lists `lsts` into self[key] one by one, same as calling
+    :func:`_merge_list` for each of them but looks up items in one index.
+
+    :param key: self[key], a list, will be updated
+    :param lsts: Other lists to merge
+    """
+    members = _Members(self[key])
+    for lst in lsts:
+        news = [x for x in lst if x not in members]
+        self[key] += news
+        for item in news:
+            members.add(item)
 
 
 def _merge_other(self, key, val):
@@ -300,6 +561,510 @@ def merge(self, other, ac_merge=MS_DICTS, **options):
             raise type(exc)("%s other=%r" % (str(exc), other))
 
 
+def _group_values(others):
+    """
+    :param others: A list of mapping objects
+    :return: A list of tuples of (key, [values of key in `others`]) in the
+        order of keys appear first in `others`
+
+    >>> _group_values([dict(a=1), dict(b=2), dict(a=3)])
+    [('a', [1, 3]), ('b', [2])]
+    """
+    groups = {}
+    keys = []
+    for other in others:
+        for key in other:
+            vals = groups.get(key)
+            if vals is None:
+                vals = groups[key] = []
+                keys.append(key)
+            vals.append(other[key])
+
+    return [(key, groups[key]) for key in keys]
+
+
+def _copied(self, key, deep=False):
+    """
+    Replace self[key] with a copy of it to update the copy instead.
+
+    :param key: self[key] will be replaced
+    :param deep: Make a deep copy instead of a shallow copy if True
+    :return: The copy of self[key]
+
+    >>> dic = dict(a=[1])
+    >>> lst = dic["a"]
+    >>> _copied(dic, "a") is lst
+    False
+    """
+    self[key] = (copy.deepcopy if deep else copy.copy)(self[key])
+    return self[key]
+
+
+def _merge_values(self, key, vals, merge_lists=False, keep_others=False,
+                  **options):
+    """
+    Merge values `vals` into self[key] one by one in the same manner as
+    :func:`_update_with_merge` does but process successive mapping objects
+    and lists in `vals` at once.
+
+    :param key: self[key] will be updated
+    :param vals: A list of values to merge
+    :param merge_lists: Merge lists also if True
+    :param keep_others:
+        Copy self[key] before updating it in place if True, as it may be an
+        object in `vals` or in the others merged before
+    :param options: Keyword options passed to :func:`merge`
+    """
+    if key not in self:
+        self[key] = vals[0]
+        vals = vals[1:]
+
+    idx = 0
+    while idx < len(vals):
+        val0 = self[key]
+        if anyconfig.utils.is_dict_like(val0):
+            end = idx
+            while end < len(vals) and \
+                    anyconfig.utils.is_dict_like(vals[end]):
+                end += 1
+            if end == idx:  # Not a mapping object and may fail.
+                if keep_others:  # It may update the values of val0 also.
+                    val0 = _copied(self, key, deep=True)
+                merge(val0, vals[idx], merge_lists=merge_lists, **options)
+                end += 1
+            else:
+                if keep_others:
+                    val0 = _copied(self, key)
+                _merge_many(val0, vals[idx:end], merge_lists=merge_lists,
+                            keep_others=keep_others, **options)
+        elif merge_lists and isinstance(val0, list) and \
+                _are_list_like(vals[idx]):
+            end = idx
+            while end < len(vals) and _are_list_like(vals[end]):
+                end += 1
+            if keep_others:
+                _copied(self, key)
+            _merge_lists(self, key, vals[idx:end])
+        else:
+            end = idx + 1
+            if merge_lists and _are_list_like(val0, vals[idx]):
+                if keep_others:
+                    _copied(self, key)
+                _merge_list(self, key, vals[idx])
+            else:
+                _merge_other(self, key, vals[idx])
+        idx = end
+
+
+def _merge_many(self, others, merge_lists=False, keep_others=False,
+                **options):
+    """
+    Merge mapping objects `others` into `self` with the strategy MS_DICTS or
+    MS_DICTS_AND_LISTS (`merge_lists` is True) in a single traversal.
+
+    :param self: mapping object to update
+    :param others: A list of mapping objects
+    :param merge_lists: Merge lists also if True
+    :param keep_others: See :func:`_merge_values`
+    :param options: Keyword options passed to :func:`merge`
+    """
+    for key, vals in _group_values(others):
+        _merge_values(self, key, vals, merge_lists=merge_lists,
+                      keep_others=keep_others, **options)
+
+
+def merge_many(dicts, ac_merge=MS_DICTS, keep_others=False, **options):
+    """
+    Merge many mapping objects at once. The result is same as the one of
+    merging each of them into the first one with :func:`merge` sequentially,
+    but values of each key are grouped across all of them and merged in a
+    single traversal instead of visiting the key in each of them.
+
+    The first one is updated in place and values in the others are shared
+    with it. These values may be updated also unless `keep_others` is True,
+    in which case only the objects in the result to update are copied, and
+    the others are kept as they are.
+
+    :param dicts: A list of mapping objects
+    :param ac_merge: Merge strategy to choose
+    :param keep_others: Do not update the mapping objects but the first one
+    :param options: Keyword options passed to :func:`merge`
+
+    :return: The first mapping object in `dicts` updated with the others or
+        None if `dicts` is empty
+
+    >>> merge_many([dict(a=1, b=dict(c=2)), dict(b=dict(d=3)), dict(a=4)])
+    {'a': 4, 'b': {'c': 2, 'd': 3}}
+    >>> merge_many([dict(a=[1]), dict(a=[2]), dict(a=[1, 3])],
+    ...            ac_merge=MS_DICTS_AND_LISTS)
+    {'a': [1, 2, 3]}
+    """
+    if not dicts:
+        return None
+
+    (self, others) = (dicts[0], [d for d in dicts[1:] if d])
+    if ac_merge is None:
+        ac_merge = MS_DICTS
+
+    if ac_merge not in MERGE_STRATEGIES or \
+            not all(hasattr(other, "keys") for other in others):
+        if keep_others:  # Strategies may update any of them.
+            others = copy.deepcopy(others)
+        for other in others:  # Merge them one by one.
+            merge(self, other, ac_merge=ac_merge, **options)
+        return self
+
+    options.pop("merge_lists", None)
+    if ac_merge == MS_REPLACE:
+        for key, vals in _group_values(others):
+            self[key] = vals[-1]
+    elif ac_merge == MS_NO_REPLACE:
+        for key, vals in _group_values(others):
+            if key not in self:
+                self[key] = vals[0]
+    else:
+        _merge_many(self, others, merge_lists=ac_merge == MS_DICTS_AND_LISTS,
+                    keep_others=keep_others, **options)
+
+    return self
+
+
+def _jsnp_escape(key):
+    """
+    Encode `key` to a reference token of JSON Pointer, convert ~ to ~0 and /
+    to ~1.
+
+    >>> _jsnp_escape("a/b~c")
+    'a~1b~0c'
+    >>> _jsnp_escape(1)  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+    ValueError: Keys must be str but got: 1
+    """
+    if not isinstance(key, anyconfig.compat.STR_TYPES):
+        # These cannot be looked up with JSON Pointer made from them.
+        raise ValueError("Keys must be str but got: %r" % (key, ))
+
+    return key.replace('~', '~0').replace('/', '~1')
+
+
+def _is_array(obj):
+    """
+    :return: True if `obj` is a list or a tuple (frozen list)
+    """
+    return isinstance(obj, (list, tuple)) and \
+        not anyconfig.utils.is_namedtuple(obj)
+
+
+def _same_hashes(lhs, rhs):
+    """
+    :return: True if `lhs` and `rhs` are hashable and have the same hashes,
+        that is, these may be equal and worth checking with == instead of
+        walking them. False if these are not hashable or certainly not equal.
+    """
+    try:
+        return hash(lhs) == hash(rhs)
+    except TypeError:
+        return False
+
+
+def _equal(lhs, rhs):
+    """
+    :return: True if `lhs` and `rhs` are equal and have the same types unless
+        these are mapping objects or arrays, e.g. 1 and True are not equal
+    """
+    if lhs is rhs:
+        return True
+    if (anyconfig.utils.is_dict_like(lhs) and
+            anyconfig.utils.is_dict_like(rhs)) or \
+            (_is_array(lhs) and _is_array(rhs)):
+        return lhs == rhs
+
+    return type(lhs) is type(rhs) and lhs == rhs
+
+
+def _diff_dicts(old, new, path, ops):
+    """
+    :param old: A mapping object
+    :param new: Another mapping object
+    :param path: JSON Pointer of `old` and `new`
+    :param ops: A list of operations to append operations to
+    """
+    for key in old:
+        if key not in new:
+            ops.append(dict(op="remove", path=path + '/' + _jsnp_escape(key)))
+
+    for key in new:
+        kpath = path + '/' + _jsnp_escape(key)
+        if key not in old:
+            ops.append(dict(op="add", path=kpath, value=new[key]))
+        elif old[key] is not new[key]:
+            _diff(old[key], new[key], kpath, ops)
+
+
+def _diff_arrays(old, new, path, ops):
+    """
+    Items at the same indices after the common prefix are compared one by
+    one, and the rest are removed or added before the common suffix.
+
+    :param old: A list or a tuple
+    :param new: Another list or tuple
+    :param path: JSON Pointer of `old` and `new`
+    :param ops: A list of operations to append operations to
+    """
+    (nold, nnew) = (len(old), len(new))
+    size = min(nold, nnew)
+
+    pre = 0
+    while pre < size and _equal(old[pre], new[pre]):
+        pre += 1
+    suf = 0
+    while suf < size - pre and _equal(old[nold - suf - 1],
+                                      new[nnew - suf - 1]):
+        suf += 1
+
+    (mold, mnew) = (nold - pre - suf, nnew - pre - suf)
+    for idx in range(pre, pre + min(mold, mnew)):
+        if old[idx] is not new[idx]:
+            _diff(old[idx], new[idx], "%s/%d" % (path, idx), ops)
+
+    if mold > mnew:
+        for idx in range(pre + mold - 1, pre + mnew - 1, -1):
+            ops.append(dict(op="remove", path="%s/%d" % (path, idx)))
+    else:
+        for idx in range(pre + mold, pre + mnew):
+            ops.append(dict(op="add", path="%s/%d" % (path, idx),
+                            value=new[idx]))
+
+
+def _diff(old, new, path, ops):
+    """
+    :param old: Any object
+    :param new: Any object
+    :param path: JSON Pointer of `old` and `new`
+    :param ops: A list of operations to append operations to
+    """
+    if old is new:  # Shared subtrees are never walked.
+        return
+
+    if anyconfig.utils.is_dict_like(old) and \
+            anyconfig.utils.is_dict_like(new):
+        # Hashable ones such as frozen configs are compared with == at once
+        # if they may be equal, and walked only if they're not.
+        if not (_same_hashes(old, new) and old == new):
+            _diff_dicts(old, new, path, ops)
+    elif _is_array(old) and _is_array(new):
+        if not (_same_hashes(old, new) and _equal(old, new)):
+            _diff_arrays(old, new, path, ops)
+    elif not _equal(old, new):
+        ops.append(dict(op="replace", path=path, value=new))
+
+
+def diff(old, new):
+    """
+    Make a list of operations to change `old` to `new` in the format of JSON
+    Patch, http://tools.ietf.org/html/rfc6902. Operations are one of 'add',
+    'remove' and 'replace' and paths of them are JSON Pointer expressions
+    same as the ones :func:`get` accepts.
+
+    Subtrees identical to each other, e.g. ones shared among hash-consed
+    :class:`anyconfig.frozen.FrozenConfig` objects, are skipped, and hashable
+    subtrees have the same hash values and are equal are not walked item by
+    item. Other subtrees are walked to find differences.
+
+    :param old: A mapping object
+    :param new: Another mapping object
+    :return: A list of operations, dicts with 'op', 'path' and 'value' keys
+    :raises: ValueError if keys of mapping objects to compare are not str
+
+    >>> diff(dict(a=1, b=dict(c=[1, 2]), d=0), dict(a=2, b=dict(c=[1])))
+    ... # doctest: +NORMALIZE_WHITESPACE
+    [{'op': 'remove', 'path': '/d'},
+     {'op': 'replace', 'path': '/a', 'value': 2},
+     {'op': 'remove', 'path': '/b/c/1'}]
+    >>> diff(dict(a=1), dict(a=1))
+    []
+    """
+    ops = []
+    _diff(old, new, '', ops)
+    return ops
+
+
+def _parse_pointer(path):
+    """
+    :param path: JSON Pointer expression
+    :return: A list of reference tokens unescaped
+    :raises: ValueError if `path` is not a valid JSON Pointer expression
+
+    >>> _parse_pointer(""), _parse_pointer("/a~1b/0"), _parse_pointer("/")
+    ([], ['a/b', '0'], [''])
+    """
+    if not path:
+        return []
+    if not path.startswith('/'):
+        raise ValueError("Invalid JSON Pointer: %r" % path)
+
+    return [_jsnp_unescape(key) for key in path.split('/')[1:]]
+
+
+def _get_by_keys(obj, keys):
+    """
+    :param obj: A mapping object or an array
+    :param keys: A list of reference tokens
+    :return: The object at `keys` in `obj`
+    :raises: KeyError, IndexError or TypeError if it's not found
+    """
+    for key in keys:
+        if _is_array(obj):
+            idx = _to_index(key, _JSNP_GET_ARRAY_IDX_REG)
+            if idx is None:
+                raise IndexError("Invalid index: %r" % key)
+            obj = obj[idx]
+        else:
+            obj = obj[key]
+
+    return obj
+
+
+def _patch_tuple(cnf, keys, prnt, update_fn):
+    """
+    Update the tuple `prnt` at `keys` in `cnf` by replacing it with new one.
+
+    :param cnf: A mapping object to update
+    :param keys: A list of reference tokens to `prnt`
+    :param prnt: A tuple
+    :param update_fn: Callable to update a list of items of `prnt`
+    :return: The result of `update_fn`
+    """
+    lst = list(prnt)
+    ret = update_fn(lst)
+    _patch_add(cnf, keys, type(prnt)(lst), replace=True)
+    return ret
+
+
+def _patch_add(cnf, keys, val, replace=False):
+    """
+    Add or replace the value at `keys` in `cnf`.
+
+    :param cnf: A mapping object to update
+    :param keys: A list of reference tokens
+    :param val: Value to add
+    :param replace: The value at `keys` must exist and be replaced if True
+    """
+    if not keys:  # The whole document.
+        if not anyconfig.utils.is_dict_like(val):
+            raise TypeError("Cannot replace a mapping object with %r" % val)
+        cnf.clear()
+        cnf.update(val)
+        return
+
+    prnt = _get_by_keys(cnf, keys[:-1])
+    key = keys[-1]
+    if _is_array(prnt) and not isinstance(prnt, list):
+        _patch_tuple(cnf, keys[:-1], prnt,
+                     lambda lst: _patch_add(lst, [key], val, replace))
+    elif isinstance(prnt, list):
+        idx = _to_index(key, _JSNP_SET_ARRAY_IDX)
+        if idx is None or (idx == '-' and replace) or \
+                (idx != '-' and idx > len(prnt) - (1 if replace else 0)):
+            raise IndexError("Invalid index: %r" % key)
+        if replace:
+            prnt[idx] = val
+        elif idx == '-':
+            prnt.append(val)
+        else:
+            prnt.insert(idx, val)
+    else:
+        if replace and key not in prnt:
+            raise KeyError(key)
+        prnt[key] = val
+
+
+def _patch_remove(cnf, keys):
+    """
+    Remove the value at `keys` in `cnf`.
+
+    :param cnf: A mapping object to update
+    :param keys: A list of reference tokens
+    :return: The value removed
+    """
+    if not keys:
+        raise KeyError("Cannot remove the whole document")
+
+    prnt = _get_by_keys(cnf, keys[:-1])
+    key = keys[-1]
+    if _is_array(prnt) and not isinstance(prnt, list):
+        return _patch_tuple(cnf, keys[:-1], prnt,
+                            lambda lst: _patch_remove(lst, [key]))
+    if isinstance(prnt, list):
+        idx = _to_index(key, _JSNP_GET_ARRAY_IDX_REG)
+        if idx is None:
+            raise IndexError("Invalid index: %r" % key)
+        return prnt.pop(idx)
+
+    return prnt.pop(key)
+
+
+def _patch_one(cnf, operation):
+    """
+    :param cnf: A mapping object to update
+    :param operation: A mapping object of an operation
+    """
+    opr = operation["op"]
+    keys = _parse_pointer(operation["path"])
+
+    if opr == "add":
+        _patch_add(cnf, keys, copy.deepcopy(operation["value"]))
+    elif opr == "replace":
+        _patch_add(cnf, keys, copy.deepcopy(operation["value"]),
+                   replace=True)
+    elif opr == "remove":
+        _patch_remove(cnf, keys)
+    elif opr == "move":
+        fkeys = _parse_pointer(operation["from"])
+        if keys[:len(fkeys)] == fkeys and keys != fkeys:
+            raise ValueError("Cannot move a value into its children")
+        _patch_add(cnf, keys, _patch_remove(cnf, fkeys))
+    elif opr == "copy":
+        val = _get_by_keys(cnf, _parse_pointer(operation["from"]))
+        _patch_add(cnf, keys, copy.deepcopy(val))
+    elif opr == "test":
+        if not _equal(_get_by_keys(cnf, keys), operation["value"]):
+            raise ValueError("Test failed")
+    else:
+        raise ValueError("Unknown operation")
+
+
+def patch(cnf, ops):
+    """
+    Apply JSON Patch operations `ops`, http://tools.ietf.org/html/rfc6902,
+    e.g. made by :func:`diff`, to a mapping object `cnf` in place. Values in
+    `ops` are deep-copied before they are added.
+
+    Operations are applied one by one so that `cnf` is left updated with the
+    operations before the failed one if an error occurs.
+
+    :param cnf: A mapping object to update
+    :param ops: A list of operations, mapping objects have 'op', 'path' and
+        'value' or 'from' keys as needed
+    :raises: ValueError if any of operations is invalid, its target does not
+        exist or a test operation failed
+
+    >>> cnf = dict(a=1, b=dict(c=[1, 2]), d=0)
+    >>> patch(cnf, [dict(op="replace", path="/a", value=2),
+    ...             dict(op="add", path="/b/c/-", value=3),
+    ...             dict(op="move", path="/e", **{"from": "/d"})])
+    >>> cnf == dict(a=2, b=dict(c=[1, 2, 3]), e=0)
+    True
+    """
+    for operation in ops:
+        try:
+            _patch_one(cnf, operation)
+        except (KeyError, IndexError, TypeError, AttributeError) as exc:
+            raise ValueError("Failed to apply %r: %r" % (operation, exc))
+        except ValueError as exc:
+            raise ValueError("Failed to apply %r: %s" % (operation, exc))
+
+
 def _make_recur(obj, make_fn, ac_ordered=False, ac_dict=None, **options):
     """
     :param obj: A mapping objects or other primitive object
@@ -0,0 +1,293 @@
+#
+# Copyright (C) 2018 Satoru SATOH <ssato redhat.com>
+# License: MIT
+#
+r"""anyconfig.frozen module provides immutable and hashable mapping objects.
+
+:class:`FrozenConfig` can be used as a mapping object factory with ac_dict
+keyword option to load config files, e.g.
+``anyconfig.load(path, ac_dict=FrozenConfig)``, and with
+:func:`anyconfig.dicts.convert_to`.
+
+- Values are frozen recursively: mapping objects become :class:`FrozenConfig`
+  objects, lists and tuples become tuples and sets become frozensets.
+- Keys and values are kept in tuples. Keys of str are interned and the tuples
+  of keys and the index to look up values are shared among the objects have
+  the same keys.
+- Objects are hash-consed, that is, making an object has the same items in
+  the same order as an existing one returns the existing one instead of new
+  one. So equal subtrees in many configs, e.g. the common part of configs of
+  tenants, are kept only once.
+- Objects are never copied by :func:`copy.copy` and :func:`copy.deepcopy`
+  because these cannot be changed. Leaf values are expected to be immutable
+  also.
+- Simple queries such as ac_query='a.b[0]' and the ones with
+  :func:`anyconfig.query_many` index tuples as lists but JMESPath does not,
+  so that indices in other expressions evaluated with jmespath match nothing
+  in frozen configs. Thaw them with :func:`thaw` before such queries.
+
+Changelog:
+
+.. versionadded:: 0.9.5
+
+   - Added to keep loaded config data immutable and share equal subtrees.
+"""
+from __future__ import absolute_import
+
+import collections
+import math
+import threading
+import weakref
+
+import anyconfig.compat
+import anyconfig.utils
+
+try:
+    from sys import intern as _intern
+except ImportError:  # python 2
+    _intern = intern  # noqa: F821  pylint: disable=invalid-name
+
+
+# Hash-consing tables, kept while objects in them are alive.
+_KEY_TABLES = weakref.WeakValueDictionary()
+_OBJECTS = weakref.WeakValueDictionary()
+_LOCK = threading.Lock()
+
+
+def _intern_key(obj):
+    """
+    Make a key to look up an object identical to `obj` in the hash-consing
+    tables. Types are a part of keys not to confuse equal objects of different
+    types, e.g. 1 and True, and signs of floats are also not to confuse 0.0
+    and -0.0.
+
+    :param obj: A frozen object
+    :return: A hashable key
+    :raises: TypeError if `obj` or any item of it is not hashable
+
+    >>> _intern_key(1) == _intern_key(True)
+    False
+    >>> _intern_key((1, "a")) == _intern_key((1, "a"))
+    True
+    >>> _intern_key(0.0) == _intern_key(-0.0)
+    False
+    """
+    if isinstance(obj, FrozenConfig):
+        return (type(obj), id(obj))  # These are hash-consed already.
+    if isinstance(obj, tuple):
+        return (type(obj), tuple(_intern_key(x) for x in obj))
+    if isinstance(obj, float):
+        return (type(obj), obj, math.copysign(1.0, obj))
+
+    hash(obj)
+    return (type(obj), obj)
+
+
+class _KeyTable(object):
+    """
+    Keys of :class:`FrozenConfig` objects and the index of them shared among
+    the objects have the same keys.
+    """
+    __slots__ = ("keys", "index", "__weakref__")
+
+    def __init__(self, keys):
+        """
+        :param keys: A tuple of keys
+        """
+        self.keys = keys
+        self.index = dict((key, idx) for idx, key in enumerate(keys))
+
+
+def _key_table(keys):
+    """
+    :param keys: An iterable yields keys
+    :return: A :class:`_KeyTable` object has `keys`
+    """
+    keys = tuple(_intern(k) if type(k) is str else k for k in keys)
+    try:
+        ikey = tuple(_intern_key(k) for k in keys)
+    except TypeError:
+        return _KeyTable(keys)
+
+    with _LOCK:
+        table = _KEY_TABLES.get(ikey)
+        if table is None:
+            table = _KEY_TABLES[ikey] = _KeyTable(keys)
+
+    return table
+
+
+def freeze(obj, container=None):
+    """
+    Freeze `obj` recursively.
+
+    :param obj: A mapping object, a list or any other object
+    :param container: :class:`FrozenConfig` or its subclass to make frozen
+        mapping objects, or None to use :class:`FrozenConfig`
+
+    :return: A frozen object equivalent to `obj`
+
+    >>> freeze({"a": [1, {"b": 2}]})
+    FrozenConfig({'a': (1, FrozenConfig({'b': 2}))})
+    >>> freeze({"a": [1]}) is freeze({"a": (1, )})
+    True
+    """
+    if container is None:
+        container = FrozenConfig
+
+    if type(obj) is container:
+        return obj
+    if anyconfig.utils.is_dict_like(obj):
+        return container(obj.items())
+    if isinstance(obj, list):
+        return tuple(freeze(x, container) for x in obj)
+    if isinstance(obj, tuple):
+        vals = [freeze(x, container) for x in obj]
+        if anyconfig.utils.is_namedtuple(obj):
+            return type(obj)(*vals)
+        return tuple(vals)
+    if isinstance(obj, (set, frozenset)):
+        return frozenset(freeze(x, container) for x in obj)
+
+    return obj
+
+
+def thaw(obj, container=dict):
+    """
+    Make mutable copy of `obj` frozen by :func:`freeze`.
+
+    :param obj: A frozen object or any other object
+    :param container: callable to make mutable mapping objects
+    :return: A copy of `obj` made of mapping objects and lists
+
+    >>> thaw(freeze({"a": [1, {"b": 2}]}))
+    {'a': [1, {'b': 2}]}
+    """
+    if anyconfig.utils.is_dict_like(obj):
+        return container((k, thaw(v, container)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)) and \
+            not anyconfig.utils.is_namedtuple(obj):
+        return [thaw(x, container) for x in obj]
+
+    return obj
+
+
+def is_frozen(obj):
+    """
+    :param obj: Any object
+    :return: True if `obj` is a :class:`FrozenConfig` object
+
+    >>> is_frozen(FrozenConfig(a=1)), is_frozen(dict(a=1))
+    (True, False)
+    """
+    return isinstance(obj, FrozenConfig)
+
+
+def is_frozen_factory(factory):
+    """
+    :param factory: A callable to make mapping objects such as dict
+    :return: True if `factory` is :class:`FrozenConfig` or its subclass
+
+    >>> is_frozen_factory(FrozenConfig), is_frozen_factory(dict)
+    (True, False)
+    """
+    return isinstance(factory, type) and issubclass(factory, FrozenConfig)
+
+
+class FrozenConfig(collections.Mapping):
+    """
+    Immutable, hashable and hash-consed mapping object. It takes the same
+    arguments as dict does and keeps the order of items given.
+
+    >>> cnf = FrozenConfig([("a", 1), ("b", {"c": [2]})])
+    >>> cnf
+    FrozenConfig({'a': 1, 'b': FrozenConfig({'c': (2,)})})
+    >>> cnf["b"]["c"], cnf == dict(a=1, b=dict(c=(2, )))
+    ((2,), True)
+    >>> cnf is FrozenConfig(a=1, b=FrozenConfig(c=[2]))
+    True
+    >>> {cnf: 1}[FrozenConfig(b=dict(c=[2]), a=1)]
+    1
+    """
+    __slots__ = ("_table", "_vals", "_hash", "__weakref__")
+
+    def __new__(cls, *args, **kwargs):
+        if len(args) == 1 and not kwargs and type(args[0]) is cls:
+            return args[0]
+
+        items = anyconfig.compat.OrderedDict(*args, **kwargs)
+        table = _key_table(items.keys())
+        vals = tuple(freeze(v, cls) for v in items.values())
+        try:
+            ikey = (cls, id(table), tuple(_intern_key(v) for v in vals))
+        except TypeError:  # Some leaf values are not hashable.
+            return cls._make(table, vals)
+
+        with _LOCK:
+            obj = _OBJECTS.get(ikey)
+            if obj is None:
+                obj = _OBJECTS[ikey] = cls._make(table, vals)
+
+        return obj
+
+    @classmethod
+    def _make(cls, table, vals):
+        """
+        :param table: A :class:`_KeyTable` object
+        :param vals: A tuple of values frozen
+        """
+        obj = super(FrozenConfig, cls).__new__(cls)
+        obj._table = table
+        obj._vals = vals
+        obj._hash = None
+        return obj
+
+    def __getitem__(self, key):
+        return self._vals[self._table.index[key]]
+
+    def __contains__(self, key):
+        return key in self._table.index
+
+    def __iter__(self):
+        return iter(self._table.keys)
+
+    def __len__(self):
+        return len(self._vals)
+
+    def items(self):
+        return list(zip(self._table.keys, self._vals))
+
+    def values(self):
+        return list(self._vals)
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, FrozenConfig) and self._table is other._table:
+            return self._vals == other._vals
+
+        return collections.Mapping.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(self.items()))
+        return self._hash
+
+    def __repr__(self):
+        return "%s({%s})" % (type(self).__name__,
+                             ", ".join("%r: %r" % item for item
+                                       in self.items()))
+
+    def __reduce__(self):
+        return (type(self), (self.items(), ))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+# vim:sw=4:ts=4:et:
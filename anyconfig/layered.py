@@ -0,0 +1,179 @@
+#
+# Copyright (C) 2018 Satoru SATOH <ssato redhat.com>
+# License: MIT
+#
+r"""anyconfig.layered module provides a read-only view of layered configs.
+
+:class:`LayeredConfig` keeps mapping objects loaded from config files as
+layers, e.g. defaults, site, host and environment specific overrides, and
+resolves the value of each key only when it's looked up in the same manner as
+merging them with :func:`anyconfig.dicts.merge` does, instead of merging all
+of them in advance. Making it costs only O(number of layers).
+
+.. code-block:: python
+
+  cnf = LayeredConfig([defaults, site, host], ac_merge=MS_DICTS)
+  port = cnf["server"]["port"]  # Only cnf["server"] is resolved.
+  dic = cnf.materialize()  # A dict same as the result of merge.
+
+Changelog:
+
+.. versionadded:: 0.9.5
+
+   - Added to resolve values in layered configs lazily.
+"""
+from __future__ import absolute_import
+
+import collections
+import copy
+
+import anyconfig.dicts
+import anyconfig.utils
+
+
+def _last_run(vals, pred):
+    """
+    :param vals: A list of values
+    :param pred: A predicate function
+    :return: The longest suffix of `vals` of which values satisfy `pred`
+
+    >>> _last_run([{}, 1, {}, {}], anyconfig.utils.is_dict_like)
+    [{}, {}]
+    """
+    idx = len(vals)
+    while idx > 0 and pred(vals[idx - 1]):
+        idx -= 1
+
+    return vals[idx:]
+
+
+class LayeredConfig(collections.Mapping):
+    """
+    Read-only mapping object to look up values in layered mapping objects.
+    Later layers take precedence over earlier ones as the mapping objects
+    merged later do with :func:`anyconfig.dicts.merge`.
+
+    Values of keys are resolved according to the merge strategy `ac_merge`
+    when these are looked up first and memoized:
+
+    - MS_REPLACE: the value in the last layer has the key
+    - MS_NO_REPLACE: the value in the first layer has the key
+    - MS_DICTS: mapping objects in successive layers are merged recursively
+      and other values are replaced with the ones in later layers
+    - MS_DICTS_AND_LISTS: lists in successive layers are also merged
+
+    Mapping objects in values are returned as :class:`LayeredConfig` objects
+    layered in the same way. Note that mapping objects in lower layers are
+    just replaced with non-mapping values in higher layers although
+    :func:`anyconfig.dicts.merge` tries to update them with the values.
+
+    >>> cnf = LayeredConfig([dict(a=1, b=dict(c=2, d=[1])),
+    ...                      dict(b=dict(d=[2]), e=3)])
+    >>> (cnf["a"], cnf["b"]["c"], cnf["b"]["d"], len(cnf))
+    (1, 2, [2], 3)
+    >>> sorted(cnf.materialize().items())
+    [('a', 1), ('b', {'c': 2, 'd': [2]}), ('e', 3)]
+    """
+    __slots__ = ("layers", "strategy", "_keys", "_cache")
+
+    def __init__(self, layers, ac_merge=anyconfig.dicts.MS_DICTS):
+        """
+        :param layers: A list of mapping objects, lower layers first
+        :param ac_merge: Merge strategy, one of MERGE_STRATEGIES
+        :raises: ValueError if `ac_merge` is not a valid merge strategy
+        """
+        if ac_merge is None:
+            ac_merge = anyconfig.dicts.MS_DICTS
+        if ac_merge not in anyconfig.dicts.MERGE_STRATEGIES:
+            raise ValueError("Wrong merge strategy: %r" % ac_merge)
+
+        self.layers = [layer for layer in layers if layer]
+        self.strategy = ac_merge
+        self._keys = None
+        self._cache = {}
+
+    def __repr__(self):
+        return "<LayeredConfig layers=%d strategy=%s>" % \
+            (len(self.layers), self.strategy)
+
+    def _resolve(self, vals):
+        """
+        :param vals: A non-empty list of values of a key in layers
+        :return: The value resolved from `vals`
+        """
+        if self.strategy == anyconfig.dicts.MS_REPLACE:
+            vals = vals[-1:]
+        elif self.strategy == anyconfig.dicts.MS_NO_REPLACE:
+            vals = vals[:1]
+
+        if anyconfig.utils.is_dict_like(vals[-1]):
+            # Mapping objects in lower layers replaced with other values
+            # never appear in merged results.
+            return LayeredConfig(_last_run(vals, anyconfig.utils.is_dict_like),
+                                 self.strategy)
+
+        if self.strategy == anyconfig.dicts.MS_DICTS_AND_LISTS and \
+                isinstance(vals[-1], list):
+            lsts = _last_run(vals, anyconfig.utils.is_list_like)
+            if len(lsts) > 1 and isinstance(lsts[0], list):
+                tmp = dict(lst=list(lsts[0]))
+                anyconfig.dicts._merge_lists(tmp, "lst", lsts[1:])
+                return tmp["lst"]
+
+        return vals[-1]
+
+    def __getitem__(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        vals = [layer[key] for layer in self.layers if key in layer]
+        if not vals:
+            raise KeyError(key)
+
+        val = self._cache[key] = self._resolve(vals)
+        return val
+
+    def _list_keys(self):
+        """
+        :return: A list of keys in all layers in the order of these appear
+        """
+        if self._keys is None:
+            seen = set()
+            self._keys = [key for layer in self.layers for key in layer
+                          if not (key in seen or seen.add(key))]
+        return self._keys
+
+    def __iter__(self):
+        return iter(self._list_keys())
+
+    def __len__(self):
+        return len(self._list_keys())
+
+    def __contains__(self, key):
+        if key in self._cache:
+            return True
+        return any(key in layer for layer in self.layers)
+
+    def materialize(self, container=dict):
+        """
+        Resolve values of all keys and make a mapping object from them.
+
+        :param container: callable to make a container object
+        :return: <container> object independent from the layers
+        """
+        cnf = container()
+        for key in self:
+            val = self[key]
+            if isinstance(val, LayeredConfig):
+                cnf[key] = val.materialize(container)
+            elif anyconfig.utils.is_dict_like(val):
+                cnf[key] = anyconfig.dicts.convert_to(copy.deepcopy(val),
+                                                      ac_dict=container)
+            else:
+                cnf[key] = copy.deepcopy(val)
+
+        return cnf
+
+# vim:sw=4:ts=4:et:
@@ -6,6 +6,18 @@ r"""anyconfig.query module to support query data with JMESPath expressions.
 
 Changelog:
 
+.. versionchanged:: 0.9.5
+
+   - Compiled JMESPath expressions are cached in a bounded LRU cache keyed by
+     expression strings, see :func:`compile_` and :func:`cache_stats`.
+   - ac_query keyword option accepts precompiled expression objects also.
+   - Added :func:`query_many` to evaluate many expressions in one pass.
+   - Added :func:`parse_simple_path` and :func:`search_path` to evaluate
+     simple expressions such as 'a.b[0]' without jmespath, e.g. in parsers
+     to load only the subtree selected with ac_query. These index tuples in
+     frozen configs also but JMESPath indexes lists only, so that indices in
+     other expressions evaluated with jmespath match nothing in them.
+
 .. versionadded:: 0.8.3
 
    - Added to query config data with JMESPath expression, http://jmespath.org
@@ -16,9 +28,229 @@ try:
 except ImportError:
     pass
 
+import collections
+import re
+
+import anyconfig.compat
+import anyconfig.utils
 from anyconfig.globals import LOGGER
 
 
+# Unquoted identifiers and array indices of JMESPath expressions.
+_SIMPLE_PATH_SEG_RE = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)"
+                                 r"((?:\[-?[0-9]+\])*)$")
+_SIMPLE_PATH_IDX_RE = re.compile(r"\[(-?[0-9]+)\]")
+
+
+# Compiled expressions keyed by expression strings.
+_CACHE = anyconfig.utils.LRUCache(maxsize=256)
+
+
+def is_compiled(expression):
+    """
+    :param expression: Expression string or compiled expression object
+    :return: True if `expression` is a compiled expression object
+
+    >>> is_compiled("a.b")
+    False
+    """
+    return callable(getattr(expression, "search", None))
+
+
+def compile_(expression):
+    """
+    Compile JMESPath expression `expression` or get the cached compiled one.
+
+    :param expression: Expression string or compiled expression object
+    :return: Compiled expression object
+    :raises: NameError if jmespath is not available, and ValueError (errors
+        of jmespath.exceptions) if `expression` is invalid
+    """
+    if is_compiled(expression):
+        return expression
+
+    return _CACHE.get_or_make(expression, jmespath.compile)
+
+
+def cache_stats():
+    """
+    :return: A dict of hits, misses, size and maxsize of the cache of compiled
+        expressions
+    """
+    return _CACHE.stats()
+
+
+def clear_cache():
+    """Clear the cache of compiled expressions.
+    """
+    _CACHE.clear()
+
+
+def parse_simple_path(expression):
+    """
+    Parse JMESPath expression consists only of field names and array indices
+    such as 'a.b[0].c'.
+
+    :param expression: Expression string
+    :return: A tuple of keys (str) and indices (int) or None if `expression`
+        is not such a simple one
+
+    >>> parse_simple_path("a.b[0][-1].c")
+    ('a', 'b', 0, -1, 'c')
+    >>> parse_simple_path("a[?b == 'c']") is None
+    True
+    >>> parse_simple_path("a.b | c") is None
+    True
+    """
+    if not isinstance(expression, anyconfig.compat.STR_TYPES):
+        return None
+
+    path = []
+    for seg in expression.split('.'):
+        match = _SIMPLE_PATH_SEG_RE.match(seg)
+        if not match:
+            return None
+
+        path.append(match.group(1))
+        path.extend(int(idx) for idx
+                    in _SIMPLE_PATH_IDX_RE.findall(match.group(2)))
+
+    return tuple(path)
+
+
+def _is_array(obj):
+    """
+    :return: True if `obj` is a sequence but not a string
+
+    >>> _is_array([]), _is_array(()), _is_array("a"), _is_array({})
+    (True, True, False, False)
+    """
+    return isinstance(obj, collections.Sequence) and \
+        not isinstance(obj, (anyconfig.compat.STR_TYPES, bytes))
+
+
+def _step(obj, key):
+    """
+    Get the child of `obj` in the same manner as JMESPath does; None is
+    returned if it does not exist or `obj` is not a mapping nor a sequence.
+    Tuples such as the ones in frozen configs (see :mod:`anyconfig.frozen`)
+    can be indexed as well as lists unlike JMESPath.
+
+    :param obj: Mapping or sequence object or any other objects
+    :param key: A key (str) or an index (int)
+
+    >>> _step({"a": 1}, "a"), _step([1, 2], -1), _step([1], 2), _step(1, "a")
+    (1, 2, None, None)
+    >>> _step((1, 2), 0), _step("ab", 0)
+    (1, None)
+    """
+    if isinstance(key, int):
+        if not _is_array(obj):
+            return None
+        try:
+            return obj[key]
+        except IndexError:
+            return None
+
+    if anyconfig.utils.is_dict_like(obj):
+        return obj.get(key)
+
+    return None
+
+
+def search_path(data, path):
+    """
+    Get the value at `path` in `data` in the same manner as JMESPath does.
+
+    :param data: Target object (a dict or a dict-like object) to query
+    :param path: A sequence of keys (str) and indices (int) made by
+        :func:`parse_simple_path`
+    :return: The value at `path` or None if it does not exist
+
+    >>> search_path({"a": {"b": [1, 2]}}, ("a", "b", 1))
+    2
+    >>> search_path({"a": {"b": [1, 2]}}, ("a", "c", 1)) is None
+    True
+    """
+    for key in path:
+        data = _step(data, key)
+        if data is None:
+            break
+
+    return data
+
+
+def _make_path_trie(paths):
+    """
+    :param paths: A list of tuples of (name, path parsed)
+    :return: A trie, nested dicts of {key: [names, subtrie]}
+    """
+    trie = {}
+    for name, path in paths:
+        node = [[], trie]
+        for key in path:
+            node = node[1].setdefault(key, [[], {}])
+        node[0].append(name)
+
+    return trie
+
+
+def _search_paths(data, paths):
+    """
+    Walk `data` once along the path trie and get values at `paths`. Common
+    path prefixes are walked only once.
+
+    :param data: Target object to query
+    :param paths: A list of tuples of (name, path parsed)
+    :return: A dict of {name: value}
+    """
+    res = {}
+    stack = [(data, _make_path_trie(paths))]
+    while stack:
+        (obj, trie) = stack.pop()
+        for key, (names, subtrie) in trie.items():
+            child = _step(obj, key)
+            for name in names:
+                res[name] = child
+            if subtrie:
+                stack.append((child, subtrie))
+
+    return res
+
+
+def query_many(data, expressions):
+    """
+    Evaluate many JMESPath expressions against `data` at once.
+
+    Expressions consist only of field names and array indices such as 'a.b[0]'
+    are evaluated together in a single walk sharing common path prefixes, and
+    others are compiled once (see :func:`compile_`) and evaluated one by one.
+
+    :param data: Target object (a dict or a dict-like object) to query
+    :param expressions:
+        A mapping object of {name: expression string or compiled expression}
+    :return: A dict of {name: queried result}
+
+    >>> res = query_many({"a": {"b": [1, 2], "c": 3}},
+    ...                  dict(x="a.b[1]", y="a.c", z="a.d"))
+    >>> sorted(res.items())
+    [('x', 2), ('y', 3), ('z', None)]
+    """
+    (paths, others) = ([], [])
+    for name, expression in expressions.items():
+        path = parse_simple_path(expression)
+        if path is None:
+            others.append((name, expression))
+        else:
+            paths.append((name, path))
+
+    res = _search_paths(data, paths)
+    for name, expression in others:
+        res[name] = query(data, ac_query=expression)
+
+    return res
+
+
 def query(data, **options):
     """
     Filter data with given JMESPath expression.
@@ -28,7 +260,7 @@ def query(data, **options):
     :parae data: Target object (a dict or a dict-like object) to query
     :param options:
         Keyword option may include 'ac_query' which is a string represents
-        JMESPath expression.
+        JMESPath expression or a compiled expression object.
 
     :return: Maybe queried result data, primitive (int, str, ...) or dict
     """
@@ -37,7 +269,7 @@ def query(data, **options):
         return data
 
     try:
-        pexp = jmespath.compile(expression)
+        pexp = compile_(expression)
         return pexp.search(data)
     except ValueError as exc:  # jmespath.exceptions.*Error inherit from it.
         LOGGER.warning("Failed to compile or search: exp=%s, exc=%r",
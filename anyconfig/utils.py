@@ -9,6 +9,7 @@ from __future__ import absolute_import
 import collections
 import glob
 import os.path
+import threading
 import types
 
 import anyconfig.compat
@@ -291,4 +292,94 @@ def filter_options(keys, options):
     """
     return dict((k, options[k]) for k in keys if k in options)
 
+
+_MISSING = object()  # Marker of cache misses.
+
+
+class LRUCache(object):
+    """
+    A thread-safe LRU cache with size bound.
+
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache.get_or_make("a", str.upper)
+    'A'
+    >>> cache.set("b", "B")
+    'B'
+    >>> cache.get("a")
+    'A'
+    >>> cache.get_or_make("c", str.upper)  # "b" is the least recently used.
+    'C'
+    >>> cache.get("b") is None
+    True
+    >>> sorted(cache.stats().items())
+    [('hits', 1), ('maxsize', 2), ('misses', 3), ('size', 2)]
+    """
+    def __init__(self, maxsize=128):
+        """
+        :param maxsize: Maximum number of the values to keep
+        """
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data = anyconfig.compat.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        :param key: Hashable key of the value
+        :param default: Value to return if there is no value for `key`
+        :return: The cached value or `default`
+        """
+        with self._lock:
+            try:
+                val = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self._data[key] = val  # Move to the end, most recently used.
+            self.hits += 1
+            return val
+
+    def set(self, key, val):
+        """
+        :param key: Hashable key of the value
+        :param val: Value to cache
+        :return: `val`
+        """
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = val
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+        return val
+
+    def get_or_make(self, key, make_fn):
+        """
+        :param key: Hashable key of the value
+        :param make_fn: Callable to make the value from `key` on cache misses.
+            It's called out of the lock and errors are not cached.
+        :return: The cached value or the one made
+        """
+        val = self.get(key, _MISSING)
+        if val is _MISSING:
+            val = self.set(key, make_fn(key))
+
+        return val
+
+    def clear(self):
+        """Clear the cached values and the statistics.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """
+        :return: A dict of hits, misses, size and maxsize of this cache
+        """
+        with self._lock:
+            return dict(hits=self.hits, misses=self.misses,
+                        size=len(self._data), maxsize=self.maxsize)
+
 # vim:sw=4:ts=4:et:
@@ -0,0 +1,399 @@
+#
+# Copyright (C) 2018 Satoru SATOH <ssato redhat.com>
+# License: MIT
+#
+r"""anyconfig.watcher module to watch config files and reload them on changes.
+
+:func:`watch` loads config files in the same way as :func:`anyconfig.load`
+does and calls the callback with the result, and watches the files in a
+background thread after that. Changes of files are detected with inotify if
+it's available (Linux) or by polling stats of files, and only the changed
+files are loaded again and merged with the results of the others kept.
+
+.. code-block:: python
+
+  def reconfigure(cnf, ops):
+      for operation in ops:  # JSON Patch operations, see anyconfig.dicts.diff
+          ...
+
+  watcher = anyconfig.watch("/etc/app/conf.d/*.yml", reconfigure,
+                            ac_diff=True)
+  ...
+  watcher.stop()
+
+Changelog:
+
+.. versionadded:: 0.9.5
+
+   - Added to watch config files and reload changed ones only.
+"""
+from __future__ import absolute_import
+
+import copy
+import errno
+import os
+import os.path
+import threading
+
+import anyconfig.api
+import anyconfig.cache
+import anyconfig.dicts
+import anyconfig.query
+import anyconfig.utils
+from anyconfig.globals import LOGGER
+
+
+# See inotify(7) and <sys/inotify.h>.
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM |
+            _IN_MOVED_TO | _IN_CREATE | _IN_DELETE)
+
+
+class Inotify(object):
+    """
+    Minimal binding of inotify(7) with ctypes to wait for changes of files in
+    directories.
+    """
+    def __init__(self):
+        """
+        :raises: OSError or AttributeError if inotify is not available
+        """
+        import ctypes  # Import them only if needed.
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'),
+                                 use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK |
+                                           getattr(os, "O_CLOEXEC", 0))
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._dirs = set()
+        (self._rpipe, self._wpipe) = os.pipe()  # To interrupt :meth:`wait`.
+
+    def add_dirs(self, dirs):
+        """
+        :param dirs: A list of paths of directories to watch
+        """
+        for dirpath in set(dirs) - self._dirs:
+            path = dirpath.encode("utf-8") \
+                if not isinstance(dirpath, bytes) else dirpath
+            if self._libc.inotify_add_watch(self.fd, path, _IN_MASK) < 0:
+                LOGGER.debug("Could not watch: %s", dirpath)
+                continue
+            self._dirs.add(dirpath)
+
+    def wait(self, timeout):
+        """
+        Wait for events and consume them.
+
+        :param timeout: Timeout in seconds
+        :return: True if any events happened
+        """
+        import select
+
+        ready = select.select([self.fd, self._rpipe], [], [], timeout)[0]
+        if self.fd not in ready:
+            return False
+
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except (IOError, OSError) as exc:
+            if exc.errno != errno.EAGAIN:
+                raise
+
+        return True
+
+    def interrupt(self):
+        """Make :meth:`wait` return immediately.
+        """
+        os.write(self._wpipe, b'x')
+
+    def close(self):
+        """Stop watching.
+        """
+        for fd in (self.fd, self._rpipe, self._wpipe):
+            os.close(fd)
+
+
+def _make_inotify():
+    """
+    :return: :class:`Inotify` object or None if inotify is not available
+    """
+    try:
+        return Inotify()
+    except (OSError, AttributeError, TypeError):
+        LOGGER.debug("inotify is not available. Poll files instead.")
+        return None
+
+
+class Watcher(object):
+    """
+    Watch config files and call the callback with the result of loading them
+    when some of them are changed.
+
+    Results share the objects not updated on merge with the results of each
+    file kept to merge them later, so that callbacks must not modify them in
+    place; copy them with :func:`copy.deepcopy` to do so.
+    """
+    def __init__(self, path_specs, callback, ac_interval=1.0,
+                 ac_debounce=0.1, ac_diff=False, ac_inotify=True,
+                 ac_template=False, ac_context=None, **options):
+        """
+        :param path_specs: A glob path pattern or a list of paths or glob path
+            patterns of config files
+        :param callback: Callable called with the result loaded, and a list
+            of JSON Patch operations if `ac_diff` is True
+        :param ac_interval: Interval in seconds to check files
+        :param ac_debounce: Files are loaded after no changes are detected
+            for this time in seconds
+        :param ac_diff: Pass the changes from the previous result to the
+            callback also if True
+        :param ac_inotify: Use inotify if it's available and this is True
+        :param ac_template: Not supported, must be False
+        :param ac_context: Mapping object to merge the results into
+        :param options: Keyword options passed to :func:`anyconfig.load`
+        :raises: ValueError if `ac_template` is True
+        """
+        if ac_template:
+            raise ValueError("Templates cannot be watched, as each template "
+                             "needs the results of previous files.")
+        self.path_specs = path_specs
+        self.callback = callback
+        self.interval = ac_interval
+        self.debounce = ac_debounce
+        self.diff = ac_diff
+
+        self.marker = options.get("ac_marker", options.get("marker", '*'))
+        self._query = options.pop("ac_query", None)
+        self._context = ac_context
+        self._schema = anyconfig.api._maybe_schema(**options)
+        options["ac_schema"] = None  # Validate the merged results only.
+        self._options = options
+
+        self.cnf = None
+        self.nloads = 0  # Number of config files loaded so far.
+        self._fragments = {}  # {path: (stat key, result)}
+        self._snapshot = None
+        self._inotify = _make_inotify() if ac_inotify else None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _paths(self):
+        """
+        :return: A list of paths of config files
+        :raises: ValueError if `path_specs` contains file or file-like objects
+        """
+        paths = anyconfig.utils.norm_paths(self.path_specs, marker=self.marker)
+        if not all(anyconfig.utils.is_path(p) for p in paths):
+            raise ValueError("Only paths can be watched: %r" %
+                             self.path_specs)
+
+        return [anyconfig.utils.normpath(p) for p in paths]
+
+    def _dirs(self, paths):
+        """
+        :return: A list of directories of `paths` and path patterns to watch
+        """
+        specs = [self.path_specs] if anyconfig.utils.is_path(self.path_specs) \
+            else self.path_specs
+        dirs = [os.path.dirname(p) for p in specs if self.marker not in
+                os.path.dirname(p)] + [os.path.dirname(p) for p in paths]
+
+        return [os.path.abspath(d or os.curdir) for d in dirs
+                if os.path.isdir(d or os.curdir)]
+
+    def snapshot(self):
+        """
+        :return: A tuple of (path, stat key or None) of config files
+        """
+        paths = self._paths()
+        if self._inotify is not None:
+            self._inotify.add_dirs(self._dirs(paths))
+
+        return tuple((p, anyconfig.cache._stat_key(p)) for p in paths)
+
+    def _load_fragment(self, path, skey):
+        """
+        :return: The result loaded from `path` or the previous one
+        """
+        (skey0, cnf) = self._fragments.get(path, (None, None))
+        if skey0 == skey:
+            return cnf
+
+        try:
+            cnf = anyconfig.api.single_load(path, **self._options.copy())
+            self.nloads += 1
+            self._fragments[path] = (skey, cnf)
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.warning("Failed to load %s, use the previous result: %r",
+                           path, exc)
+        return cnf
+
+    def _merge(self, snapshot):
+        """
+        Merge the results of config files in `snapshot` loaded or kept.
+
+        :return: Mapping object or None if validation of it failed
+        """
+        cnfs = []
+        for path, skey in snapshot:
+            if skey is None:  # Removed or not exist.
+                self._fragments.pop(path, None)
+                continue
+            cnf = self._load_fragment(path, skey)
+            if cnf:
+                cnfs.append(cnf)
+
+        # Merge the results kept into a new one and share their objects not
+        # updated with it instead of copying all of them.
+        if self._context is None:
+            ctx = anyconfig.dicts.convert_to({}, **self._options)
+        else:
+            ctx = copy.deepcopy(self._context)
+        cnf = anyconfig.api._merge_all(ctx, cnfs, keep_others=True,
+                                       **self._options)
+
+        return anyconfig.api._maybe_validated(cnf, self._schema,
+                                              **self._options)
+
+    def _query_result(self, cnf):
+        """
+        :param cnf: Mapping object merged
+        :return: Mapping object or any query result
+        """
+        path = anyconfig.query.parse_simple_path(self._query)
+        if path is not None:  # It does not need jmespath.
+            return anyconfig.query.search_path(cnf, path)
+
+        return anyconfig.query.query(cnf, ac_query=self._query)
+
+    def check(self):
+        """
+        Check config files and load the changed ones, and call the callback
+        if the result is changed.
+
+        :return: True if the callback was called
+        """
+        snapshot = self.snapshot()
+        if snapshot == self._snapshot:
+            return False
+
+        self._snapshot = snapshot
+        cnf = self._merge(snapshot)
+        if cnf is None:
+            LOGGER.warning("Validation of the result failed, keep the "
+                           "previous one: %s", self.path_specs)
+            return False
+
+        (prev, cnf) = (self.cnf, self._query_result(cnf))
+        if prev is not None and prev == cnf:
+            return False
+
+        self.cnf = cnf
+        if self.diff:
+            ops = anyconfig.dicts.diff({} if prev is None else prev, cnf)
+            self.callback(cnf, ops)
+        else:
+            self.callback(cnf)
+
+        return True
+
+    def _wait(self, timeout):
+        """
+        Wait for changes of files or the timeout.
+        """
+        if self._inotify is None:
+            self._stop.wait(timeout)
+        else:
+            self._inotify.wait(timeout)
+
+    def _debounce(self):
+        """
+        Wait until config files are not changed for `debounce` seconds.
+        """
+        snapshot = self.snapshot()
+        while not self._stop.is_set():
+            self._stop.wait(self.debounce)
+            (prev, snapshot) = (snapshot, self.snapshot())
+            if snapshot == prev:
+                break
+
+    def run(self):
+        """
+        Check config files repeatedly until :meth:`stop` is called.
+        """
+        while not self._stop.is_set():
+            self._wait(self.interval)
+            if self._stop.is_set() or self.snapshot() == self._snapshot:
+                continue
+
+            self._debounce()
+            try:
+                self.check()
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.warning("Failed to reload config files: %r", exc)
+
+    def start(self):
+        """
+        Load config files and call the callback, and start watching them in
+        a background thread.
+        """
+        self.check()
+        self._thread = threading.Thread(target=self.run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop watching config files.
+        """
+        self._stop.set()
+        if self._inotify is not None:
+            self._inotify.interrupt()
+        if self._thread is not None:
+            if self._thread is not threading.current_thread():
+                self._thread.join()  # It may be called from the callback.
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+def watch(path_specs, callback, **options):
+    """
+    Load config files and call `callback` with the result, and watch the
+    files in a background thread to call `callback` with new results when
+    some of them are changed. Only changed files are loaded again.
+
+    :param path_specs: A glob path pattern or a list of paths or glob path
+        patterns of config files
+    :param callback: Callable called with the result loaded, and a list of
+        JSON Patch operations (see :func:`anyconfig.dicts.diff`) if ac_diff
+        is True. It must not modify the result in place, see :class:`Watcher`
+    :param options: Keyword options such as ac_merge, ac_query, ac_schema
+        and ac_context accepted by :func:`anyconfig.load` except ac_template,
+        and the followings:
+
+        - ac_interval: Interval in seconds to check files, 1.0 by default
+        - ac_debounce: Files are loaded after no changes are detected for
+          this time in seconds, 0.1 by default. It coalesces bursts of writes
+        - ac_diff: Pass the changes from the previous result to `callback`
+          also if True
+        - ac_inotify: Use inotify if it's available and this is True (default)
+
+    :return: :class:`Watcher` object; call its :meth:`~Watcher.stop` to stop
+        watching
+    """
+    watcher = Watcher(path_specs, callback, **options)
+    watcher.start()
+    return watcher
+
+# vim:sw=4:ts=4:et:
@@ -0,0 +1,70 @@
+#! /usr/bin/python
+#
+# Copyright (C) 2018 Satoru SATOH <ssato @ redhat.com>
+# License: MIT
+#
+"""Benchmark to measure the time to merge long lists with the strategy
+anyconfig.dicts.MS_DICTS_AND_LISTS.
+
+Usage: PYTHONPATH=. python pkg/benchmark_merge.py [MAX_NUMBER_OF_ITEMS]
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+
+import anyconfig.dicts as TT
+
+
+def make_str_item(idx):
+    """Make a str item of lists."""
+    return "host-%d" % idx
+
+
+def make_dict_item(idx):
+    """Make a dict item of lists."""
+    return dict(host=make_str_item(idx), port=idx % 65536)
+
+
+def make_lists(nitems, kind="str"):
+    """Make two lists half of items of which overlap."""
+    make_fn = make_dict_item if kind == "dict" else make_str_item
+
+    return ([make_fn(i) for i in range(nitems)],
+            [make_fn(i) for i in range(nitems // 2, nitems + nitems // 2)])
+
+
+def merge_lists_naively(lst0, lst1):
+    """The quadratic implementation used before, for comparison."""
+    return lst0 + [x for x in lst1 if x not in lst0]
+
+
+def bench(label, fun, nitems, repeat=3):
+    """Print the best time of `fun` in milli seconds."""
+    best = min(timeit.repeat(fun, number=1, repeat=repeat))
+    print("%-24s %8d items: %10.3f msec" % (label, nitems, best * 1e3))
+
+
+def main(argv=None):
+    """Entrypoint."""
+    argv = argv or sys.argv
+    maxitems = int(argv[1]) if len(argv) > 1 else 1000000
+    nitems = 1000
+
+    while nitems <= maxitems:
+        for kind in ("str", "dict"):
+            (lst0, lst1) = make_lists(nitems, kind)
+            bench("merge (%s)" % kind,
+                  lambda: TT.merge(dict(a=lst0[:]), dict(a=lst1),
+                                   ac_merge=TT.MS_DICTS_AND_LISTS),
+                  nitems)
+            if nitems <= 10000:  # It takes too long time.
+                bench("naive merge (%s)" % kind,
+                      lambda: merge_lists_naively(lst0, lst1), nitems)
+        nitems *= 10
+
+
+if __name__ == "__main__":
+    main(sys.argv)
+
+# vim:sw=4:ts=4:et:
@@ -0,0 +1,65 @@
+#! /usr/bin/python
+#
+# Copyright (C) 2018 Satoru SATOH <ssato @ redhat.com>
+# License: MIT
+#
+"""Benchmark to measure per-node overhead of XML <-> container conversions
+in anyconfig.backend.xml with wide and deep synthetic documents.
+
+Usage: PYTHONPATH=. python pkg/benchmark_xml.py [NUMBER_OF_NODES]
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+
+import anyconfig.backend.xml as TT
+
+
+def make_wide_elem(nnodes):
+    """Make a root element has `nnodes` children."""
+    root = TT.ET.Element("root")
+    for idx in range(nnodes):
+        child = TT.ET.SubElement(root, "item", id=str(idx))
+        child.text = str(idx)
+    return root
+
+
+def make_deep_elem(nnodes):
+    """Make elements nested `nnodes` levels deep."""
+    root = leaf = TT.ET.Element("root")
+    for idx in range(nnodes):
+        leaf = TT.ET.SubElement(leaf, "item", id=str(idx))
+    leaf.text = "leaf"
+    return root
+
+
+def bench(label, fun, nnodes, repeat=3):
+    """Print the best time per node of `fun` in micro seconds."""
+    best = min(timeit.repeat(fun, number=1, repeat=repeat))
+    print("%-32s %8d nodes: %8.3f usec/node" % (label, nnodes,
+                                                best * 1e6 / nnodes))
+
+
+def main(argv=None):
+    """Entrypoint."""
+    argv = argv or sys.argv
+    nnodes = int(argv[1]) if len(argv) > 1 else 10000
+    # Deep documents may not be processed with recursive implementations.
+    ndeep = min(nnodes, sys.getrecursionlimit() // 4)
+
+    for kind, nnodes_, make_fn in (("wide", nnodes, make_wide_elem),
+                                   ("deep", ndeep, make_deep_elem)):
+        # Conversions from elements are idempotent and elem can be reused.
+        elem = make_fn(nnodes_)
+        cnf = TT.elem_to_container(elem)
+        bench("elem_to_container (%s)" % kind,
+              lambda: TT.elem_to_container(elem), nnodes_)
+        bench("container_to_etree (%s)" % kind,
+              lambda: TT.container_to_etree(cnf), nnodes_)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
+
+# vim:sw=4:ts=4:et:
@@ -12,6 +12,8 @@ import os
 import os.path
 import unittest
 
+import mock
+
 import anyconfig.api as TT
 import anyconfig.backends
 import anyconfig.compat
@@ -88,16 +90,16 @@ class Test_10_find_loader(unittest.TestCase):
 
     def test_10_find_loader__w_given_parser_type(self):
         cpath = "dummy.conf"
-        for psr in anyconfig.backends.PARSERS:
+        for psr in anyconfig.backends.list_parsers():
             self._assert_isinstance(TT.find_loader(cpath, psr.type()), psr)
 
     def test_12_find_loader__w_given_parser_instance(self):
         cpath = "dummy.conf"
-        for psr in anyconfig.backends.PARSERS:
+        for psr in anyconfig.backends.list_parsers():
             self._assert_isinstance(TT.find_loader(cpath, psr()), psr)
 
     def test_20_find_loader__by_file(self):
-        for psr in anyconfig.backends.PARSERS:
+        for psr in anyconfig.backends.list_parsers():
             for ext in psr.extensions():
                 self._assert_isinstance(TT.find_loader("dummy." + ext), psr,
                                         "ext=%s, psr=%r" % (ext, psr))
@@ -488,6 +490,62 @@ class Test_42_multi_load(TestBaseWithIOMultiFiles):
         self.assert_dicts_equal(res, self.exp)
         self.assertTrue(isinstance(res, MyODict))
 
+    def test_70_multi_load__w_ac_workers(self):
+        TT.dump(self.dic, self.a_path)
+        TT.dump(self.upd, self.b_path)
+
+        for mode in ("thread", "process"):
+            res = TT.multi_load(self.g_path, ac_workers=2,
+                                ac_workers_mode=mode)
+            self.assert_dicts_equal(res, self.exp)
+
+    def test_72_multi_load__w_ac_workers__keep_order(self):
+        paths = [os.path.join(self.workdir, "%02d.json" % i)
+                 for i in range(10)]
+        for idx, path in enumerate(paths):
+            TT.dump(dict(a=idx, b={str(idx): idx}), path)
+
+        res0 = TT.multi_load(paths)
+        res1 = TT.multi_load(paths, ac_workers=4)
+        self.assertEqual(TT.dumps(res0, "json", sort_keys=True),
+                         TT.dumps(res1, "json", sort_keys=True))
+        self.assertEqual(res1["a"], 9)
+
+    def test_74_multi_load__w_ac_workers__process__warnings(self):
+        TT.dump(self.dic, self.a_path)
+        TT.dump(self.upd, self.b_path)
+
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        TT.LOGGER.addHandler(handler)
+        TT.LOGGER.setLevel(logging.WARNING)
+        try:
+            res = TT.multi_load([self.a_path, self.b_path], ac_workers=2,
+                                ac_workers_mode="process", ac_cache=True)
+            self.assert_dicts_equal(res, self.exp)
+            self.assertEqual(len(records), 1)
+
+            with open(self.a_path) as inp:
+                res = TT.multi_load([inp, self.b_path], ac_workers=2,
+                                    ac_workers_mode="process")
+            self.assert_dicts_equal(res, self.exp)
+            self.assertEqual(len(records), 2)
+        finally:
+            TT.LOGGER.setLevel(logging.CRITICAL)
+            TT.LOGGER.removeHandler(handler)
+
+    def test_76_multi_load__w_ac_workers__serial(self):
+        TT.dump(self.dic, self.a_path)
+        TT.dump(self.upd, self.b_path)
+
+        with mock.patch.object(TT, "_load_paths_in_parallel") as load_fn:
+            for workers in (None, 0, 1):
+                res = TT.multi_load(self.g_path, ac_workers=workers)
+                self.assert_dicts_equal(res, self.exp)
+
+        self.assertFalse(load_fn.called)
+
 
 class Test_50_load_and_dump(TestBaseWithIOMultiFiles):
 
@@ -597,4 +655,50 @@ class Test_50_load_and_dump(TestBaseWithIOMultiFiles):
         except (NameError, AttributeError):
             pass  # jmespath is not available.
 
+    def test_42_load_w_query__pushed_down(self):
+        for ext in ("json", "xml", "yml"):
+            if ext == "yml" and "yaml" not in anyconfig.backends.list_types():
+                continue
+
+            cnf_path = os.path.join(self.workdir, "cnf." + ext)
+            TT.dump(dict(x=dict(name="a", b=dict(c="C"))), cnf_path)
+
+            # Simple path expressions do not need jmespath.
+            self.assertEqual(TT.load(cnf_path, ac_query="x.b.c"), "C")
+            self.assertTrue(TT.load(cnf_path, ac_query="x.y") is None)
+
+
+class Test_60_load_all(TestBaseWithIO):
+
+    def test_10_load_all__yaml(self):
+        cnf_path = os.path.join(self.workdir, "cnf.yml")
+        with open(cnf_path, 'w') as out:
+            out.write("a: 1\n---\nb: 2\n---\n")
+
+        cnfs = TT.load_all(cnf_path)
+        self.assertFalse(isinstance(cnfs, list))  # Loaded lazily.
+        self.assertEqual(list(cnfs), [dict(a=1), dict(b=2), dict()])
+
+    def test_20_load_all__single_document(self):
+        cnf_path = os.path.join(self.workdir, "cnf.json")
+        TT.dump(CNF_0, cnf_path)
+
+        cnfs = list(TT.load_all(cnf_path))
+        self.assertEqual(len(cnfs), 1)
+        self.assert_dicts_equal(cnfs[0], CNF_0)
+
+    def test_30_load_all__unknown_file_type(self):
+        self.assertRaises(TT.UnknownFileTypeError, TT.load_all,
+                          os.path.join(self.workdir, "cnf.unknown_ext"))
+
+    def test_40_load_iter__xml_records(self):
+        cnf_path = os.path.join(self.workdir, "cnf.xml")
+        with open(cnf_path, 'w') as out:
+            out.write("<items><item>0</item><item>1</item></items>")
+
+        self.assertEqual(list(TT.load_iter(cnf_path)),
+                         [dict(item='0'), dict(item='1')])
+        self.assertEqual(list(TT.load_iter(cnf_path, ac_parse_value=True)),
+                         [dict(item=0), dict(item=1)])
+
 # vim:sw=4:ts=4:et:
@@ -37,6 +37,20 @@ class Test00(unittest.TestCase):
         self.assertEqual(cnf, MZERO)
         self.assertTrue(isinstance(cnf, type(MZERO)))
 
+    def test_40_load_iter__ignore_missing(self):
+        cpath = os.path.join(os.curdir, "conf_file_should_not_exist")
+        assert not os.path.exists(cpath)
+
+        cnfs = self.psr.load_iter(cpath, ignore_missing=True)
+        self.assertEqual(list(cnfs), [])
+
+    def test_50_load_subtree__ignore_missing(self):
+        cpath = os.path.join(os.curdir, "conf_file_should_not_exist")
+        assert not os.path.exists(cpath)
+
+        cnf = self.psr.load_subtree(cpath, ("a", 0), ignore_missing=True)
+        self.assertTrue(cnf is None)
+
 
 class Test10(unittest.TestCase):
 
@@ -12,6 +12,7 @@ import unittest
 
 from os import linesep as lsep
 
+import anyconfig.frozen
 import tests.common
 
 from anyconfig.compat import OrderedDict
@@ -130,6 +131,12 @@ class Test_10_dumps_and_loads(TestBase):
             cnf = self.psr.loads(self.psr.dumps(self.cnf, **self.dump_options))
             self._assert_dicts_equal(cnf)
 
+    def test_34_dumps_frozen(self):
+        if self.is_ready():
+            ref = self.psr.loads(self.cnf_s)
+            cnf_s = self.psr.dumps(anyconfig.frozen.freeze(ref))
+            self._assert_dicts_equal(self.psr.loads(cnf_s), ref=ref)
+
 
 class TestBaseWithIO(TestBase):
 
@@ -185,6 +192,12 @@ class Test_20_dump_and_load(TestBaseWithIO):
             self.assertTrue(cnf)
             self._assert_dicts_equal(cnf)
 
+    def test_34_dump_frozen(self):
+        if self.is_ready():
+            ref = self.psr.load(self.cnf_path)
+            self.psr.dump(anyconfig.frozen.freeze(ref), self.cnf_path)
+            self._assert_dicts_equal(self.psr.load(self.cnf_path), ref=ref)
+
     def test_32_dump_to_stream(self):
         if self.is_ready():
             with self.psr.wopen(self.cnf_path) as strm:
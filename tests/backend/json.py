@@ -6,6 +6,8 @@
 # pylint: disable=ungrouped-imports
 from __future__ import absolute_import
 
+import unittest
+
 import anyconfig.backend.json as TT
 import tests.backend.common as TBC
 
@@ -40,8 +42,107 @@ class Test_10(TBC.Test_10_dumps_and_loads, HasParserTrait):
     empty_patterns = ['', '{}', '[]', 'null']
 
 
+class Test_12(TBC.Test_10_dumps_and_loads, HasParserTrait):
+
+    load_options = dict(ac_json_engine="auto")
+    dump_options = dict(ac_json_engine="auto", indent=2, sort_keys=True)
+    empty_patterns = ['', '{}', '[]', 'null']
+
+
 class Test_20(TBC.Test_20_dump_and_load, HasParserTrait):
 
     pass
 
+
+class Test_30_engines(unittest.TestCase):
+
+    def test_10_find_engine__stdlib(self):
+        self.assertEqual(TT.find_engine(), "stdlib")
+        self.assertEqual(TT.find_engine("stdlib"), "stdlib")
+        self.assertEqual(TT.find_engine("ujson",
+                                        dict(cls=TT.json.JSONDecoder)),
+                         "stdlib")
+        self.assertEqual(TT.find_engine("orjson", dict(separators=(",", ":")),
+                                        dump=True),
+                         "stdlib")
+
+    def test_12_find_engine__unknown(self):
+        self.assertRaises(ValueError, TT.find_engine, "not_exist")
+        self.assertRaises(ValueError, TT.loads, "{}", ac_json_engine="x")
+
+    @unittest.skipIf(TT._import_engine("orjson") is None,
+                     "orjson is not available")
+    def test_20_loads_and_dumps__orjson(self):
+        self.assertEqual(TT.find_engine("auto"), "orjson")
+        self.assertEqual(TT.find_engine("orjson", dict(object_hook=dict)),
+                         "orjson")
+
+        psr = TT.Parser()
+        self.assertEqual(psr.loads(CNF_0_S, ac_json_engine="orjson"), CNF_0)
+
+        # Fallback to stdlib.
+        cnf = psr.loads(CNF_0_S, ac_json_engine="orjson", ac_ordered=True)
+        self.assertEqual(cnf, CNF_0)
+        self.assertTrue(isinstance(cnf["sect0"], OrderedDict))
+
+        ref = psr.dumps(CNF_0, indent=2)
+        self.assertEqual(psr.dumps(CNF_0, ac_json_engine="orjson", indent=2),
+                         ref)
+        self.assertEqual(psr.loads(psr.dumps({1: "a"},
+                                             ac_json_engine="orjson")),
+                         {"1": "a"})
+
+    @unittest.skipIf(TT._import_engine("orjson") is None,
+                     "orjson is not available")
+    def test_22_dumps__orjson_only_if_same_output(self):
+        # It does not escape non-ASCII chars and its indent is always 2.
+        for opts in (dict(), dict(indent=2), dict(ensure_ascii=False),
+                     dict(ensure_ascii=False, indent=4),
+                     dict(ensure_ascii=False, separators=(", ", ": "))):
+            self.assertEqual(TT.find_engine("orjson", opts, dump=True),
+                             "stdlib")
+
+        cnf = dict(a="\u3042", b=[1, dict(c=None)])
+        for opts in (dict(ensure_ascii=False, separators=(",", ":")),
+                     dict(ensure_ascii=False, indent=2),
+                     dict(ensure_ascii=False, indent=2,
+                          separators=(",", ": "))):
+            self.assertEqual(TT.find_engine("orjson", opts, dump=True),
+                             "orjson")
+            self.assertEqual(TT.dumps(cnf, ac_json_engine="orjson", **opts),
+                             TT.json.dumps(cnf, **opts))
+
+        self.assertEqual(TT.dumps(cnf, ac_json_engine="orjson"),
+                         TT.json.dumps(cnf))
+
+    @unittest.skipIf(TT._import_engine("simplejson") is None,
+                     "simplejson is not available")
+    def test_24_dumps__simplejson(self):
+        self.assertEqual(TT.find_engine("simplejson", {}, dump=True),
+                         "simplejson")
+
+    def _assert_same_as_stdlib(self, engine):
+        opts = dict(ensure_ascii=False, separators=(",", ":"))
+        for val in (1e16, 1e-7, float("nan"), float("inf"), 2 ** 64,
+                    -2 ** 63 - 1, 2 ** 100):
+            cnf = dict(a=[1, dict(b=val)])
+            self.assertEqual(TT.dumps(cnf, ac_json_engine=engine, **opts),
+                             TT.json.dumps(cnf, **opts))
+
+        for content in ("123456789012345678901234567890", "NaN", "1e400",
+                        "[18446744073709551616]", "-9223372036854775809"):
+            ref = TT.json.loads(content)
+            res = TT.loads(content, ac_json_engine=engine)
+            self.assertEqual(repr(res), repr(ref))
+
+    @unittest.skipIf(TT._import_engine("orjson") is None,
+                     "orjson is not available")
+    def test_26_loads_and_dumps__orjson_special_values(self):
+        self._assert_same_as_stdlib("orjson")
+
+    @unittest.skipIf(TT._import_engine("ujson") is None,
+                     "ujson is not available")
+    def test_28_loads_and_dumps__ujson_special_values(self):
+        self._assert_same_as_stdlib("ujson")
+
 # vim:sw=4:ts=4:et:
@@ -0,0 +1,130 @@
+#
+# Copyright (C) 2018 Satoru SATOH <ssato @ redhat.com>
+# License: MIT
+#
+# pylint: disable=missing-docstring,invalid-name,too-few-public-methods
+# pylint: disable=ungrouped-imports
+from __future__ import absolute_import
+
+import os.path
+import unittest
+
+import anyconfig.backend.jsonl as TT
+import tests.backend.common as TBC
+import tests.common
+
+from anyconfig.compat import OrderedDict, StringIO
+
+
+CNF_0_S = """{"a": 0, "b": "bbb"}
+
+{"c": 5, "sect0": {"d": ["x"]}}
+{"sect0": {"d": ["x", "y", "z"]}}
+"""
+
+CNF_0 = OrderedDict((("a", 0), ("b", "bbb"), ("c", 5),
+                     ("sect0", OrderedDict((("d", ["x", "y", "z"]), )))))
+
+
+class HasParserTrait(TBC.HasParserTrait):
+
+    psr = TT.Parser()
+    cnf_s = CNF_0_S
+    cnf = CNF_0
+
+
+class Test_10(TBC.Test_10_dumps_and_loads, HasParserTrait):
+
+    load_options = dict(parse_int=None, ac_jsonl_decode_workers=1)
+    dump_options = dict(sort_keys=True, indent=2)
+
+
+class Test_20(TBC.Test_20_dump_and_load, HasParserTrait):
+
+    pass
+
+
+class Test_30_records(unittest.TestCase):
+
+    psr = TT.Parser()
+
+    def test_10_loads__skip_non_mapping_records(self):
+        self.assertEqual(self.psr.loads('[1, 2]\n{"a": 1}\n"x"\n'),
+                         dict(a=1))
+
+    def test_20_loads__w_ac_jsonl_merge(self):
+        dicts = TT.anyconfig.dicts
+        cnf = self.psr.loads(CNF_0_S, ac_jsonl_merge=dicts.MS_REPLACE)
+        self.assertEqual(cnf["sect0"], dict(d=["x", "y", "z"]))
+
+        cnf = self.psr.loads('{"a": [1]}\n{"a": [2]}\n',
+                             ac_jsonl_merge=dicts.MS_DICTS_AND_LISTS)
+        self.assertEqual(cnf, dict(a=[1, 2]))
+
+    def test_22_loads__ac_merge_not_for_records(self):
+        # ac_merge is the strategy to merge results of multiple files.
+        cnf = self.psr.loads('{"a": {"b": 1}}\n{"a": {"c": 2}}\n',
+                             ac_merge=TT.anyconfig.dicts.MS_REPLACE)
+        self.assertEqual(cnf, dict(a=dict(b=1, c=2)))
+
+    def test_24_merge_records__in_batches(self):
+        recs = [dict(a=[i], b={str(i): i}) for i in range(5)] + [6]
+        strategy = TT.anyconfig.dicts.MS_DICTS_AND_LISTS
+        batchsize = TT._MERGE_BATCHSIZE
+        TT._MERGE_BATCHSIZE = 2
+        try:
+            cnf = TT.merge_records(iter(recs), ac_merge=strategy)
+        finally:
+            TT._MERGE_BATCHSIZE = batchsize
+
+        self.assertEqual(cnf, dict(a=list(range(5)),
+                                   b=dict((str(i), i) for i in range(5))))
+
+    def test_30_loads__w_ac_jsonl_decode_workers(self):
+        cnf_s = ''.join('{"k%d": %d}\n' % (idx, idx) for idx in range(100))
+        cnf = self.psr.loads(cnf_s, ac_jsonl_decode_workers=2,
+                             ac_jsonl_decode_chunksize=7)
+        self.assertEqual(cnf, dict(("k%d" % i, i) for i in range(100)))
+
+    def test_32_iter_records__in_parallel_keeps_order(self):
+        cnf_s = ''.join("%d\n" % idx for idx in range(50))
+        res = list(TT.iter_records(StringIO(cnf_s), ac_jsonl_decode_workers=3,
+                                   ac_jsonl_decode_chunksize=4))
+        self.assertEqual(res, list(range(50)))
+
+    def test_40_dumps__list_of_records(self):
+        recs = [dict(a=1), dict(b=[2, 3]), 4]
+        cnf_s = self.psr.dumps(recs, indent=2)
+        self.assertEqual(len(cnf_s.splitlines()), 3)
+        self.assertEqual(list(self.psr.load_iter(StringIO(cnf_s))), recs)
+
+
+class Test_40_load_iter(unittest.TestCase):
+
+    psr = TT.Parser()
+
+    def setUp(self):
+        self.workdir = tests.common.setup_workdir()
+        self.path = os.path.join(self.workdir, "a.jsonl")
+        with self.psr.wopen(self.path) as out:
+            out.write(CNF_0_S)
+
+    def tearDown(self):
+        tests.common.cleanup_workdir(self.workdir)
+
+    def test_10_load_iter(self):
+        res = list(self.psr.load_iter(self.path, ac_ordered=True))
+        self.assertEqual(len(res), 3)
+        self.assertEqual(res[0], dict(a=0, b="bbb"))
+        self.assertTrue(isinstance(res[0], OrderedDict))
+
+    def test_20_load_iter__ignore_missing(self):
+        path = os.path.join(self.workdir, "not_exist.jsonl")
+        self.assertEqual(list(self.psr.load_iter(path, ignore_missing=True)),
+                         [])
+
+    def test_30_api_load_iter(self):
+        res = list(TT.anyconfig.api.load_iter(self.path))
+        self.assertEqual(res[-1], dict(sect0=dict(d=["x", "y", "z"])))
+
+# vim:sw=4:ts=4:et:
@@ -6,6 +6,7 @@
 # pylint: disable=missing-docstring,invalid-name,too-few-public-methods
 # pylint: disable=ungrouped-imports,protected-access
 from __future__ import absolute_import
+import sys
 import unittest
 import anyconfig.backend.xml as TT
 import anyconfig.compat
@@ -59,12 +60,6 @@ CNF_0_S = to_bytes("""\
 
 class Test_00(unittest.TestCase):
 
-    def test_10__namespaces_from_file(self):
-        ref = {"http://example.com/ns/config": '',
-               "http://example.com/ns/config/val": "val"}
-        xmlfile = anyconfig.compat.StringIO(XML_W_NS_S)
-        self.assertTrue(dicts_equal(TT._namespaces_from_file(xmlfile), ref))
-
     def test_20__process_elem_text__whitespaces(self):
         (elem, dic, subdic) = (TT.ET.XML("<a> </a>"), {}, {})
         TT._process_elem_text(elem, dic, subdic)
@@ -209,6 +204,18 @@ class Test_00_1(unittest.TestCase):
         ref = dict(a={"@attrs": {'x': 'X'}, "@text": "A"})
         self._assert_eq_dic_from_snippet("<a x='X'>A</a>", ref)
 
+    def test_44_elem_to_container__deeply_nested(self):
+        depth = sys.getrecursionlimit() * 2
+        elem = leaf = TT.ET.Element("a")
+        for _ in range(depth):
+            leaf = TT.ET.SubElement(leaf, "a")
+        leaf.text = "A"
+
+        dic = TT.elem_to_container(elem)
+        for _ in range(depth):
+            dic = dic["a"]
+        self.assertEqual(dic, dict(a="A"))
+
     def test_50_root_to_container__text_attrs_tags(self):
         ref = dict(a={"_attrs": {'x': 'X'}, "_text": "A"})
         tags = dict(attrs="_attrs", text="_text")
@@ -217,6 +224,39 @@ class Test_00_1(unittest.TestCase):
                          ref)
 
 
+class Test_00_3(unittest.TestCase):
+
+    def _iterparse_to_container(self, snippet, **opts):
+        return TT.iterparse_to_container(TT.BytesIO(to_bytes(snippet)),
+                                         **opts)
+
+    def test_10_iterparse_to_container__same_as_root_to_container(self):
+        snippets = ("<a/>", "<a x='X'>A</a>", "<a><b>1</b><b>2</b></a>",
+                    "<a>aaa<b>1</b><b>2</b></a>", "<a><b>b</b><c>c</c></a>",
+                    "<a x='1'><b y='2'/><c>c</c></a>")
+        for snippet in snippets:
+            for opts in (dict(), dict(merge_attrs=True)):
+                ref = TT.root_to_container(TT.ET.XML(snippet), dict, {},
+                                           **opts)
+                self.assertEqual(self._iterparse_to_container(snippet,
+                                                              **opts),
+                                 ref)
+
+    def test_20_iterparse_to_container__stream_wo_name(self):
+        cnf = self._iterparse_to_container(XML_W_NS_S)
+        ref = {"a": {"@attrs": {"xmlns": "http://example.com/ns/config",
+                                "xmlns:val":
+                                "http://example.com/ns/config/val"},
+                     "b": "1", "val:c": "C"}}
+        self.assertTrue(dicts_equal(cnf, ref), cnf)
+
+    def test_30_iterparse_to_container__many_children(self):
+        items = "".join("<b><c>%d</c></b>" % i for i in range(10000))
+        cnf = self._iterparse_to_container("<a>%s</a>" % items)
+        self.assertEqual(cnf["a"],
+                         [dict(b=dict(c=str(i))) for i in range(10000)])
+
+
 def tree_to_string(tree):
     return TT.ET.tostring(tree.getroot())
 
@@ -251,6 +291,72 @@ class Test_00_2(unittest.TestCase):
         res = TT.container_to_etree(obj)
         self.assertEqual(tree_to_string(res), ref)
 
+    def test_24_container_to_etree__list_of_children(self):
+        ref = to_bytes("<a><b><c>c</c><d>d</d></b><e>e</e></a>")
+        obj = anyconfig.compat.OrderedDict((("b", [dict(c="c"), dict(d="d")]),
+                                            ("e", "e")))
+        res = TT.container_to_etree(dict(a=obj))
+        self.assertEqual(tree_to_string(res), ref)
+
+    def test_30_container_to_etree__deeply_nested(self):
+        depth = sys.getrecursionlimit() * 2
+        obj = leaf = dict()
+        for _ in range(depth):
+            leaf["a"] = dict()
+            leaf = leaf["a"]
+        leaf["@text"] = "A"
+
+        elem = TT.container_to_etree(obj).getroot()
+        for _ in range(depth - 1):
+            elem = elem[0]
+        self.assertEqual(elem.text, "A")
+
+
+def container_to_string(obj, **options):
+    out = TT.BytesIO()
+    TT.container_to_stream(obj, out, **options)
+    return out.getvalue()
+
+
+class Test_00_4(unittest.TestCase):
+
+    def test_10_container_to_stream__same_as_etree(self):
+        for obj in (CNF_0, {'a': {'@children': [{'b': 'b'}, {'c': 'c'}]}},
+                    {'a': {'x': '<&>"', '@text': 'A'}}):
+            ref = TT.ET.tostring(TT.container_to_etree(obj).getroot())
+            ref = TT.ET.tostring(TT.ET.fromstring(ref))
+            res = TT.ET.tostring(TT.ET.fromstring(container_to_string(obj)))
+            self.assertEqual(res, ref)
+
+    def test_20_container_to_stream__text_attrs_tags(self):
+        obj = dict(a={"_attrs": {'x': 'X', 'y': 1}, "_text": 0})
+        tags = dict(attrs="_attrs", text="_text")
+        res = container_to_string(obj, tags=tags, ac_parse_value=True)
+        self.assertTrue(res.endswith(to_bytes('<a x="X" y="1">0</a>')), res)
+
+    def test_30_container_to_stream__deeply_nested(self):
+        depth = sys.getrecursionlimit() * 2
+        obj = leaf = dict()
+        for _ in range(depth):
+            leaf["a"] = dict()
+            leaf = leaf["a"]
+        leaf["@text"] = "A"
+
+        res = container_to_string(obj)
+        self.assertTrue(res.endswith(to_bytes("<a>" * depth + "A" +
+                                              "</a>" * depth)))
+
+    def test_40_container_to_stream__no_elements(self):
+        self.assertRaises(ValueError, container_to_string, {})
+
+    def test_42_container_to_stream__not_str_values(self):
+        for obj in ({"a": {"@attrs": {"x": 1}}}, {"a": {"@text": 1}},
+                    {"a": {"b": 1}}):
+            self.assertRaises(TypeError, container_to_string, obj)
+
+        self.assertEqual(container_to_string({"a": {"@text": None}}),
+                         container_to_string({"a": None}))
+
 
 class HasParserTrait(TBC.HasParserTrait):
 
@@ -263,9 +369,74 @@ class Test_10(TBC.Test_10_dumps_and_loads, HasParserTrait):
 
     load_options = dump_options = dict(ac_parse_value=False)
 
+    def test_30_loads_w_custom_tags(self):
+        tags = dict(attrs="@a", text="#t", children="@c")
+        cnf = self.psr.loads(self.cnf_s, tags=tags)
+        self.assertEqual(cnf["config"]["val:b"], {"@a": {"id": "b0"},
+                                                  "#t": "bbb"})
+        self.assertEqual(cnf["config"]["list2"]["@c"],
+                         CNF_0["config"]["list2"]["@children"])
+
+        res = TT.anyconfig.loads(self.cnf_s.decode("utf-8"), ac_parser="xml",
+                                 tags=tags)
+        self.assertEqual(res, cnf)
+
 
 class Test_20(TBC.Test_20_dump_and_load, HasParserTrait):
 
+    def test_20_load_iter(self):
+        ref = [{k: v} for k, v in CNF_0["config"].items() if k != "@attrs"]
+        cnfs = list(self.psr.load_iter(self.cnf_path))
+        self.assertEqual(sorted(cnfs, key=str), sorted(ref, key=str))
+
+        with self.psr.ropen(self.cnf_path) as inp:
+            self.assertEqual(len(list(self.psr.load_iter(inp))), len(ref))
+
+    def test_30_load_subtree(self):
+        paths = [("config", "val:a"), ("config", "val:b"),
+                 ("config", "val:c"), ("config", "sect0", "val:d"),
+                 ("config", "list1"), ("config", "list1", 1, "item"),
+                 ("config", "list1", -1, "item"), ("config", "list2"),
+                 ("config", "sect0", "x"), ("config", "list1", 3),
+                 ("config", 0), ("x", "val:a")]
+        for path in paths:
+            ref = TT.anyconfig.query.search_path(CNF_0, path)
+            cnf = self.psr.load_subtree(self.cnf_path, path)
+            self.assertEqual(cnf, ref, path)
+
+    def test_32_load_subtree__skip_unrelated_elements(self):
+        with self.psr.ropen(self.cnf_path) as inp:
+            cnf = next(TT._iterparse_to_containers(
+                inp, path_tags=["config", "sect0"]))
+
+        self.assertEqual(cnf["config"]["val:a"], None)  # Not converted.
+        self.assertEqual(cnf["config"]["sect0"], CNF_0["config"]["sect0"])
+        self.assertEqual(sorted(cnf["config"].keys()),
+                         sorted(CNF_0["config"].keys()))
+
+        with self.psr.ropen(self.cnf_path) as inp:
+            self.assertEqual(self.psr.load_subtree(inp, ("config", "sect0")),
+                             CNF_0["config"]["sect0"])
+
+    def test_34_load_subtree__w_custom_tags(self):
+        tags = dict(attrs="@a", text="#t", children="@c")
+        cnf = self.psr.load(self.cnf_path, tags=tags)
+        paths = [("config", "sect0"), ("config", "list1"),
+                 ("config", "list2", "@c"), ("config", "list2", "@c", 0),
+                 ("config", "@a")]
+        for path in paths:
+            ref = TT.anyconfig.query.search_path(cnf, path)
+            res = self.psr.load_subtree(self.cnf_path, path, tags=tags)
+            self.assertEqual(res, ref, path)
+
+    def test_36_load_subtree__w_special_keys(self):
+        cnf = self.psr.load(self.cnf_path)
+        for path in [("config", "list2", "@children"),
+                     ("config", "list2", "@children", 1, "item")]:
+            ref = TT.anyconfig.query.search_path(cnf, path)
+            self.assertTrue(ref is not None)
+            self.assertEqual(self.psr.load_subtree(self.cnf_path, path), ref)
+
     def test_40_load_w_options(self):
         cnf = self.psr.load(self.cnf_path, ac_parse_value=False)
         self._assert_dicts_equal(cnf)
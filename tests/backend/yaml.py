@@ -4,10 +4,11 @@
 # License: MIT
 #
 # pylint: disable=missing-docstring,invalid-name,too-few-public-methods
-# pylint: disable=ungrouped-imports
+# pylint: disable=ungrouped-imports,protected-access
 from __future__ import absolute_import
 
 import os
+import unittest
 import anyconfig.backend.yaml as TT
 import tests.backend.common as TBC
 
@@ -48,4 +49,123 @@ class Test_20(TBC.Test_20_dump_and_load, HasParserTrait):
 
     pass
 
+
+class Test_30_customized_classes(unittest.TestCase):
+
+    def test_10_customized_loader__memoized(self):
+        constructors = TT.Loader.yaml_constructors.copy()
+        ldr = TT._customized_loader(OrderedDict)
+
+        self.assertTrue(ldr is TT._customized_loader(OrderedDict))
+        self.assertFalse(ldr is TT._customized_loader(dict))
+        self.assertEqual(TT.Loader.yaml_constructors, constructors)
+
+    def test_20_customized_dumper__memoized(self):
+        representers = TT.Dumper.yaml_representers.copy()
+        dpr = TT._customized_dumper(OrderedDict)
+
+        self.assertTrue(dpr is TT._customized_dumper(OrderedDict))
+        self.assertEqual(TT.Dumper.yaml_representers, representers)
+
+    def test_30_loads__w_different_containers(self):
+        psr = TT.Parser()
+        self.assertTrue(isinstance(psr.loads(CNF_S, ac_dict=OrderedDict),
+                                   OrderedDict))
+        cnf = psr.loads(CNF_S, ac_dict=dict)
+        self.assertFalse(isinstance(cnf["sect0"], OrderedDict))
+
+    def test_40_customized_classes__bounded(self):
+        psr = TT.Parser()
+        for _ in range(TT._LOADERS.maxsize + 10):
+            psr.loads("a: 1", ac_dict=lambda *args: OrderedDict(*args))
+
+        self.assertEqual(TT._LOADERS.stats()["size"], TT._LOADERS.maxsize)
+
+    def test_50_loads__merge_keys__w_dict(self):
+        cnf = TT.Parser().loads("a: &a {b: 1}\nc:\n  <<: *a\n  d: 2\n",
+                                ac_dict=dict)
+        self.assertEqual(cnf["c"], dict(b=1, d=2))
+
+
+class Test_32_load_iter(TBC.TestBaseWithIO, HasParserTrait):
+
+    def test_10_load_iter__path_and_stream(self):
+        with self.psr.wopen(self.cnf_path) as out:
+            out.write("a: 1\n---\n---\n" + CNF_S)
+
+        ref = [dict(a=1), dict(), CNF]
+        self.assertEqual(list(self.psr.load_iter(self.cnf_path)), ref)
+        with self.psr.ropen(self.cnf_path) as inp:
+            self.assertEqual(list(self.psr.load_iter(inp)), ref)
+
+    def test_20_load_iter__w_options(self):
+        cnfs = list(self.psr.load_iter(self.cnf_path, ac_ordered=True))
+        self.assertEqual(cnfs, [CNF])
+        self.assertTrue(isinstance(cnfs[0]["sect0"], OrderedDict))
+
+    def test_30_load_iter__ignore_missing(self):
+        path = self.cnf_path + ".not_exist"
+        self.assertEqual(list(self.psr.load_iter(path, ignore_missing=True)),
+                         [])
+
+
+class Test_34_load_subtree(TBC.TestBaseWithIO, HasParserTrait):
+
+    def test_10_load_subtree(self):
+        paths = [("a", ), ("c", ), ("c", 1), ("c", -1), ("c", 3),
+                 ("sect0", "d", 0), ("sect0", "e"), ("a", "b"), ("x", )]
+        for path in paths:
+            ref = TT.anyconfig.query.search_path(CNF, path)
+            self.assertEqual(self.psr.load_subtree(self.cnf_path, path), ref)
+
+    def test_20_load_subtree__w_ac_dict(self):
+        cnf = self.psr.load_subtree(self.cnf_path, ("sect0", ),
+                                    ac_dict=OrderedDict)
+        self.assertTrue(isinstance(cnf, OrderedDict))
+
+    def test_30_load_subtree__aliases(self):
+        cnf_s = "base: &base {a: 1, b: [1, 2]}\nc: *base\n"
+        for path, ref in [(("c", "a"), 1), (("c", "b", -1), 2)]:
+            res = self.psr.load_subtree(TT.anyconfig.compat.StringIO(cnf_s),
+                                        path)
+            self.assertEqual(res, ref)
+
+    def test_32_find_node__merge_keys(self):
+        cnf_s = "base: &base {a: 1}\nc:\n  <<: *base\n  d: 2\n"
+        node = TT.yaml.compose(cnf_s, Loader=TT.Loader)
+        (node, rest) = TT._find_node(node, ("c", "a"))
+        self.assertEqual(rest, ("a", ))  # Must be constructed to look up.
+        self.assertTrue(isinstance(node, TT.yaml.MappingNode))
+
+    def test_40_load_subtree__not_str_keys(self):
+        cnf_s = "1: a\n'2': b\ntrue: c\n"
+        for path, ref in [(("1", ), None), (("2", ), "b"), (("true", ), None)]:
+            res = self.psr.load_subtree(TT.anyconfig.compat.StringIO(cnf_s),
+                                        path)
+            self.assertEqual(res, ref)
+
+
+class Test_40_libyaml(unittest.TestCase):
+
+    def test_10_active_engine(self):
+        ref = "libyaml" if TT.yaml.__with_libyaml__ else "python"
+        self.assertEqual(TT.active_engine(), ref)
+
+    def test_20_loads_and_dumps__safe_w_ac_dict(self):
+        psr = TT.Parser()
+        cnf = psr.loads(CNF_S, ac_safe=True, ac_dict=OrderedDict)
+        self.assertEqual(cnf, CNF)
+        self.assertTrue(isinstance(cnf["sect0"], OrderedDict))
+        self.assertEqual(psr.loads(psr.dumps(cnf, ac_safe=True)), CNF)
+
+    def test_30_loads_and_dumps__require_c(self):
+        psr = TT.Parser()
+        if TT.active_engine() == "libyaml":
+            cnf = psr.loads(CNF_S, ac_safe=True, ac_yaml_require_c=True)
+            self.assertEqual(cnf, CNF)
+            self.assertTrue(psr.dumps(cnf, ac_yaml_require_c=True))
+
+        self.assertRaises(TT.LibyamlNotAvailableError, psr.loads, CNF_S,
+                          Loader=TT.yaml.SafeLoader, ac_yaml_require_c=True)
+
 # vim:sw=4:ts=4:et:
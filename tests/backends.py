@@ -2,12 +2,14 @@
 # Copyright (C) 2012 - 2015 Satoru SATOH <ssato @ redhat.com>
 # License: MIT
 #
-# pylint: disable=missing-docstring
+# pylint: disable=missing-docstring, protected-access
 from __future__ import absolute_import
 
+import io
 import unittest
 
 import anyconfig.backends as TT
+import anyconfig.compat
 import anyconfig.backend.ini
 import anyconfig.backend.json
 
@@ -58,4 +60,91 @@ class Test(unittest.TestCase):
         self.assertTrue(isinstance(types, list))
         self.assertTrue(bool(list))  # ensure it's not empty.
 
+    def test_40_list_parsers(self):
+        psrs = TT.list_parsers()
+
+        self.assertTrue(anyconfig.backend.json.Parser in psrs)
+        self.assertEqual(sorted(set(p.type() for p in psrs)),
+                         TT.list_types())
+
+    def test_50_find_by_type__lazy_parser_not_available(self):
+        cps = [("dummy", [TT.LazyParser("anyconfig.backend.json", "dummy"),
+                          TT.LazyParser("anyconfig.backend.not_exist",
+                                        "dummy", priority=99)])]
+
+        self.assertEqual(TT.find_by_type("dummy", cps=cps),
+                         anyconfig.backend.json.Parser)
+        self.assertEqual(TT.list_types(cps=cps), ["dummy"])
+        self.assertEqual(TT.find_by_type("dummy", cps=dict(cps)),
+                         anyconfig.backend.json.Parser)
+
+    def test_52_find_by_content(self):
+        self.assertEqual(TT.find_by_content('{"a": 1}'),
+                         anyconfig.backend.json.Parser)
+        self.assertEqual(TT.find_by_content(b"[sect]\na = 1\n"),
+                         anyconfig.backend.ini.Parser)
+        self.assertTrue(TT.find_by_content("") is None)
+
+        strm = anyconfig.compat.StringIO("[1, 2]")
+        self.assertEqual(TT.find_by_content(strm),
+                         anyconfig.backend.json.Parser)
+        self.assertEqual(strm.read(), "[1, 2]")  # Not consumed.
+
+        if YAML_FOUND:
+            self.assertEqual(TT.find_by_content("a: 1\n"),
+                             anyconfig.backend.yaml.Parser)
+
+    def test_54_find_by_content__large_stream(self):
+        strm = io.BytesIO(b'{"a": [' + b"0, " * 1000000 + b"0]}")
+        self.assertEqual(TT.find_by_content(strm),
+                         anyconfig.backend.json.Parser)
+        self.assertEqual(strm.tell(), 0)
+
+    def test_60_get_parser_instance(self):
+        psr = TT.get_parser_instance(anyconfig.backend.json.Parser)
+
+        self.assertTrue(isinstance(psr, anyconfig.backend.json.Parser))
+        self.assertTrue(psr is TT.get_parser_instance(type(psr)))
+
+    def test_70_register_and_unregister(self):
+        class MyParser(anyconfig.backend.json.Parser):
+            _extensions = ["myjson"]
+
+        TT.register(MyParser)
+        try:
+            self.assertEqual(TT.find_by_type("json"), MyParser)
+            self.assertEqual(TT.find_by_file("a.myjson"), MyParser)
+            self.assertEqual(TT.find_by_file("a.json"),
+                             anyconfig.backend.json.Parser)
+
+            TT.register(MyParser, priority=-1)
+            self.assertEqual(TT.find_by_type("json"),
+                             anyconfig.backend.json.Parser)
+        finally:
+            TT.unregister(MyParser)
+
+        self.assertTrue(TT.find_by_file("a.myjson") is None)
+        self.assertRaises(ValueError, TT.unregister, MyParser)
+        self.assertRaises(ValueError, TT.register, object)
+
+    def test_72_unregister__lazy_parser_not_loaded(self):
+        saved = TT.PARSERS[:]
+        lpsr = TT.LazyParser("anyconfig.backend.json", "json", ["json"],
+                             priority=99)
+        TT.register(lpsr)
+        try:
+            TT.unregister(anyconfig.backend.json.Parser)
+            self.assertTrue(lpsr.loaded() is None)
+            self.assertFalse(lpsr in TT.PARSERS)
+            self.assertTrue(TT.find_by_type("json") is None)
+            self.assertRaises(ValueError, TT.unregister,
+                              anyconfig.backend.json.Parser)
+        finally:
+            with TT._LOCK:
+                TT.PARSERS[:] = saved
+                TT._update_indexes()
+
+        self.assertEqual(TT.find_by_type("json"),
+                         anyconfig.backend.json.Parser)
+
 # vim:sw=4:ts=4:et:
@@ -0,0 +1,186 @@
+#
+# Copyright (C) 2018 Satoru SATOH <ssato at redhat.com>
+# License: MIT
+#
+# pylint: disable=missing-docstring, invalid-name
+from __future__ import absolute_import
+
+import os
+import os.path
+import time
+import unittest
+
+import mock
+
+import anyconfig.api
+import anyconfig.backend.json
+import anyconfig.compat
+import anyconfig.frozen
+import anyconfig.cache as TT
+import tests.common
+
+
+class Test_10_LoadCache(unittest.TestCase):
+
+    def test_10_get_and_set(self):
+        cache = TT.LoadCache()
+        self.assertTrue(cache.get("a") is None)
+
+        cache.set("a", {"a": 1})
+        self.assertEqual(cache.get("a"), {"a": 1})
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_20_get__returns_frozen_results(self):
+        cache = TT.LoadCache()
+        val = {"a": [1]}
+        res0 = cache.set("a", val)
+        val["a"].append(2)
+
+        res1 = cache.get("a")
+        self.assertTrue(res1 is res0)
+        self.assertTrue(anyconfig.frozen.is_frozen(res1))
+        self.assertEqual(res1, {"a": (1, )})
+
+    def test_22_get__mutable__returns_copies(self):
+        cache = TT.LoadCache(mutable=True)
+        res0 = cache.set("a", {"a": [1]})
+        res0["a"].append(2)
+
+        res1 = cache.get("a")
+        res1["a"].append(3)
+        self.assertEqual(cache.get("a"), {"a": [1]})
+
+    def test_30_eviction(self):
+        cache = TT.LoadCache(maxsize=2)
+        for key in "abc":
+            cache.set(key, key)
+
+        self.assertTrue(cache.get("a") is None)
+        self.assertEqual(cache.get("c"), "c")
+        self.assertEqual(cache.stats()["size"], 2)
+
+    def test_40_clear(self):
+        cache = TT.LoadCache()
+        cache.set("a", 1)
+        cache.get("a")
+        cache.clear()
+
+        self.assertEqual(cache.stats(),
+                         dict(hits=0, misses=0, size=0, maxsize=128))
+
+
+class Test_20_load(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tests.common.setup_workdir()
+        self.path = os.path.join(self.workdir, "a.json")
+        self.psr = anyconfig.backend.json.Parser()
+
+    def tearDown(self):
+        tests.common.cleanup_workdir(self.workdir)
+
+    def test_10_make_key(self):
+        anyconfig.api.dump(dict(a=1), self.path)
+        key0 = TT.make_key(self.path, self.psr)
+        key1 = TT.make_key(self.path, self.psr, ac_ordered=True)
+
+        self.assertEqual(key0, TT.make_key(self.path, self.psr))
+        self.assertNotEqual(key0, key1)
+        self.assertTrue(TT.make_key(self.path + ".missing", self.psr) is None)
+
+    def test_20_load__hit_and_miss(self):
+        cache = TT.LoadCache()
+        anyconfig.api.dump(dict(a=1), self.path)
+
+        self.assertEqual(TT.load(self.psr, self.path, ac_cache=cache),
+                         dict(a=1))
+        self.assertEqual(TT.load(self.psr, self.path, ac_cache=cache),
+                         dict(a=1))
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_30_load__file_updated(self):
+        cache = TT.LoadCache()
+        anyconfig.api.dump(dict(a=1), self.path)
+        TT.load(self.psr, self.path, ac_cache=cache)
+
+        time.sleep(0.01)
+        anyconfig.api.dump(dict(a=2, b=1), self.path)
+        self.assertEqual(TT.load(self.psr, self.path, ac_cache=cache),
+                         dict(a=2, b=1))
+        self.assertEqual(cache.stats()["hits"], 0)
+
+    def test_40_single_load__w_ac_cache(self):
+        cache = TT.LoadCache()
+        anyconfig.api.dump(dict(a=1), self.path)
+
+        res0 = anyconfig.api.single_load(self.path, ac_cache=cache)
+        res1 = anyconfig.api.load(self.path, ac_cache=cache)
+
+        self.assertEqual(res0, res1)
+        self.assertTrue(res0 is res1)  # Not copied.
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_42_single_load__w_ac_cache__mutable(self):
+        cache = TT.LoadCache(mutable=True)
+        anyconfig.api.dump(dict(a=[1]), self.path)
+
+        res0 = anyconfig.api.single_load(self.path, ac_cache=cache)
+        res0["a"].append(2)
+        res1 = anyconfig.api.single_load(self.path, ac_cache=cache)
+
+        self.assertEqual(res1, dict(a=[1]))
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_44_load__hit_does_not_parse(self):
+        cache = TT.LoadCache()
+        anyconfig.api.dump(dict(a=[1]), self.path)
+
+        with mock.patch.object(self.psr, "load_from_path",
+                               wraps=self.psr.load_from_path) as load_fn:
+            TT.load(self.psr, self.path, ac_cache=cache)
+            for _ in range(10):
+                TT.load(self.psr, self.path, ac_cache=cache)
+
+        self.assertEqual(load_fn.call_count, 1)
+        self.assertEqual(cache.stats()["hits"], 10)
+
+    def test_46_single_load__w_ac_cache__dump(self):
+        cnf = dict(a=[1, dict(b=2)], c=dict(d="e"))
+        anyconfig.api.dump(cnf, self.path)
+
+        res = anyconfig.api.single_load(self.path, ac_cache=TT.LoadCache())
+        self.assertTrue(anyconfig.frozen.is_frozen(res))
+        self.assertEqual(res["a"], (1, dict(b=2)))  # lists become tuples.
+
+        anyconfig.api.dump(res, self.path)
+        self.assertEqual(anyconfig.api.single_load(self.path), cnf)
+
+        thawed = anyconfig.frozen.thaw(res)
+        thawed["a"].append(3)
+        self.assertEqual(thawed["a"], [1, dict(b=2), 3])
+
+    def test_50_load__frozen_results_not_copied(self):
+        cache = TT.LoadCache()
+        anyconfig.api.dump(dict(a=[1]), self.path)
+
+        res0 = TT.load(self.psr, self.path, ac_cache=cache,
+                       ac_dict=anyconfig.frozen.FrozenConfig)
+        res1 = TT.load(self.psr, self.path, ac_cache=cache,
+                       ac_dict=anyconfig.frozen.FrozenConfig)
+
+        self.assertTrue(res0 is res1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_52_load__conflicting_ac_dict(self):
+        anyconfig.api.dump(dict(a=[1]), self.path)
+        self.assertRaises(ValueError, anyconfig.api.single_load, self.path,
+                          ac_cache=TT.LoadCache(), ac_dict=dict)
+
+        res = anyconfig.api.single_load(self.path,
+                                        ac_cache=TT.LoadCache(mutable=True),
+                                        ac_dict=anyconfig.compat.OrderedDict)
+        self.assertTrue(isinstance(res, anyconfig.compat.OrderedDict))
+        self.assertEqual(res["a"], [1])
+
+# vim:sw=4:ts=4:et:
@@ -7,10 +7,12 @@ from __future__ import absolute_import
 
 import os
 import os.path
+import sys
 import unittest
 
 import anyconfig.cli as TT
 import anyconfig.api
+import anyconfig.compat
 import anyconfig.template
 import tests.common
 import tests.api
@@ -294,6 +296,18 @@ class Test_50_others_w_input(Test_20_Base):
     def test_30_w_query_option(self):
         self.run_and_check_exit_code(["-Q", "b.b[::-1]", self.infile], 0)
 
+    def test_40_input_from_stdin(self):
+        outfile = os.path.join(self.workdir, "out.json")
+        stdin = sys.stdin
+        try:
+            sys.stdin = anyconfig.compat.StringIO(open(self.infile).read())
+            self.run_and_check_exit_code(["-o", outfile, "-"], 0)
+        finally:
+            sys.stdin = stdin
+
+        self.assertEqual(anyconfig.api.load(outfile),
+                         anyconfig.api.load(self.infile))
+
 
 class Test_50_others_wo_input(Test_20_Base):
 
@@ -8,8 +8,10 @@
 from __future__ import absolute_import
 
 import copy
+import random
 import unittest
 import anyconfig.dicts as TT
+import anyconfig.frozen
 
 from tests.common import dicts_equal
 from anyconfig.compat import OrderedDict
@@ -67,6 +69,69 @@ class Test_10_get(unittest.TestCase):
         # self.assertEqual(msg, 'list indices must be integers...')
 
 
+class Test_12_compile_path(unittest.TestCase):
+
+    def test_10_compile_path__cached(self):
+        cpath = TT.compile_path("/a/b~1c/0")
+        self.assertTrue(TT.compile_path("/a/b~1c/0") is cpath)
+        self.assertEqual(cpath.keys, ("a", "b/c", "0"))
+        self.assertFalse(TT.compile_path("a.b", seps=('.', )) is
+                         TT.compile_path("a.b"))
+
+    def test_12_compile_path__cache_bounded(self):
+        for idx in range(TT._COMPILED_PATHS.maxsize + 10):
+            TT.compile_path("a.b%d" % idx)
+
+        stats = TT._COMPILED_PATHS.stats()
+        self.assertEqual(stats["size"], stats["maxsize"])
+
+    def test_20_get(self):
+        dic = dict(a=dict(b=[dict(c=1), dict(c=2)]), d={"0": 3})
+        for path, ref in (("/a/b/1", dict(c=2)), ("a.b.01", dict(c=2)),
+                          ("d.0", 3), ("", dic)):
+            self.assertEqual(TT.compile_path(path).get(dic), (ref, ''))
+
+        # Indices of arrays are only for the last keys as before.
+        for path in ("a.x", "a.b.2", "a.b.-", "a.b.1.c", "d.0.e"):
+            (val, msg) = TT.compile_path(path).get(dic)
+            self.assertTrue(val is None, path)
+            self.assertTrue(bool(msg), path)
+
+    def test_30_set(self):
+        dic = dict(a=1, b=dict(c=dict(d=0)), e=[0, dict(f=1)], g=[0])
+        TT.compile_path("a.x").set(dic, 1)  # Replaced with a dict.
+        TT.compile_path("b.c").set(dic, dict(g=2))  # Merged.
+        TT.compile_path("/e/1/h").set(dic, 3)  # Lists are replaced also.
+        TT.compile_path("/g/5").set(dic, 4)
+        TT.compile_path("/i~1j/k").set(dic, 5)  # Keys are not unescaped.
+
+        self.assertEqual(dic, {"a": dict(x=1), "b": dict(c=dict(d=0, g=2)),
+                               "e": {"1": dict(h=3)}, "g": {"5": 4},
+                               "i~1j": dict(k=5)})
+
+    def test_32_set__same_as_merge_nested_dics(self):
+        for path, val in (("a.b.d", 3), ("b.c", dict(e=1)), ("/b/c/d", [1]),
+                          ("b.c.d.e", 4), ("/e/0", 5), ("/e/1/f", 6),
+                          ("/e/5", 7), ("/e/-", 8), ("/g~1h", 9)):
+            dic = dict(a=1, b=dict(c=dict(d=2)), e=[0, dict(f=1)])
+            ref = copy.deepcopy(dic)
+            TT.merge(ref, TT.mk_nested_dic(path, val), ac_merge=TT.MS_DICTS)
+
+            TT.set_(dic, path, val)
+            self.assertEqual(dic, ref, path)
+
+    def test_40_delete(self):
+        dic = dict(a=dict(b=[1, 2], c=3))
+        self.assertEqual(TT.compile_path("a.b.0").delete(dic), (1, ''))
+        self.assertEqual(TT.compile_path("a.c").delete(dic), (3, ''))
+        self.assertEqual(dic, dict(a=dict(b=[2])))
+
+        for path in ("a.c", "a.b.1", "a.b.0.x", ""):
+            (val, msg) = TT.compile_path(path).delete(dic)
+            self.assertTrue(val is None, path)
+            self.assertTrue(bool(msg), path)
+
+
 class Test_10_update_with_replace(unittest.TestCase):
 
     ac_merge = TT.MS_REPLACE
@@ -202,4 +267,208 @@ class Test_40_merge(unittest.TestCase):
         TT.merge(dic, self.upd, ac_merge=set_none_merge_strat)
         self.assertTrue(dicts_equal(dic, exp))
 
+
+class Test_42_merge_list(unittest.TestCase):
+
+    def _assert_merge_list(self, lst0, lst1):
+        ref = lst0 + [x for x in lst1 if x not in lst0]
+        dic = dict(a=copy.deepcopy(lst0))
+        TT._merge_list(dic, "a", lst1)
+        self.assertEqual(dic["a"], ref)
+
+    def test_10_merge_list__hashables(self):
+        self._assert_merge_list([1, 2, 2, "a"], [2, 3, 3, 1.0, True, "a"])
+        nan = float("nan")
+        self._assert_merge_list([nan, None], [nan, float("nan"), None])
+
+    def test_20_merge_list__unhashables(self):
+        odic = OrderedDict((("a", 1), ("b", [2])))
+        rodic = OrderedDict((("b", [2]), ("a", 1)))
+        self._assert_merge_list([dict(a=1, b=[2]), [1, [2]], (1, [2])],
+                                [odic, rodic, [1, [2]], [1, (2, )],
+                                 (1, [2]), (1, (2, )), dict(a=1), {}])
+        self._assert_merge_list([odic], [rodic, dict(rodic)])
+
+    def test_30_merge_list__objects_cannot_make_keys(self):
+        self._assert_merge_list([set([1]), 1], [set([1]), set([2]), 1, 2])
+
+    def test_40_merge_list__many_items(self):
+        lst0 = list(range(0, 2000, 2))
+        lst1 = [dict(a=i) for i in range(1000)] + list(range(2000))
+        self._assert_merge_list(lst0 + [dict(a=1)], lst1)
+
+
+def _random_value(rnd, depth=0):
+    kind = rnd.randint(0, 4 if depth < 3 else 1)
+    if kind == 0:
+        return rnd.randint(0, 3)
+    if kind == 1:
+        return rnd.choice(["a", "b", None])
+    if kind == 2:
+        return [_random_value(rnd, depth + 1)
+                for _ in range(rnd.randint(0, 3))]
+    return _random_dict(rnd, depth + 1)
+
+
+def _random_dict(rnd, depth=0):
+    return dict((rnd.choice("abcd"), _random_value(rnd, depth))
+                for _ in range(rnd.randint(0, 4)))
+
+
+class Test_50_merge_many(unittest.TestCase):
+
+    def _assert_same_as_merge(self, dicts, strategy):
+        ref = copy.deepcopy(dicts[0])
+        try:
+            for dic in copy.deepcopy(dicts[1:]):
+                TT.merge(ref, dic, ac_merge=strategy)
+        except (TypeError, ValueError):
+            # e.g. merge a mapping object with an int. Errors may be different
+            # as the order to merge values is different.
+            self.assertRaises((TypeError, ValueError), TT.merge_many,
+                              copy.deepcopy(dicts), ac_merge=strategy)
+            return
+
+        res = TT.merge_many(copy.deepcopy(dicts), ac_merge=strategy)
+        self.assertEqual(res, ref, "%r, strategy=%s" % (dicts, strategy))
+
+        others = copy.deepcopy(dicts[1:])
+        res = TT.merge_many([copy.deepcopy(dicts[0])] + others,
+                            ac_merge=strategy, keep_others=True)
+        self.assertEqual(res, ref, "%r, strategy=%s" % (dicts, strategy))
+        self.assertEqual(others, dicts[1:])
+
+    def test_10_merge_many__empty(self):
+        self.assertTrue(TT.merge_many([]) is None)
+        dic = dict(a=1)
+        self.assertTrue(TT.merge_many([dic, {}, None]) is dic)
+
+    def test_20_merge_many__same_as_merge(self):
+        rnd = random.Random(0)
+        for _ in range(300):
+            dicts = [_random_dict(rnd) for _ in range(rnd.randint(1, 5))]
+            for strategy in TT.MERGE_STRATEGIES:
+                self._assert_same_as_merge(dicts, strategy)
+
+    def test_30_merge_many__lists_of_pairs(self):
+        dicts = [dict(a=dict(b=1)), dict(a=[("c", 2)]), dict(a=dict(d=3))]
+        self._assert_same_as_merge(dicts, TT.MS_DICTS)
+
+    def test_40_merge_many__custom_strategy(self):
+        def update_fn(self, other, key, val=None, **options):
+            self[key] = [self.get(key), other[key]]
+
+        res = TT.merge_many([dict(a=1), dict(a=2), dict(a=3)],
+                            ac_merge=update_fn)
+        self.assertEqual(res, dict(a=[[1, 2], 3]))
+
+    def test_42_merge_many__keep_others(self):
+        others = [dict(a=dict(b=[1]), c=dict(d=1)), dict(a=dict(b=[2]))]
+        res = TT.merge_many([{}] + others, ac_merge=TT.MS_DICTS_AND_LISTS,
+                            keep_others=True)
+        self.assertEqual(res, dict(a=dict(b=[1, 2]), c=dict(d=1)))
+        self.assertEqual(others, [dict(a=dict(b=[1]), c=dict(d=1)),
+                                  dict(a=dict(b=[2]))])
+        self.assertTrue(res["c"] is others[0]["c"])  # Not copied.
+
+    def test_50_merge_many__ordered(self):
+        dicts = [OrderedDict((("b", 0), )), OrderedDict((("d", 1), ("a", 2))),
+                 OrderedDict((("c", 3), ("a", 4)))]
+        res = TT.merge_many(dicts)
+        self.assertEqual(list(res.keys()), ["b", "d", "a", "c"])
+
+
+class Test_60_diff_and_patch(unittest.TestCase):
+
+    def _assert_patched(self, old, new):
+        ops = TT.diff(old, new)
+        cnf = copy.deepcopy(old)
+        TT.patch(cnf, ops)
+        self.assertEqual(cnf, new, "%r -> %r, ops=%r" % (old, new, ops))
+
+    def test_10_diff__same(self):
+        dic = dict(a=1, b=dict(c=[1, 2]))
+        self.assertEqual(TT.diff(dic, dic), [])
+        self.assertEqual(TT.diff(dic, copy.deepcopy(dic)), [])
+
+    def test_12_diff__types(self):
+        self.assertEqual(TT.diff(dict(a=1), dict(a=True)),
+                         [dict(op="replace", path="/a", value=True)])
+        self.assertEqual(TT.diff(dict(a=[1]), dict(a=(1, ))), [])
+
+    def test_20_diff__escaped_keys(self):
+        self.assertEqual(TT.diff({"a/b": 1}, {"a/b": 2, "~": 0}),
+                         [dict(op="replace", path="/a~1b", value=2),
+                          dict(op="add", path="/~0", value=0)])
+
+    def test_22_diff__arrays(self):
+        old = dict(a=[0, 1, 2, 3])
+        self.assertEqual(TT.diff(old, dict(a=[0, 9, 1, 2, 3])),
+                         [dict(op="add", path="/a/1", value=9)])
+        self.assertEqual(TT.diff(old, dict(a=[0, 3])),
+                         [dict(op="remove", path="/a/2"),
+                          dict(op="remove", path="/a/1")])
+
+    def test_30_diff__frozen_shared_subtrees(self):
+        freeze = anyconfig.frozen.freeze
+        base = dict(("k%d" % i, dict(v=i)) for i in range(100))
+        old = freeze(dict(base=base, x=1))
+        new = freeze(dict(base=base, x=2))
+        self.assertTrue(old["base"] is new["base"])
+        self.assertEqual(TT.diff(old, new),
+                         [dict(op="replace", path="/x", value=2)])
+
+    def test_40_diff_and_patch__random(self):
+        rnd = random.Random(0)
+        for _ in range(500):
+            self._assert_patched(_random_dict(rnd), _random_dict(rnd))
+
+    def test_42_diff_and_patch__tuples(self):
+        old = dict(a=(0, 1, 2), b=dict(c=(dict(d=(1, 2)), 3)))
+        for new in (dict(a=(0, 2), b=dict(c=(dict(d=(1, 2, 3)), 3))),
+                    dict(a=(9, 0, 1, 2), b=dict(c=(dict(d=(2, )), ))),
+                    dict(a=(0, 1, 2), b=dict(c=(dict(e=1), 3)))):
+            self._assert_patched(old, new)
+
+    def test_44_diff__shared_subtrees(self):
+        shared = dict(("k%d" % i, [dict(v=i)]) for i in range(100))
+        old = dict(a=shared, b=[shared, 1], x=1)
+        new = dict(a=shared, b=[shared, 2], x=1)
+        self.assertEqual(TT.diff(old, new),
+                         [dict(op="replace", path="/b/1", value=2)])
+        self._assert_patched(old, new)
+
+    def test_46_diff__non_str_keys(self):
+        self.assertRaises(ValueError, TT.diff, {1: "a"}, {1: "b"})
+        self.assertRaises(ValueError, TT.diff, dict(a={}), dict(a={1: 0}))
+
+    def test_50_patch__rfc6902_examples(self):
+        cnf = dict(foo=["bar", "baz"], baz="qux", biscuits=[dict(name="a")])
+        TT.patch(cnf, [dict(op="add", path="/foo/1", value="qux"),
+                       dict(op="remove", path="/baz"),
+                       dict(op="test", path="/foo/2", value="baz"),
+                       {"op": "copy", "from": "/biscuits/0",
+                        "path": "/best_biscuit"},
+                       {"op": "move", "from": "/foo/0", "path": "/foo/-"}])
+        self.assertEqual(cnf, dict(foo=["qux", "baz", "bar"],
+                                   biscuits=[dict(name="a")],
+                                   best_biscuit=dict(name="a")))
+        self.assertFalse(cnf["best_biscuit"] is cnf["biscuits"][0])
+
+    def test_52_patch__errors(self):
+        for ops in ([dict(op="remove", path="/not_exist")],
+                    [dict(op="replace", path="/a/1", value=0)],
+                    [dict(op="add", path="/a/3", value=0)],
+                    [dict(op="test", path="/a/0", value=2)],
+                    [{"op": "move", "from": "/b", "path": "/b/c"}],
+                    [dict(op="add", path="a", value=0)],
+                    [dict(op="unknown", path="/a")]):
+            cnf = dict(a=[1], b=dict())
+            self.assertRaises(ValueError, TT.patch, cnf, ops)
+
+    def test_54_patch__whole_document(self):
+        cnf = dict(a=1)
+        TT.patch(cnf, [dict(op="replace", path="", value=dict(b=2))])
+        self.assertEqual(cnf, dict(b=2))
+
 # vim:sw=4:ts=4:et:
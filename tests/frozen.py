@@ -0,0 +1,169 @@
+#
+# Copyright (C) 2018 Satoru SATOH <ssato @ redhat.com>
+# License: MIT
+#
+# pylint: disable=missing-docstring,invalid-name,protected-access
+from __future__ import absolute_import
+
+import copy
+import pickle
+import unittest
+
+import anyconfig.api
+import anyconfig.dicts
+import anyconfig.frozen as TT
+
+from anyconfig.compat import OrderedDict
+
+
+CNF_0 = dict(name="a", server=dict(host="localhost", ports=[80, 8080]),
+             tags=set(["x", "y"]))
+
+
+class Test_10_FrozenConfig(unittest.TestCase):
+
+    def test_10_make(self):
+        cnf = TT.FrozenConfig(CNF_0)
+        self.assertEqual(cnf["name"], "a")
+        self.assertTrue(isinstance(cnf["server"], TT.FrozenConfig))
+        self.assertEqual(cnf["server"]["ports"], (80, 8080))
+        self.assertEqual(cnf["tags"], frozenset(["x", "y"]))
+        self.assertEqual(len(cnf), 3)
+        self.assertTrue("name" in cnf)
+        self.assertFalse("not_exist" in cnf)
+
+    def test_12_make__keep_order(self):
+        cnf = TT.FrozenConfig(OrderedDict((("b", 1), ("a", 2))), c=3)
+        self.assertEqual(list(cnf), ["b", "a", "c"])
+
+    def test_20_immutable(self):
+        cnf = TT.FrozenConfig(CNF_0)
+
+        def _set():
+            cnf["name"] = "b"
+
+        self.assertRaises(TypeError, _set)
+        self.assertRaises(AttributeError, setattr, cnf, "x", 1)
+
+    def test_30_hashable(self):
+        cnf0 = TT.FrozenConfig(a=1, b=dict(c=[2]))
+        cnf1 = TT.FrozenConfig(OrderedDict((("b", dict(c=[2])), ("a", 1))))
+        self.assertFalse(cnf0 is cnf1)  # Different order of keys.
+        self.assertEqual(cnf0, cnf1)
+        self.assertEqual(hash(cnf0), hash(cnf1))
+        self.assertNotEqual(cnf0, TT.FrozenConfig(a=1, b=dict(c=[3])))
+
+    def test_40_hash_consed(self):
+        base = dict(db=dict(host="db0", port=5432), log=dict(level="info"))
+        cnfs = [TT.freeze(dict(base, tenant="t%d" % i)) for i in range(10)]
+
+        self.assertTrue(all(c["db"] is cnfs[0]["db"] for c in cnfs))
+        self.assertTrue(TT.FrozenConfig(base) is TT.FrozenConfig(base))
+        self.assertTrue(cnfs[0]._table is cnfs[1]._table)  # Shared keys.
+
+    def test_42_hash_consed__keep_types(self):
+        cnf0 = TT.FrozenConfig(a=1)
+        cnf1 = TT.FrozenConfig(a=True)
+        self.assertFalse(cnf0 is cnf1)
+        self.assertTrue(cnf1["a"] is True)
+
+    def test_43_hash_consed__keep_signs_of_floats(self):
+        cnf0 = TT.FrozenConfig(x=0.0)
+        cnf1 = TT.FrozenConfig(x=-0.0)
+        self.assertFalse(cnf0 is cnf1)
+        self.assertEqual(str(cnf1["x"]), "-0.0")
+
+        cnf2 = TT.freeze(dict(a=[0.0]))
+        cnf3 = TT.freeze(dict(a=[-0.0]))
+        self.assertFalse(cnf2 is cnf3)
+        self.assertEqual(str(cnf3["a"][0]), "-0.0")
+
+        self.assertEqual(str(list(TT.FrozenConfig({0.0: 1})) +
+                             list(TT.FrozenConfig({-0.0: 1}))),
+                         "[0.0, -0.0]")
+
+    def test_44_unhashable_values(self):
+        cnf = TT.FrozenConfig(a=bytearray(b"a"))
+        self.assertEqual(cnf["a"], bytearray(b"a"))
+        self.assertRaises(TypeError, hash, cnf)
+
+    def test_50_copy_and_pickle(self):
+        cnf = TT.FrozenConfig(CNF_0)
+        self.assertTrue(copy.copy(cnf) is cnf)
+        self.assertTrue(copy.deepcopy(cnf) is cnf)
+        self.assertTrue(pickle.loads(pickle.dumps(cnf)) is cnf)
+
+    def test_60_convert_to(self):
+        cnf = anyconfig.dicts.convert_to(CNF_0, ac_dict=TT.FrozenConfig)
+        self.assertTrue(cnf is TT.freeze(CNF_0))
+
+    def test_70_thaw(self):
+        dic = TT.thaw(TT.freeze(CNF_0))
+        self.assertEqual(dic["server"], CNF_0["server"])
+        dic["server"]["ports"].append(443)  # Mutable.
+
+
+class Test_20_load(unittest.TestCase):
+
+    def test_10_loads__json(self):
+        cnf = anyconfig.api.loads('{"a": {"b": [1, {"c": 2}]}}', "json",
+                                  ac_dict=TT.FrozenConfig)
+        self.assertTrue(isinstance(cnf, TT.FrozenConfig))
+        self.assertTrue(cnf["a"]["b"][1] is TT.FrozenConfig(c=2))
+
+    def test_20_loads__empty(self):
+        cnf = anyconfig.api.loads("", "json", ac_dict=TT.FrozenConfig)
+        self.assertEqual(cnf, TT.FrozenConfig())
+
+    def test_30_loads__ini(self):
+        cnf = anyconfig.api.loads("[sect]\na = 1\n", "ini",
+                                  ac_dict=TT.FrozenConfig)
+        self.assertTrue(isinstance(cnf["sect"], TT.FrozenConfig))
+
+    def test_40_load_iter__jsonl(self):
+        psr = anyconfig.api.find_loader(None, "jsonl")
+        strm = anyconfig.compat.StringIO('{"a": [1]}\n{"a": [1]}\n')
+        res = list(psr.load_iter(strm, ac_dict=TT.FrozenConfig))
+        self.assertTrue(res[0] is res[1])
+
+    def test_42_loads__yaml(self):
+        cnf = anyconfig.api.loads("a: {b: [1, {c: 2}]}\n", "yaml",
+                                  ac_dict=TT.FrozenConfig)
+        self.assertTrue(isinstance(cnf, TT.FrozenConfig))
+        self.assertTrue(cnf["a"]["b"][1] is TT.FrozenConfig(c=2))
+
+    def test_44_load_iter__yaml(self):
+        psr = anyconfig.api.find_loader(None, "yaml")
+        strm = anyconfig.compat.StringIO("a: [1]\n---\na: [1]\n")
+        res = list(psr.load_iter(strm, ac_dict=TT.FrozenConfig))
+        self.assertTrue(res[0] is res[1])
+        self.assertTrue(isinstance(res[0], TT.FrozenConfig))
+
+    def test_46_load_subtree__yaml(self):
+        psr = anyconfig.api.find_loader(None, "yaml")
+        strm = anyconfig.compat.StringIO("a: {b: [1, {c: 2}]}\n")
+        res = psr.load_subtree(strm, ("a", "b", 1), ac_dict=TT.FrozenConfig)
+        self.assertTrue(res is TT.FrozenConfig(c=2))
+
+    def test_48_load__query(self):
+        strm = anyconfig.compat.StringIO('{"a": {"b": [{"c": 1}, 2]}}')
+        res = anyconfig.api.load(strm, "json", ac_dict=TT.FrozenConfig,
+                                 ac_query="a.b[0]")
+        self.assertTrue(res is TT.FrozenConfig(c=1))
+
+    def test_49_query_many(self):
+        cnf = anyconfig.api.loads('{"a": {"b": [{"c": 1}, 2]}}', "json",
+                                  ac_dict=TT.FrozenConfig)
+        res = anyconfig.api.query_many(cnf, dict(x="a.b[0].c", y="a.b[-1]",
+                                                 z="a.b[2]"))
+        self.assertEqual(res, dict(x=1, y=2, z=None))
+
+    def test_50_multi_load(self):
+        strms = [anyconfig.compat.StringIO('{"a": {"b": [1]}, "c": 1}'),
+                 anyconfig.compat.StringIO('{"a": {"b": [2]}}')]
+        cnf = anyconfig.api.load(strms, "json", ac_dict=TT.FrozenConfig,
+                                 ac_merge=anyconfig.dicts.MS_DICTS_AND_LISTS)
+        self.assertEqual(cnf, TT.FrozenConfig(a=dict(b=[1, 2]), c=1))
+        self.assertTrue(isinstance(cnf, TT.FrozenConfig))
+
+# vim:sw=4:ts=4:et:
@@ -0,0 +1,97 @@
+#
+# Copyright (C) 2018 Satoru SATOH <ssato @ redhat.com>
+# License: MIT
+#
+# pylint: disable=missing-docstring,invalid-name
+from __future__ import absolute_import
+
+import copy
+import random
+import unittest
+
+import anyconfig.dicts
+import anyconfig.layered as TT
+
+from anyconfig.compat import OrderedDict
+
+
+DEFAULTS = dict(name="a", server=dict(host="localhost", port=80,
+                                      opts=["a", "b"]),
+                log=dict(level="info"))
+SITE = dict(server=dict(port=8080, opts=["b", "c"]), debug=True)
+HOST = dict(log=dict(level="debug", file="/tmp/a.log"), debug=False)
+
+
+def _random_value(rnd, key, depth=0):
+    kind = rnd.randint(0, 2 if depth < 3 else 1)
+    if kind == 0:
+        return rnd.choice([0, 1, "a", None])
+    if key in "xy":
+        return [rnd.randint(0, 3) for _ in range(rnd.randint(0, 3))]
+    return _random_dict(rnd, depth + 1)
+
+
+def _random_dict(rnd, depth=0):
+    return dict((key, _random_value(rnd, key, depth)) for key
+                in rnd.sample("abxy", rnd.randint(0, 4)))
+
+
+class Test_10_LayeredConfig(unittest.TestCase):
+
+    def test_10_lookup(self):
+        cnf = TT.LayeredConfig([DEFAULTS, SITE, HOST])
+        self.assertEqual(cnf["name"], "a")
+        self.assertEqual(cnf["server"]["host"], "localhost")
+        self.assertEqual(cnf["server"]["port"], 8080)
+        self.assertEqual(cnf["server"]["opts"], ["b", "c"])
+        self.assertEqual(cnf["log"]["level"], "debug")
+        self.assertFalse(cnf["debug"])
+        self.assertTrue(isinstance(cnf["server"], TT.LayeredConfig))
+        self.assertTrue(cnf["server"] is cnf["server"])  # Memoized.
+
+    def test_12_lookup__missing_keys(self):
+        cnf = TT.LayeredConfig([DEFAULTS, SITE])
+        self.assertRaises(KeyError, lambda: cnf["not_exist"])
+        self.assertTrue(cnf.get("not_exist") is None)
+        self.assertFalse("not_exist" in cnf)
+        self.assertTrue("debug" in cnf)
+
+    def test_20_keys__ordered(self):
+        cnf = TT.LayeredConfig([OrderedDict((("b", 1), ("a", 2))),
+                                OrderedDict((("c", 3), ("a", 4)))])
+        self.assertEqual(list(cnf), ["b", "a", "c"])
+        self.assertEqual(len(cnf), 3)
+
+    def test_30_layers_not_modified(self):
+        layers = copy.deepcopy([DEFAULTS, SITE, HOST])
+        cnf = TT.LayeredConfig(layers,
+                               ac_merge=anyconfig.dicts.MS_DICTS_AND_LISTS)
+        self.assertEqual(cnf["server"]["opts"], ["a", "b", "c"])
+        cnf.materialize()["server"]["opts"].append("d")
+        self.assertEqual(layers, [DEFAULTS, SITE, HOST])
+
+    def test_40_materialize__w_container(self):
+        cnf = TT.LayeredConfig([DEFAULTS, SITE]).materialize(OrderedDict)
+        self.assertTrue(isinstance(cnf, OrderedDict))
+        self.assertTrue(isinstance(cnf["server"], OrderedDict))
+
+    def test_50_wrong_strategy(self):
+        self.assertRaises(ValueError, TT.LayeredConfig, [DEFAULTS],
+                          ac_merge="not_exist")
+
+    def test_60_materialize__same_as_merge_many(self):
+        rnd = random.Random(0)
+        for _ in range(300):
+            dicts = [_random_dict(rnd) for _ in range(rnd.randint(1, 5))]
+            for strategy in anyconfig.dicts.MERGE_STRATEGIES:
+                try:
+                    ref = anyconfig.dicts.merge_many(copy.deepcopy(dicts),
+                                                     ac_merge=strategy)
+                except (TypeError, ValueError):
+                    continue  # e.g. merge a mapping object with an int.
+
+                res = TT.LayeredConfig(dicts, ac_merge=strategy)
+                self.assertEqual(res.materialize(), ref,
+                                 "%r, strategy=%s" % (dicts, strategy))
+
+# vim:sw=4:ts=4:et:
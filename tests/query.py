@@ -43,4 +43,60 @@ class Test_00_Functions(unittest.TestCase):
         except (NameError, AttributeError):
             pass
 
+
+class Expression(object):
+
+    def __init__(self, key):
+        self.key = key
+
+    def search(self, data):
+        return data.get(self.key)
+
+
+class Test_20_compiled_expressions(unittest.TestCase):
+
+    def test_10_query__w_compiled_expression(self):
+        pexp = Expression("a")
+        self.assertTrue(TT.compile_(pexp) is pexp)
+        self.assertEqual(TT.query({"a": 1}, ac_query=pexp), 1)
+
+    def test_20_compile___cached(self):
+        try:
+            if TT.jmespath:
+                TT.clear_cache()
+                pexp = TT.compile_("a.b")
+                self.assertTrue(TT.compile_("a.b") is pexp)
+                self.assertEqual(TT.cache_stats()["hits"], 1)
+        except (NameError, AttributeError):
+            pass
+
+
+class Test_30_query_many(unittest.TestCase):
+
+    data = {"a": {"b": [{"c": 1}, {"c": 2}], "d": "D"}, "e": [0, 1]}
+
+    def test_10_parse_simple_path(self):
+        self.assertEqual(TT.parse_simple_path("a.b[1].c"), ("a", "b", 1, "c"))
+        for exp in ("a.b[*]", "a..b", "a.'b'", "length(a)", "[0]", "a[1:]"):
+            self.assertTrue(TT.parse_simple_path(exp) is None, exp)
+
+    def test_20_query_many__simple_paths(self):
+        exps = dict(c0="a.b[0].c", c1="a.b[-1].c", d="a.d", b="a.b",
+                    x="a.b.c", y="a.d[0]", z="e[2]", w="a.x.y")
+        res = TT.query_many(self.data, exps)
+        self.assertEqual(res, dict(c0=1, c1=2, d="D", b=self.data["a"]["b"],
+                                   x=None, y=None, z=None, w=None))
+
+    def test_30_query_many__w_compiled_expression(self):
+        res = TT.query_many(self.data, dict(a=Expression("e"), b="e[1]"))
+        self.assertEqual(res, dict(a=[0, 1], b=1))
+
+    def test_40_query_many__complex_expression(self):
+        try:
+            if TT.jmespath:
+                res = TT.query_many(self.data, dict(a="a.b[*].c", b="a.d"))
+                self.assertEqual(res, dict(a=[1, 2], b="D"))
+        except (NameError, AttributeError):
+            pass
+
 # vim:sw=4:ts=4:et:
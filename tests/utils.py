@@ -14,4 +14,44 @@ class Test(unittest.TestCase):
         self.assertEqual(TT.get_file_extension("/a/b.txt"), "txt")
         self.assertEqual(TT.get_file_extension("/a/b/c.tar.xz"), "xz")
 
+
+class Test_10_LRUCache(unittest.TestCase):
+
+    def test_10_get_or_make__make_once(self):
+        cache = TT.LRUCache()
+        made = []
+
+        def fun(key):
+            made.append(key)
+            return [key]
+
+        val = cache.get_or_make("a", fun)
+        self.assertTrue(cache.get_or_make("a", fun) is val)
+        self.assertTrue(cache.get("a") is val)
+        self.assertEqual(made, ["a"])
+        self.assertEqual(cache.stats(),
+                         dict(hits=2, misses=1, size=1, maxsize=128))
+
+    def test_20_set__eviction_and_clear(self):
+        cache = TT.LRUCache(maxsize=2)
+        for key in "abca":
+            cache.set(key, key.upper())
+
+        self.assertEqual(cache.stats()["size"], 2)
+        self.assertTrue(cache.get("b") is None)
+        self.assertEqual(cache.get("c"), "C")
+
+        cache.clear()
+        self.assertEqual(cache.stats(),
+                         dict(hits=0, misses=0, size=0, maxsize=2))
+
+    def test_30_get_or_make__errors_are_not_cached(self):
+        cache = TT.LRUCache()
+
+        def fun(key):
+            raise ValueError(key)
+
+        self.assertRaises(ValueError, cache.get_or_make, "a", fun)
+        self.assertEqual(cache.stats()["size"], 0)
+
 # vim:sw=4:ts=4:et:
@@ -0,0 +1,141 @@
+#
+# Copyright (C) 2018 Satoru SATOH <ssato @ redhat.com>
+# License: MIT
+#
+# pylint: disable=missing-docstring,invalid-name,protected-access
+from __future__ import absolute_import
+
+import os.path
+import threading
+import unittest
+
+import anyconfig.api
+import anyconfig.watcher as TT
+import tests.common
+
+
+class Test_10_Watcher(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tests.common.setup_workdir()
+        self.paths = [os.path.join(self.workdir, "%d.json" % i)
+                      for i in range(3)]
+        for idx, path in enumerate(self.paths):
+            anyconfig.api.dump(dict(a=idx, b={str(idx): idx}), path)
+        self.spec = os.path.join(self.workdir, "*.json")
+        self.results = []
+
+    def tearDown(self):
+        tests.common.cleanup_workdir(self.workdir)
+
+    def _callback(self, *args):
+        self.results.append(args)
+
+    def test_10_check__load_changed_files_only(self):
+        watcher = TT.Watcher(self.spec, self._callback, ac_inotify=False)
+        self.assertTrue(watcher.check())
+        self.assertEqual(self.results[-1],
+                         (dict(a=2, b={"0": 0, "1": 1, "2": 2}), ))
+        self.assertEqual(watcher.nloads, 3)
+
+        self.assertFalse(watcher.check())  # Not changed.
+
+        anyconfig.api.dump(dict(a=10, b={"1": 1}), self.paths[1])
+        self.assertFalse(watcher.check())  # Result is not changed.
+        self.assertEqual(watcher.nloads, 4)
+
+        anyconfig.api.dump(dict(a=20, b={"2": 22}), self.paths[2])
+        self.assertTrue(watcher.check())
+        self.assertEqual(self.results[-1],
+                         (dict(a=20, b={"0": 0, "1": 1, "2": 22}), ))
+        self.assertEqual(watcher.nloads, 5)
+
+    def test_20_check__added_and_removed_files(self):
+        watcher = TT.Watcher(self.spec, self._callback, ac_inotify=False,
+                             ac_diff=True)
+        watcher.check()
+        os.remove(self.paths[2])
+        anyconfig.api.dump(dict(d=3), os.path.join(self.workdir, "3.json"))
+
+        self.assertTrue(watcher.check())
+        (cnf, ops) = self.results[-1]
+        self.assertEqual(cnf, dict(a=1, b={"0": 0, "1": 1}, d=3))
+        self.assertEqual(sorted(op["path"] for op in ops),
+                         ["/a", "/b/2", "/d"])
+
+    def test_22_check__broken_file(self):
+        watcher = TT.Watcher(self.spec, self._callback, ac_inotify=False)
+        watcher.check()
+        with open(self.paths[2], 'w') as out:
+            out.write("{broken")
+
+        self.assertFalse(watcher.check())  # The previous result is used.
+        self.assertEqual(watcher.cnf["a"], 2)
+
+    def test_30_check__w_ac_query(self):
+        watcher = TT.Watcher(self.spec, self._callback, ac_inotify=False,
+                             ac_query="b")
+        watcher.check()
+        self.assertEqual(self.results[-1], ({"0": 0, "1": 1, "2": 2}, ))
+
+    def test_32_check__w_ac_schema(self):
+        scm = dict(type="object", required=["a", "d"])
+        os.makedirs(os.path.join(self.workdir, "scm"))
+        spath = os.path.join(self.workdir, "scm", "scm.json")
+        anyconfig.api.dump(scm, spath)
+        watcher = TT.Watcher(self.spec, self._callback, ac_inotify=False,
+                             ac_schema=spath)
+        self.assertFalse(watcher.check())  # "d" is missing.
+        self.assertEqual(self.results, [])
+
+        anyconfig.api.dump(dict(d=3), self.paths[1])
+        self.assertTrue(watcher.check())  # Only the merged one has both.
+        self.assertEqual(self.results[-1],
+                         (dict(a=2, b={"0": 0, "2": 2}, d=3), ))
+
+    def test_34_check__w_ac_context(self):
+        ctx = dict(z=9, b={"9": 9})
+        watcher = TT.Watcher(self.spec, self._callback, ac_inotify=False,
+                             ac_context=ctx)
+        watcher.check()
+        ref = anyconfig.api.load(self.spec, ac_context=dict(z=9, b={"9": 9}))
+        self.assertEqual(self.results[-1], (ref, ))
+        self.assertEqual(ref["z"], 9)
+        self.assertEqual(ctx, dict(z=9, b={"9": 9}))
+
+    def test_36_init__w_ac_template(self):
+        self.assertRaises(ValueError, TT.Watcher, self.spec, self._callback,
+                          ac_template=True)
+
+    def test_38_check__fragments_not_updated(self):
+        watcher = TT.Watcher(self.spec, self._callback, ac_inotify=False)
+        watcher.check()
+        anyconfig.api.dump(dict(a=20, b={"2": 22}), self.paths[2])
+        watcher.check()
+
+        for path in self.paths:
+            self.assertEqual(watcher._fragments[path][1],
+                             anyconfig.api.load(path))
+
+    def test_40_watch(self):
+        for inotify in (False, True):
+            called = threading.Event()
+            self.results = []
+
+            def _callback(cnf):
+                self.results.append(cnf)
+                called.set()
+
+            watcher = anyconfig.watch(self.spec, _callback, ac_interval=0.05,
+                                      ac_debounce=0.05, ac_inotify=inotify)
+            try:
+                self.assertTrue(called.is_set())  # Called on start.
+                called.clear()
+                anyconfig.api.dump(dict(a=inotify), self.paths[0])
+                anyconfig.api.dump(dict(a=30 + inotify), self.paths[2])
+                self.assertTrue(called.wait(5))
+                self.assertEqual(self.results[-1]["a"], 30 + inotify)
+            finally:
+                watcher.stop()
+
+# vim:sw=4:ts=4:et: